@@ -1,30 +1,286 @@
-from dataclasses import dataclass, field
-from typing import Any, Dict, List, Optional
+import asyncio
+import contextvars
+import functools
+import json
+import marshal
+import queue
+import random
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, replace
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, Type, TypeVar, Union
 
+import tracing
+
+
+T = TypeVar("T")
+
+# Blocking work (SQLite calls) from the async paths runs on this bounded pool so many
+# queries can be in flight without stalling the event loop.
+DEFAULT_MAX_WORKERS = 8
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=DEFAULT_MAX_WORKERS, thread_name_prefix="agent-io")
+    return _executor
+
+
+def configure_executor(max_workers: int = DEFAULT_MAX_WORKERS) -> None:
+    """
+    Replace the shared executor with one of the given size. Pending work on the old one finishes.
+    """
+    global _executor
+    with _executor_lock:
+        old, _executor = _executor, ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="agent-io")
+    if old is not None:
+        old.shutdown(wait=False)
+
+
+def shutdown_executor() -> None:
+    global _executor
+    with _executor_lock:
+        old, _executor = _executor, None
+    if old is not None:
+        old.shutdown(wait=True)
+
+
+async def run_blocking(func: Callable[..., T], *args: Any) -> T:
+    # Carry contextvars (the active trace) into the worker thread.
+    context = contextvars.copy_context()
+    return await asyncio.get_running_loop().run_in_executor(get_executor(), context.run, func, *args)
+
+
+M = TypeVar("M", bound="_MessageCodec")
+
+# Wire format for to_bytes(): one tag byte, then a marshal encoding of the field tuple. Only
+# plain values (dict/list/tuple/str/int/float/bool/None) can be encoded; there is deliberately no
+# pickle fallback, since unpickling bytes from another process can run arbitrary code.
+_MARSHAL_TAG = b"M"
+_FIELD_COUNT = 6
+
+
+def _intern(value: Optional[str]) -> Optional[str]:
+    # Sender/recipient/intent come from a handful of names, so share one string object each.
+    return sys.intern(value) if value is not None else None
+
+
+class _MessageCodec:
+    __slots__ = ()
+
+    def to_bytes(self) -> bytes:
+        """
+        Encode the message; ValueError if the payload holds anything but plain values.
+        """
+        fields = (self.sender, self.recipient, self.content, self.intent, self.payload, self.duration_ms)  # type: ignore[attr-defined]
+        return _MARSHAL_TAG + marshal.dumps(fields)
+
+    @classmethod
+    def from_bytes(cls: Type[M], data: bytes) -> M:
+        """
+        Decode bytes made by to_bytes(); ValueError for any other encoding or a malformed body.
+        marshal never runs code, but it is not hardened against crafted input: only decode
+        bytes from processes this one started (e.g. RouterWorkerPool workers).
+        """
+        tag, body = data[:1], data[1:]
+        if tag != _MARSHAL_TAG:
+            raise ValueError(f"Unknown message encoding tag: {tag!r}")
+        try:
+            fields = marshal.loads(body)
+        except (EOFError, TypeError, ValueError) as exc:
+            raise ValueError(f"Malformed message body: {exc}") from exc
+        if not isinstance(fields, tuple) or len(fields) != _FIELD_COUNT:
+            raise ValueError("Malformed message body: expected a tuple of message fields")
+        return cls(*fields)  # type: ignore[call-arg]
+
+
+@dataclass(slots=True)
+class AgentMessage(_MessageCodec):
+    """
+    Slotted message. payload stays None until a hop actually carries data.
+    """
+
+    sender: str
+    recipient: str
+    content: str
+    intent: Optional[str] = None
+    payload: Optional[Dict[str, Any]] = None
+    # Time spent producing this reply, set by trace_hop while tracing is enabled.
+    duration_ms: Optional[float] = None
+
+    def __post_init__(self) -> None:
+        self.sender = _intern(self.sender)
+        self.recipient = _intern(self.recipient)
+        self.intent = _intern(self.intent)
+
+
+@dataclass(slots=True, frozen=True)
+class FrozenAgentMessage(_MessageCodec):
+    """
+    Immutable, hashable variant of AgentMessage (the payload dict itself is not frozen).
+    """
 
-@dataclass
-class AgentMessage:
     sender: str
     recipient: str
     content: str
     intent: Optional[str] = None
-    payload: Optional[Dict[str, Any]] = field(default_factory=dict)
+    payload: Optional[Dict[str, Any]] = None
+    duration_ms: Optional[float] = None
+
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "sender", _intern(self.sender))
+        object.__setattr__(self, "recipient", _intern(self.recipient))
+        object.__setattr__(self, "intent", _intern(self.intent))
+
+    def __hash__(self) -> int:
+        return hash((self.sender, self.recipient, self.content, self.intent))
+
+    def thaw(self) -> AgentMessage:
+        return AgentMessage(self.sender, self.recipient, self.content, self.intent, self.payload, self.duration_ms)
+
+
+class JsonLinesSink:
+    """
+    Writes messages as compact JSON lines from a background thread.
+
+    write() never blocks: when the queue is full the message is dropped and counted in `dropped`.
+    """
+
+    _STOP = object()
+
+    def __init__(self, path: Union[str, Path], max_queue: int = 10000, flush_every: int = 100) -> None:
+        self.path = Path(path)
+        self.flush_every = flush_every
+        self.dropped = 0
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=max_queue)
+        self._thread = threading.Thread(target=self._run, name="agent-log-sink", daemon=True)
+        self._thread.start()
+
+    def write(self, message: "AgentMessage") -> None:
+        try:
+            self._queue.put_nowait(message)
+        except queue.Full:
+            self.dropped += 1
+
+    def close(self) -> None:
+        self._queue.put(self._STOP)
+        self._thread.join()
+
+    def _run(self) -> None:
+        with open(self.path, "a", encoding="utf-8") as handle:
+            pending = 0
+            while True:
+                item = self._queue.get()
+                if item is self._STOP:
+                    break
+                record = {"sender": item.sender, "recipient": item.recipient, "intent": item.intent, "content": item.content}
+                if item.payload:
+                    record["payload"] = item.payload
+                handle.write(json.dumps(record, separators=(",", ":"), default=str) + "\n")
+                pending += 1
+                if pending >= self.flush_every or self._queue.empty():
+                    handle.flush()
+                    pending = 0
 
 
 class AgentLogger:
-    def __init__(self) -> None:
-        self.messages: List[AgentMessage] = []
+    """
+    Records A2A messages for the transcript.
+
+    By default every message is kept, as in the demo. For long-running processes:
+    - capacity bounds the in-memory transcript to the most recent messages (ring buffer);
+    - sample_rates keeps only a fraction of messages per intent, e.g. {"get_customer": 0.1};
+    - payload_mode "truncate" shortens each payload value to max_payload_chars, "drop" removes payloads;
+    - sink receives every sampled message, e.g. a JsonLinesSink streaming to a file.
+    """
+
+    PAYLOAD_MODES = ("full", "truncate", "drop")
+
+    def __init__(
+        self,
+        capacity: Optional[int] = None,
+        sample_rates: Optional[Dict[str, float]] = None,
+        payload_mode: str = "full",
+        max_payload_chars: int = 200,
+        sink: Optional[JsonLinesSink] = None,
+        seed: Optional[int] = None,
+    ) -> None:
+        if payload_mode not in self.PAYLOAD_MODES:
+            raise ValueError(f"payload_mode must be one of {self.PAYLOAD_MODES}, got {payload_mode!r}")
+        self.messages: Union[List[AgentMessage], Deque[AgentMessage]] = [] if capacity is None else deque(maxlen=capacity)
+        self.sample_rates = sample_rates or {}
+        self.payload_mode = payload_mode
+        self.max_payload_chars = max_payload_chars
+        self.sink = sink
+        self._random = random.Random(seed)
 
     def record(self, message: AgentMessage) -> None:
+        rate = self.sample_rates.get(message.intent or "")
+        if rate is not None and self._random.random() >= rate:
+            return
+        if message.payload and self.payload_mode != "full":
+            # Agents keep using the original message, so store a trimmed copy instead of mutating it.
+            message = replace(message, payload=self._trim_payload(message.payload))
         self.messages.append(message)
+        if self.sink is not None:
+            self.sink.write(message)
+
+    def _trim_payload(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        if self.payload_mode == "drop":
+            return {}
+        limit = self.max_payload_chars
+        trimmed: Dict[str, Any] = {}
+        for key, value in payload.items():
+            if value is None or isinstance(value, (bool, int, float)):
+                trimmed[key] = value
+                continue
+            text = value if isinstance(value, str) else repr(value)
+            trimmed[key] = text if len(text) <= limit else text[:limit] + f"...(+{len(text) - limit} chars)"
+        return trimmed
 
     def dump(self) -> List[AgentMessage]:
-        return self.messages
+        return self.messages if isinstance(self.messages, list) else list(self.messages)
 
-    def print_log(self) -> None:
-        for msg in self.messages:
+    def iter_lines(self) -> Iterator[str]:
+        for msg in list(self.messages):
             payload = f" | payload={msg.payload}" if msg.payload else ""
-            print(f"[{msg.sender} -> {msg.recipient}] {msg.intent or ''} {msg.content}{payload}")
+            duration = f" ({msg.duration_ms:.2f} ms)" if msg.duration_ms is not None else ""
+            yield f"[{msg.sender} -> {msg.recipient}]{duration} {msg.intent or ''} {msg.content}{payload}"
+
+    def print_log(self) -> None:
+        for line in self.iter_lines():
+            print(line)
+
+    def close(self) -> None:
+        if self.sink is not None:
+            self.sink.close()
+
+
+def trace_hop(handle: Callable[[Any, "AgentMessage"], "AgentMessage"]) -> Callable[[Any, "AgentMessage"], "AgentMessage"]:
+    """
+    Wrap an agent's handle() in a span and stamp the reply with the hop's duration.
+    """
+
+    @functools.wraps(handle)
+    def wrapper(self: "Agent", message: AgentMessage) -> AgentMessage:
+        if not tracing.is_enabled():
+            return handle(self, message)
+        start = time.perf_counter()
+        with tracing.span(f"{self.name}.handle", intent=message.intent or "", sender=message.sender):
+            reply = handle(self, message)
+        reply.duration_ms = (time.perf_counter() - start) * 1000
+        return reply
+
+    return wrapper
 
 
 class Agent:
@@ -33,9 +289,14 @@ class Agent:
         self.logger = logger
 
     def send(self, recipient: str, content: str, intent: Optional[str] = None, payload: Optional[Dict[str, Any]] = None) -> AgentMessage:
-        message = AgentMessage(sender=self.name, recipient=recipient, content=content, intent=intent, payload=payload or {})
-        self.logger.record(message)
+        with tracing.span("agent.send", sender=self.name, recipient=recipient, intent=intent or ""):
+            message = AgentMessage(sender=self.name, recipient=recipient, content=content, intent=intent, payload=payload or None)
+            self.logger.record(message)
         return message
 
     def handle(self, message: AgentMessage) -> AgentMessage:
         raise NotImplementedError("Agents must implement handle()")
+
+    async def handle_async(self, message: AgentMessage) -> AgentMessage:
+        # Default: treat handle() as blocking and offload it to the shared executor.
+        return await run_blocking(self.handle, message)
@@ -1,19 +1,25 @@
-from typing import Dict, List, Optional
+from typing import Dict, Iterator, List, Optional, Tuple
 
 import db
-from agents.base import Agent, AgentMessage
+from agents.base import Agent, AgentMessage, run_blocking, trace_hop
+from storage import SQLiteBackend, StorageBackend
 
 
 class CustomerDataAgent(Agent):
     """
     Specialist agent that wraps MCP data access tools.
     For the demo it calls the same functions used by the MCP server.
+
+    Data comes from `backend` when given (e.g. storage.MemoryBackend), otherwise from the
+    SQLite database at `db_path`.
     """
 
-    def __init__(self, logger, db_path: Optional[str] = None) -> None:
+    def __init__(self, logger, db_path: Optional[str] = None, backend: Optional[StorageBackend] = None) -> None:
         super().__init__("customer-data-agent", logger)
         self.db_path = db_path
+        self.backend = backend if backend is not None else SQLiteBackend(db_path or db.DB_PATH)
 
+    @trace_hop
     def handle(self, message: AgentMessage) -> AgentMessage:
         intent = message.intent or "info"
         payload = message.payload or {}
@@ -22,31 +28,104 @@ class CustomerDataAgent(Agent):
 
         if intent == "get_customer":
             customer_id = int(payload["customer_id"])
-            customer = db.get_customer(customer_id, db_path=self.db_path or db.DB_PATH)
+            customer = self.backend.get_customer(customer_id)
             response_payload["customer"] = customer
             content = f"Customer {customer_id} fetched"
+        elif intent == "get_customers":
+            customers = self.backend.get_customers(payload["customer_ids"])
+            response_payload["customers"] = customers
+            content = f"Fetched {len(customers)} customers in one batch"
         elif intent == "list_customers":
-            customers = db.list_customers(payload.get("status"), limit=payload.get("limit", 10), db_path=self.db_path or db.DB_PATH)
+            limit = payload.get("limit", 10)
+            customers = self.backend.list_customers(payload.get("status"), limit=limit, after=payload.get("cursor"))
             response_payload["customers"] = customers
+            response_payload["next_cursor"] = db.next_page_cursor(customers, limit)
             content = f"Listed {len(customers)} customers"
         elif intent == "update_customer":
-            updated = db.update_customer(payload["customer_id"], data=payload.get("data", {}), db_path=self.db_path or db.DB_PATH)
+            updated = self.backend.update_customer(payload["customer_id"], data=payload.get("data", {}))
             response_payload["customer"] = updated
             content = f"Customer {payload['customer_id']} updated"
         elif intent == "create_ticket":
-            ticket = db.create_ticket(
+            ticket = self.backend.create_ticket(
                 payload["customer_id"],
                 payload["issue"],
                 priority=payload.get("priority", "medium"),
                 status=payload.get("status", "open"),
-                db_path=self.db_path or db.DB_PATH,
             )
             response_payload["ticket"] = ticket
             content = f"Ticket created for customer {payload['customer_id']}"
+        elif intent == "create_tickets":
+            tickets = self.backend.create_tickets(payload["tickets"])
+            response_payload["tickets"] = tickets
+            content = f"Created {len(tickets)} tickets in one batch"
         elif intent == "get_history":
-            history = db.get_customer_history(payload["customer_id"], db_path=self.db_path or db.DB_PATH)
+            if payload.get("stream"):
+                # Rows are read lazily as the consumer iterates, e.g. SupportAgent._format_history.
+                history = self.backend.iter_customer_history(payload["customer_id"])
+            elif payload.get("limit") is not None or payload.get("cursor"):
+                # One keyset page; pass next_cursor back as "cursor" for the following one.
+                history = self.backend.get_customer_history(
+                    payload["customer_id"], limit=payload.get("limit"), after=payload.get("cursor")
+                )
+                response_payload["next_cursor"] = db.next_page_cursor(history, payload.get("limit"))
+            else:
+                history = self.backend.get_customer_history(payload["customer_id"])
             response_payload["history"] = history
             content = f"Fetched history for customer {payload['customer_id']}"
+        elif intent == "get_histories":
+            histories = self.backend.get_customer_histories(payload["customer_ids"])
+            response_payload["histories"] = histories
+            content = f"Fetched history for {len(histories)} customers in one batch"
+        elif intent == "open_tickets_for_customers":
+            limit = payload.get("limit", 100)
+            tickets = self.backend.list_open_tickets_for_customers(
+                payload.get("customer_status", "active"),
+                priority=payload.get("priority"),
+                limit=limit,
+                after=payload.get("cursor"),
+            )
+            response_payload["tickets"] = tickets
+            response_payload["next_cursor"] = db.open_ticket_cursor(tickets[-1]) if len(tickets) == limit else None
+            content = f"Fetched {len(tickets)} open tickets for {payload.get('customer_status', 'active')} customers"
+        elif intent == "customers_with_open_tickets":
+            customers = self.backend.list_customers_with_open_tickets(
+                payload.get("status", "active"), limit=payload.get("limit", 50)
+            )
+            response_payload["customers"] = customers
+            content = f"Listed {len(customers)} customers with open tickets"
+        elif intent == "open_ticket_summary":
+            if payload.get("customer_id") is not None:
+                summary = self.backend.get_open_ticket_summary(int(payload["customer_id"]))
+                content = f"Open-ticket summary for customer {payload['customer_id']}"
+            else:
+                summary = self.backend.get_open_ticket_totals(payload.get("customer_status"))
+                content = f"Open-ticket totals for {payload.get('customer_status') or 'all'} customers"
+            response_payload["summary"] = summary
+        elif intent == "search_tickets":
+            tickets = self.backend.search_tickets(
+                payload.get("query", ""),
+                limit=payload.get("limit", 10),
+                open_only=payload.get("open_only", False),
+                match_all=payload.get("match_all", False),
+            )
+            response_payload["tickets"] = tickets
+            content = f"Found {len(tickets)} tickets matching {payload.get('query', '')!r}"
+        elif intent == "search_tickets_batch":
+            # One hop for a batch of searches; queries with the same search terms share a lookup.
+            found: Dict[Tuple[str, ...], List[dict]] = {}
+            results = []
+            for query in payload.get("queries", []):
+                key = tuple(sorted(db.search_terms(query)))
+                if key not in found:
+                    found[key] = self.backend.search_tickets(
+                        query,
+                        limit=payload.get("limit", 10),
+                        open_only=payload.get("open_only", False),
+                        match_all=payload.get("match_all", False),
+                    )
+                results.append(found[key])
+            response_payload["results"] = results
+            content = f"Ran {len(found)} searches for {len(results)} queries"
         else:
             content = f"Unknown intent: {intent}"
 
@@ -60,14 +139,20 @@ class CustomerDataAgent(Agent):
         self.logger.record(reply)
         return reply
 
+    async def handle_async(self, message: AgentMessage) -> AgentMessage:
+        # Blocking backends (SQLite) run on the bounded executor; in-memory ones answer inline.
+        if not self.backend.blocking:
+            return self.handle(message)
+        return await run_blocking(self.handle, message)
+
     def get_open_tickets_for_active_customers(self, priority: Optional[str] = None) -> List[dict]:
         """
         Helper used in multi-step coordination.
         """
-        customers = db.list_customers(status="active", limit=100, db_path=self.db_path or db.DB_PATH)
-        active_ids = {c["id"] for c in customers}
-        tickets = db.list_open_tickets(db_path=self.db_path or db.DB_PATH)
-        results = [t for t in tickets if t["customer_id"] in active_ids]
-        if priority:
-            results = [t for t in results if t.get("priority") == priority]
-        return results
+        return [t for page in self.iter_open_tickets_for_active_customers(priority) for t in page]
+
+    def iter_open_tickets_for_active_customers(self, priority: Optional[str] = None, page_size: int = 500) -> Iterator[List[dict]]:
+        """
+        Stream open tickets of active customers page by page; the join runs in the backend.
+        """
+        return self.backend.iter_open_tickets_for_customers("active", priority=priority, page_size=page_size)
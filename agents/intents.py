@@ -0,0 +1,149 @@
+import json
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, FrozenSet, List, Optional, Sequence, Tuple
+
+
+@dataclass(frozen=True)
+class Term:
+    """
+    A phrase the detector looks for. `implies` names other terms that count as seen when this
+    one matches (e.g. "charged twice" also counts as "charged"); named groups in `pattern`
+    are captured as entities.
+    """
+
+    name: str
+    pattern: str
+    implies: Tuple[str, ...] = ()
+
+
+@dataclass(frozen=True)
+class IntentRule:
+    intent: str
+    all_of: Tuple[str, ...]
+
+
+# Customer an intent acts on when the query names none (the demo's signed-in customers).
+DEFAULT_CUSTOMER_IDS: Dict[str, int] = {
+    "upgrade": 12345,
+    "cancel_and_billing": 12345,
+    "update_email_and_history": 5,
+}
+
+
+@dataclass(frozen=True)
+class IntentMatch:
+    intent: str
+    customer_id: Optional[int] = None
+    email: Optional[str] = None
+
+    @property
+    def resolved_customer_id(self) -> Optional[int]:
+        """
+        The customer the router acts on: the one named in the query, else the intent's default.
+        """
+        return self.customer_id or DEFAULT_CUSTOMER_IDS.get(self.intent)
+
+
+DEFAULT_TERMS: List[Term] = [
+    Term("update_email", r"update my email to (?P<email>[^\s]+)", implies=("update_my_email",)),
+    Term("customer_ref", r"(?:id|customer)\s*(?P<customer_id>\d+)"),
+    Term("charged_twice", r"charged twice", implies=("charged",)),
+    Term("charged", r"charged"),
+    Term("refund", r"refund"),
+    Term("high_priority", r"high[- ]priority"),
+    Term("cancel", r"cancel"),
+    Term("billing", r"billing"),
+    Term("upgrade", r"upgrad"),
+    Term("update_my_email", r"update my email"),
+    Term("history", r"history"),
+    Term("open_tickets", r"open tickets"),
+    Term("active_customers", r"active customers"),
+    Term("customer_information", r"customer information"),
+]
+
+# Rules are checked in order; the first whose terms were all seen wins.
+DEFAULT_RULES: List[IntentRule] = [
+    IntentRule("cancel_and_billing", ("charged_twice",)),
+    IntentRule("cancel_and_billing", ("refund", "charged")),
+    IntentRule("high_priority_report", ("high_priority",)),
+    IntentRule("cancel_and_billing", ("cancel", "billing")),
+    IntentRule("upgrade", ("upgrade",)),
+    IntentRule("update_email_and_history", ("update_my_email", "history")),
+    IntentRule("active_with_open_tickets", ("open_tickets", "active_customers")),
+    IntentRule("customer_info", ("customer_information",)),
+]
+
+DEFAULT_INTENT = "general_support"
+
+
+class IntentDetector:
+    """
+    Compiles a term table into one regex and resolves intent plus entities in a single scan.
+
+    Every term is an alternative inside a zero-width lookahead, so one finditer pass over the
+    lowercased text reports matches at every position, including overlapping ones.
+    """
+
+    def __init__(
+        self,
+        terms: Sequence[Term] = DEFAULT_TERMS,
+        rules: Sequence[IntentRule] = DEFAULT_RULES,
+        default_intent: str = DEFAULT_INTENT,
+        cache_size: int = 1024,
+    ) -> None:
+        known = {term.name for term in terms}
+        for rule in rules:
+            unknown = set(rule.all_of) - known
+            if unknown:
+                raise ValueError(f"Rule for {rule.intent!r} references unknown terms: {sorted(unknown)}")
+        self.default_intent = default_intent
+        self._rules: List[Tuple[str, FrozenSet[str]]] = [(rule.intent, frozenset(rule.all_of)) for rule in rules]
+        self._seen_by_group: Dict[str, FrozenSet[str]] = {}
+        self._entities_by_group: Dict[str, Tuple[str, ...]] = {}
+        alternatives = []
+        for index, term in enumerate(terms):
+            group = f"t{index}"
+            self._seen_by_group[group] = frozenset((term.name,) + term.implies)
+            self._entities_by_group[group] = tuple(re.compile(term.pattern).groupindex)
+            alternatives.append(f"(?P<{group}>{term.pattern})")
+        self._pattern = re.compile("(?=" + "|".join(alternatives) + ")")
+        # Handlers re-read entities for the query they were dispatched with; memoize the scan.
+        self.detect = lru_cache(maxsize=cache_size)(self._detect)
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> "IntentDetector":
+        terms = [Term(t["name"], t["pattern"], tuple(t.get("implies", ()))) for t in config["terms"]]
+        rules = [IntentRule(r["intent"], tuple(r["all_of"])) for r in config["rules"]]
+        return cls(terms, rules, config.get("default_intent", DEFAULT_INTENT))
+
+    @classmethod
+    def from_json(cls, path: Path) -> "IntentDetector":
+        """
+        Load a rule table of the form {"terms": [...], "rules": [...], "default_intent": "..."}.
+        """
+        with open(path, encoding="utf-8") as handle:
+            return cls.from_config(json.load(handle))
+
+    def _detect(self, query: str) -> IntentMatch:
+        seen = set()
+        entities: Dict[str, str] = {}
+        for match in self._pattern.finditer(query.lower()):
+            group = match.lastgroup
+            seen |= self._seen_by_group[group]
+            for name in self._entities_by_group[group]:
+                # First occurrence wins, like re.search.
+                if name not in entities:
+                    entities[name] = match.group(name)
+        intent = self.default_intent
+        for rule_intent, required in self._rules:
+            if required <= seen:
+                intent = rule_intent
+                break
+        customer_id = entities.get("customer_id")
+        return IntentMatch(intent, int(customer_id) if customer_id else None, entities.get("email"))
+
+
+DEFAULT_DETECTOR = IntentDetector()
@@ -1,27 +1,350 @@
-import re
-from typing import Dict, List, Optional, Tuple
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Awaitable, Dict, Hashable, Iterator, List, Optional, Sequence, Tuple
 
-from agents.base import Agent, AgentMessage, AgentLogger
+import tracing
+from agents.base import Agent, AgentMessage, AgentLogger, run_blocking
 from agents.customer_data_agent import CustomerDataAgent
+from agents.intents import DEFAULT_CUSTOMER_IDS, DEFAULT_DETECTOR, IntentDetector
 from agents.support_agent import SupportAgent
+from cache import LRUCache
+
+# Intents whose response depends only on stored data (and the customer id), never changing it.
+READ_ONLY_INTENTS = frozenset({"customer_info", "upgrade", "high_priority_report", "active_with_open_tickets"})
+# Report responses do not depend on the query, so they share one cache entry per intent.
+REPORT_INTENTS = frozenset({"high_priority_report", "active_with_open_tickets"})
+
+# Tickets per get_history / open-ticket page; SupportAgent asks for further pages only if it
+# renders past one.
+HISTORY_PAGE_SIZE = 50
+OPEN_TICKETS_PAGE_SIZE = 500
+
+# (cache, key) pairs a response is memoized under.
+Memo = List[Tuple[LRUCache, Hashable]]
+
+
+def normalize_query(query: str) -> str:
+    """
+    Case- and whitespace-insensitive form of a query, so retried messages compare equal.
+    """
+    return " ".join(query.lower().split())
 
 
 class RouterAgent(Agent):
     """
     Orchestrates intent detection, task allocation, negotiation, and multi-step flows.
+
+    Redelivered requests can be answered from memory instead of rerunning the flow. With
+    dedup_window > 0, a response is remembered for that many seconds under the caller's
+    request_id, or else under the normalized query and customer id, and a repeat (including
+    one that arrives while the first is still running) gets the same response without any
+    data or support hops. With read_cache_ttl > 0, READ_ONLY_INTENTS responses are also shared
+    between different wordings for the same customer (or report) for that long. Both caches
+    are LRU-bounded; both are off by default.
     """
 
-    def __init__(self, logger: AgentLogger, data_agent: CustomerDataAgent, support_agent: SupportAgent) -> None:
+    def __init__(
+        self,
+        logger: AgentLogger,
+        data_agent: CustomerDataAgent,
+        support_agent: SupportAgent,
+        intent_detector: IntentDetector = DEFAULT_DETECTOR,
+        dedup_window: float = 0.0,
+        dedup_size: int = 4096,
+        read_cache_ttl: float = 0.0,
+        read_cache_size: int = 1024,
+        report_limit: Optional[int] = None,
+    ) -> None:
         super().__init__("router-agent", logger)
+        # Ticket lines shown per report; the rest is summarized as "... showing 50 of 3,214".
+        self.report_limit = report_limit
         self.data_agent = data_agent
         self.support_agent = support_agent
+        self.intent_detector = intent_detector
+        self.responses = LRUCache(dedup_size if dedup_window > 0 else 0, ttl=dedup_window)
+        self.read_cache = LRUCache(read_cache_size if read_cache_ttl > 0 else 0, ttl=read_cache_ttl)
+        self._memo_lock = threading.Lock()
+        self._in_flight: Dict[Hashable, Future] = {}
 
-    def handle_user_query(self, query: str) -> Dict[str, str]:
+    def handle_user_query(self, query: str, request_id: Optional[str] = None) -> Dict[str, str]:
         """
         Entry point for user requests. Returns the final response and a transcript reference.
+        request_id identifies redeliveries of the same request (see dedup_window).
+        """
+        with tracing.span("router.handle_user_query") as query_span:
+            intent = self._detect_intent(query)
+            if tracing.is_enabled():
+                query_span.attributes["intent"] = intent
+            self.send("user", f"Received query: {query}", intent=intent)
+            memo = self._memo(intent, query, request_id)
+            if not memo:
+                try:
+                    return self._dispatch(intent, query)
+                finally:
+                    self._invalidate_after(intent, query)
+            future, owner = self._claim(memo)
+            if not owner:
+                self._replayed(intent)
+                return dict(future.result())
+            try:
+                response = self._dispatch(intent, query)
+            except BaseException as exc:
+                self._settle(memo, future, error=exc)
+                raise
+            finally:
+                # Also after a failure: the write may have landed before the error.
+                self._invalidate_after(intent, query)
+            self._settle(memo, future, response)
+            return dict(response)
+
+    def iter_user_query(self, query: str) -> Iterator[str]:
+        """
+        Like handle_user_query(), but a report comes back line by line while its pages are still
+        being read, so a caller can send the first lines right away. Reports streamed this way
+        bypass dedup and the read cache; other intents yield the lines of the finished response.
         """
         intent = self._detect_intent(query)
+        if intent not in REPORT_INTENTS:
+            return iter(self.handle_user_query(query)["response"].splitlines())
         self.send("user", f"Received query: {query}", intent=intent)
+        if intent == "high_priority_report":
+            request = self._high_priority_report_request(stream=True)
+        else:
+            request = self._active_with_open_tickets_request(stream=True)
+        return self.support_agent.handle(request).payload["lines"]
+
+    async def handle_user_query_async(self, query: str, request_id: Optional[str] = None) -> Dict[str, str]:
+        """
+        Async entry point. Independent sub-requests run concurrently and DB work goes to the
+        shared executor, so many queries can be awaited together (e.g. with asyncio.gather).
+        """
+        with tracing.span("router.handle_user_query_async") as query_span:
+            intent = self._detect_intent(query)
+            if tracing.is_enabled():
+                query_span.attributes["intent"] = intent
+            self.send("user", f"Received query: {query}", intent=intent)
+            memo = self._memo(intent, query, request_id)
+            if not memo:
+                try:
+                    return await self._dispatch_async(intent, query)
+                finally:
+                    self._invalidate_after(intent, query)
+            future, owner = self._claim(memo)
+            if not owner:
+                self._replayed(intent)
+                return dict(await asyncio.wrap_future(future))
+            try:
+                response = await self._dispatch_async(intent, query)
+            except BaseException as exc:
+                self._settle(memo, future, error=exc)
+                raise
+            finally:
+                # Also after a failure: the write may have landed before the error.
+                self._invalidate_after(intent, query)
+            self._settle(memo, future, response)
+            return dict(response)
+
+    def _dispatch_async(self, intent: str, query: str) -> Awaitable[Dict[str, str]]:
+        if intent == "cancel_and_billing":
+            return self._handle_billing_negotiation_async(query)
+        if intent == "active_with_open_tickets":
+            return self._handle_active_with_open_tickets_async(query)
+        if intent == "update_email_and_history":
+            return self._handle_update_and_history_async(query)
+        # The remaining flows are strictly sequential; run them off the event loop as a whole.
+        return run_blocking(self._dispatch, intent, query)
+
+    def handle_user_queries(self, queries: Sequence[str]) -> List[Dict[str, str]]:
+        """
+        Batch entry point for high-volume replay. Queries are grouped by intent, customer lookups
+        for the whole batch are coalesced into single IN (...) queries, and report intents are
+        computed once per batch. Responses are returned in input order. Customer lookups reflect
+        the database as of the start of the batch, before any email updates in the same batch.
+        With memoization on, remembered queries are answered from memory and repeats within the
+        batch run once.
+        """
+        with tracing.span("router.handle_user_queries", batch_size=len(queries)):
+            if not (self.responses.maxsize or self.read_cache.maxsize):
+                return self._handle_batch(queries)
+            return self._handle_batch_memoized(queries)
+
+    def _handle_batch_memoized(self, queries: Sequence[str]) -> List[Dict[str, str]]:
+        intents = [self._detect_intent(query) for query in queries]
+        memos = [self._memo(intent, query, None) for intent, query in zip(intents, queries)]
+        results: List[Optional[Dict[str, str]]] = [self._remembered(memo) for memo in memos]
+        # First occurrence of each memo key among the misses runs; later ones copy its response.
+        first: Dict[Hashable, int] = {}
+        for index, memo in enumerate(memos):
+            if results[index] is None and memo:
+                first.setdefault(memo[0][1], index)
+        todo = [i for i, memo in enumerate(memos) if results[i] is None and (not memo or first[memo[0][1]] == i)]
+        for index, response in zip(todo, self._handle_batch([queries[i] for i in todo])):
+            results[index] = response
+            for cache, key in memos[index]:
+                cache.set(key, response)
+            self._invalidate_after(intents[index], queries[index])
+        for index, memo in enumerate(memos):
+            if results[index] is None:
+                results[index] = results[first[memo[0][1]]]
+        return [dict(r) for r in results]  # type: ignore[arg-type]
+
+    def _memo(self, intent: str, query: str, request_id: Optional[str]) -> Memo:
+        memo: Memo = []
+        if self.responses.maxsize:
+            if request_id is not None:
+                memo.append((self.responses, ("request", request_id)))
+            else:
+                memo.append((self.responses, ("query", normalize_query(query), self._extract_customer_id(query))))
+        if self.read_cache.maxsize and intent in READ_ONLY_INTENTS:
+            memo.append((self.read_cache, self._read_key(intent, query)))
+        return memo
+
+    def _read_key(self, intent: str, query: str) -> Hashable:
+        if intent in REPORT_INTENTS:
+            return (intent,)
+        return (intent, self._batch_customer_id(intent, query))
+
+    def _remembered(self, memo: Memo) -> Optional[Dict[str, str]]:
+        for cache, key in memo:
+            response = cache.get(key)
+            if response is not None:
+                return response
+        return None
+
+    def _claim(self, memo: Memo) -> Tuple[Future, bool]:
+        """
+        Future for the response under memo, and whether the caller owns it: the owner runs the
+        flow and must _settle() the future; everyone else waits for (or already has) the result.
+        """
+        with self._memo_lock:
+            remembered = self._remembered(memo)
+            if remembered is not None:
+                future: Future = Future()
+                future.set_result(remembered)
+                return future, False
+            for _, key in memo:
+                if key in self._in_flight:
+                    return self._in_flight[key], False
+            future = Future()
+            for _, key in memo:
+                self._in_flight[key] = future
+            return future, True
+
+    def _settle(
+        self, memo: Memo, future: Future, response: Optional[Dict[str, str]] = None, error: Optional[BaseException] = None
+    ) -> None:
+        # Failures are not remembered: waiting duplicates see the error, later retries run again.
+        with self._memo_lock:
+            for cache, key in memo:
+                if self._in_flight.get(key) is future:
+                    del self._in_flight[key]
+                if error is None:
+                    cache.set(key, response)
+        if error is None:
+            future.set_result(response)
+        else:
+            future.set_exception(error)
+
+    def _replayed(self, intent: str) -> None:
+        self.send("user", "Duplicate request: replaying the memoized response", intent=intent)
+
+    def _invalidate_after(self, intent: str, query: str) -> None:
+        # A profile write through this router must not be hidden by a cached read for the same customer.
+        if intent == "update_email_and_history" and self.read_cache.maxsize:
+            customer_id, _ = self._parse_update_and_history(query)
+            self.read_cache.invalidate(("customer_info", customer_id))
+            self.read_cache.invalidate(("upgrade", customer_id))
+
+    def _handle_batch(self, queries: Sequence[str]) -> List[Dict[str, str]]:
+        intents = [self._detect_intent(query) for query in queries]
+        groups: Dict[str, List[int]] = {}
+        for index, (query, intent) in enumerate(zip(queries, intents)):
+            self.send("user", f"Received query: {query}", intent=intent)
+            groups.setdefault(intent, []).append(index)
+
+        customer_ids = {
+            self._batch_customer_id(intent, queries[index])
+            for intent in ("customer_info", "upgrade", "cancel_and_billing")
+            for index in groups.get(intent, [])
+        }
+        customer_ids.discard(None)
+        customers: Dict[int, dict] = {}
+        if customer_ids:
+            request = self.send(
+                self.data_agent.name,
+                f"Fetch {len(customer_ids)} customers for batch",
+                intent="get_customers",
+                payload={"customer_ids": sorted(customer_ids)},
+            )
+            customers = self.data_agent.handle(request).payload.get("customers", {})
+
+        results: List[Optional[Dict[str, str]]] = [None] * len(queries)
+        for intent, indexes in groups.items():
+            if intent == "customer_info":
+                for index in indexes:
+                    customer = customers.get(self._batch_customer_id(intent, queries[index]))
+                    results[index] = {"response": self._customer_summary(customer)}
+            elif intent == "upgrade":
+                for index in indexes:
+                    customer = customers.get(self._batch_customer_id(intent, queries[index]))
+                    results[index] = self._upgrade_with_customer(customer)
+            elif intent == "cancel_and_billing":
+                billing_queries = [queries[index] for index in indexes]
+                for query in billing_queries:
+                    self.support_agent.handle(self._billing_probe_request(query))
+                # One search hop for the whole group instead of one per query.
+                search_request = self.send(
+                    self.data_agent.name,
+                    f"Find open tickets similar to {len(billing_queries)} billing issues",
+                    intent="search_tickets_batch",
+                    payload={"queries": billing_queries, "limit": 3, "open_only": True},
+                )
+                similar = self.data_agent.handle(search_request).payload.get("results", [])
+                for index, query, similar_tickets in zip(indexes, billing_queries, similar):
+                    customer = customers.get(self._batch_customer_id(intent, query))
+                    results[index] = self._billing_reply(customer, query, similar_tickets)
+            elif intent == "update_email_and_history":
+                for index, result in zip(indexes, self._batch_update_and_history([queries[i] for i in indexes])):
+                    results[index] = result
+            elif intent in ("high_priority_report", "active_with_open_tickets"):
+                # Report intents ignore the query text, so one run answers the whole group.
+                shared = self._dispatch(intent, queries[indexes[0]])
+                for index in indexes:
+                    results[index] = shared
+            else:
+                for index in indexes:
+                    results[index] = self._dispatch(intent, queries[index])
+        return results  # type: ignore[return-value]
+
+    def _batch_customer_id(self, intent: str, query: str) -> Optional[int]:
+        return self._extract_customer_id(query) or DEFAULT_CUSTOMER_IDS.get(intent)
+
+    def _batch_update_and_history(self, queries: List[str]) -> List[Dict[str, str]]:
+        # Writes stay per query; the histories they feed are read back in one batch afterwards.
+        targets = [self._parse_update_and_history(query) for query in queries]
+        updated = [self.data_agent.handle(self._update_email_request(cid, email)) for cid, email in targets]
+        histories_request = self.send(
+            self.data_agent.name,
+            f"Get history for {len(targets)} customers",
+            intent="get_histories",
+            payload={"customer_ids": sorted({cid for cid, _ in targets})},
+        )
+        histories = self.data_agent.handle(histories_request).payload.get("histories", {})
+        results = []
+        for (customer_id, _), update_reply in zip(targets, updated):
+            support_request = AgentMessage(
+                sender=self.name,
+                recipient=self.support_agent.name,
+                content="Share updated profile plus history",
+                intent="history",
+                payload={"customer": update_reply.payload.get("customer"), "history": histories.get(customer_id, [])},
+            )
+            self.logger.record(support_request)
+            results.append({"response": self.support_agent.handle(support_request).content})
+        return results
+
+    def _dispatch(self, intent: str, query: str) -> Dict[str, str]:
         if intent == "customer_info":
             return self._handle_customer_info(query)
         if intent == "upgrade":
@@ -41,26 +364,11 @@ class RouterAgent(Agent):
         return {"response": response.content}
 
     def _detect_intent(self, query: str) -> str:
-        text = query.lower()
-        if "charged twice" in text or ("refund" in text and "charged" in text):
-            return "cancel_and_billing"
-        if "high-priority" in text or "high priority" in text:
-            return "high_priority_report"
-        if "cancel" in text and "billing" in text:
-            return "cancel_and_billing"
-        if "upgrade" in text or "upgrad" in text:
-            return "upgrade"
-        if "update my email" in text and "history" in text:
-            return "update_email_and_history"
-        if "open tickets" in text and "active customers" in text:
-            return "active_with_open_tickets"
-        if "customer information" in text or text.startswith("get customer information"):
-            return "customer_info"
-        return "general_support"
+        with tracing.span("router.detect_intent"):
+            return self.intent_detector.detect(query).intent
 
     def _extract_customer_id(self, text: str) -> Optional[int]:
-        match = re.search(r"(?:id|customer)\s*(\d+)", text.lower())
-        return int(match.group(1)) if match else None
+        return self.intent_detector.detect(text).customer_id
 
     def _handle_customer_info(self, query: str) -> Dict[str, str]:
         customer_id = self._extract_customer_id(query)
@@ -71,14 +379,15 @@ class RouterAgent(Agent):
             payload={"customer_id": customer_id},
         )
         reply = self.data_agent.handle(request)
-        customer = reply.payload.get("customer")
+        return {"response": self._customer_summary(reply.payload.get("customer"))}
+
+    def _customer_summary(self, customer: Optional[dict]) -> str:
         if not customer:
-            return {"response": "Customer not found."}
-        summary = f"Customer {customer['id']}: {customer['name']} ({customer['status']}). Email: {customer['email']}, Phone: {customer['phone']}."
-        return {"response": summary}
+            return "Customer not found."
+        return f"Customer {customer['id']}: {customer['name']} ({customer['status']}). Email: {customer['email']}, Phone: {customer['phone']}."
 
     def _handle_upgrade(self, query: str) -> Dict[str, str]:
-        customer_id = self._extract_customer_id(query) or 12345
+        customer_id = self._extract_customer_id(query) or DEFAULT_CUSTOMER_IDS["upgrade"]
         data_request = self.send(
             self.data_agent.name,
             f"Need data for upgrade for customer {customer_id}",
@@ -86,12 +395,15 @@ class RouterAgent(Agent):
             payload={"customer_id": customer_id},
         )
         data_reply = self.data_agent.handle(data_request)
+        return self._upgrade_with_customer(data_reply.payload.get("customer"))
+
+    def _upgrade_with_customer(self, customer: Optional[dict]) -> Dict[str, str]:
         support_request = AgentMessage(
             sender=self.name,
             recipient=self.support_agent.name,
             content="Provide upgrade guidance",
             intent="upgrade",
-            payload={"customer": data_reply.payload.get("customer")},
+            payload={"customer": customer},
         )
         self.logger.record(support_request)
         support_reply = self.support_agent.handle(support_request)
@@ -99,18 +411,11 @@ class RouterAgent(Agent):
 
     def _handle_billing_negotiation(self, query: str) -> Dict[str, str]:
         # Negotiation: support requests billing context, router fetches via data agent, then loops back.
-        support_probe = AgentMessage(
-            sender=self.name,
-            recipient=self.support_agent.name,
-            content="Can you handle cancellation plus billing?",
-            intent="billing_help",
-            payload={"issue": query},
-        )
-        self.logger.record(support_probe)
+        support_probe = self._billing_probe_request(query)
         # Support replies asking for context
         support_reply = self.support_agent.handle(support_probe)
         # Router fetches customer data for billing context
-        customer_id = self._extract_customer_id(query) or 12345
+        customer_id = self._extract_customer_id(query) or DEFAULT_CUSTOMER_IDS["cancel_and_billing"]
         data_request = self.send(
             self.data_agent.name,
             "Need billing context for cancellation and double charge",
@@ -118,99 +423,214 @@ class RouterAgent(Agent):
             payload={"customer_id": customer_id},
         )
         data_reply = self.data_agent.handle(data_request)
+        return self._billing_with_customer(data_reply.payload.get("customer"), query)
+
+    def _billing_probe_request(self, query: str) -> AgentMessage:
+        support_probe = AgentMessage(
+            sender=self.name,
+            recipient=self.support_agent.name,
+            content="Can you handle cancellation plus billing?",
+            intent="billing_help",
+            payload={"issue": query},
+        )
+        self.logger.record(support_probe)
+        return support_probe
+
+    def _similar_tickets_request(self, query: str) -> AgentMessage:
+        # Ranked lookup on the ticket search index, not a scan of the tickets table.
+        return self.send(
+            self.data_agent.name,
+            "Find open tickets similar to this billing issue",
+            intent="search_tickets",
+            payload={"query": query, "limit": 3, "open_only": True},
+        )
+
+    def _billing_enriched_request(self, customer: Optional[dict], query: str, similar_tickets: List[dict]) -> AgentMessage:
         enriched_request = AgentMessage(
             sender=self.name,
             recipient=self.support_agent.name,
             content="Provide coordinated cancellation + billing resolution",
             intent="billing_help",
-            payload={"customer": data_reply.payload.get("customer"), "issue": query},
+            payload={"customer": customer, "issue": query, "similar_tickets": similar_tickets},
         )
         self.logger.record(enriched_request)
-        final_reply = self.support_agent.handle(enriched_request)
+        return enriched_request
+
+    def _billing_with_customer(self, customer: Optional[dict], query: str) -> Dict[str, str]:
+        similar_reply = self.data_agent.handle(self._similar_tickets_request(query))
+        return self._billing_reply(customer, query, similar_reply.payload.get("tickets", []))
+
+    def _billing_reply(self, customer: Optional[dict], query: str, similar_tickets: List[dict]) -> Dict[str, str]:
+        final_reply = self.support_agent.handle(self._billing_enriched_request(customer, query, similar_tickets))
         return {"response": final_reply.content}
 
-    def _handle_multi_step_report(self, query: str) -> Dict[str, str]:
-        # Multi-step: fetch customers then tickets then compose report
-        customers_request = self.send(
+    async def _handle_billing_negotiation_async(self, query: str) -> Dict[str, str]:
+        # The support probe and the billing-context lookup do not depend on each other.
+        support_probe = self._billing_probe_request(query)
+        customer_id = self._extract_customer_id(query) or DEFAULT_CUSTOMER_IDS["cancel_and_billing"]
+        data_request = self.send(
             self.data_agent.name,
-            "Fetch premium customers (modeled as active for demo)",
-            intent="list_customers",
-            payload={"status": "active", "limit": 100},
+            "Need billing context for cancellation and double charge",
+            intent="get_customer",
+            payload={"customer_id": customer_id},
         )
-        customers_reply = self.data_agent.handle(customers_request)
-        customers = customers_reply.payload.get("customers", [])
-        tickets = self.data_agent.get_open_tickets_for_active_customers(priority="high")
-        support_request = AgentMessage(
-            sender=self.name,
-            recipient=self.support_agent.name,
-            content="Format high-priority ticket report",
-            intent="ticket_report",
-            payload={"tickets": tickets, "customers": customers},
+        _, data_reply, similar_reply = await asyncio.gather(
+            self.support_agent.handle_async(support_probe),
+            self.data_agent.handle_async(data_request),
+            self.data_agent.handle_async(self._similar_tickets_request(query)),
         )
-        self.logger.record(support_request)
-        support_reply = self.support_agent.handle(support_request)
+        enriched_request = self._billing_enriched_request(
+            data_reply.payload.get("customer"), query, similar_reply.payload.get("tickets", [])
+        )
+        final_reply = await self.support_agent.handle_async(enriched_request)
+        return {"response": final_reply.content}
+
+    def _handle_multi_step_report(self, query: str) -> Dict[str, str]:
+        support_reply = self.support_agent.handle(self._high_priority_report_request())
         return {"response": support_reply.content}
 
+    def _high_priority_report_request(self, stream: bool = False) -> AgentMessage:
+        # Multi-step: the customer filter and the ticket filter are pushed down into one joined query
+        first_page = self.data_agent.handle(
+            self._open_tickets_page_request(
+                "Fetch high-priority open tickets for premium customers (modeled as active for demo)", priority="high"
+            )
+        )
+        return self._ticket_report_request("Format high-priority ticket report", first_page, stream, priority="high")
+
     def _handle_active_with_open_tickets(self, query: str) -> Dict[str, str]:
+        support_reply = self.support_agent.handle(self._active_with_open_tickets_request())
+        return {"response": support_reply.content}
+
+    def _active_with_open_tickets_request(self, stream: bool = False) -> AgentMessage:
         # Negotiation between agents to combine filters
-        active_customers = self.data_agent.handle(
-            AgentMessage(
-                sender=self.name,
-                recipient=self.data_agent.name,
-                content="List active customers",
-                intent="list_customers",
-                payload={"status": "active", "limit": 50},
-            )
-        ).payload.get("customers", [])
+        customers = self.data_agent.handle(self._customers_with_open_tickets_request()).payload.get("customers", [])
+        first_page = self.data_agent.handle(self._open_tickets_page_request("Fetch open tickets for active customers"))
+        return self._combined_filters_request(first_page, customers, stream)
+
+    async def _handle_active_with_open_tickets_async(self, query: str) -> Dict[str, str]:
+        customers_reply, first_page = await asyncio.gather(
+            self.data_agent.handle_async(self._customers_with_open_tickets_request()),
+            self.data_agent.handle_async(self._open_tickets_page_request("Fetch open tickets for active customers")),
+        )
+        customers = customers_reply.payload.get("customers", [])
+        if first_page.payload.get("next_cursor") and self.support_agent.data_agent is None:
+            # The router reads the remaining pages itself (see _ticket_report_request).
+            support_request = await run_blocking(self._combined_filters_request, first_page, customers)
+        else:
+            support_request = self._combined_filters_request(first_page, customers)
+        support_reply = await self.support_agent.handle_async(support_request)
+        return {"response": support_reply.content}
+
+    def _customers_with_open_tickets_request(self) -> AgentMessage:
+        return self.send(
+            self.data_agent.name,
+            "List active customers with open tickets",
+            intent="customers_with_open_tickets",
+            payload={"status": "active", "limit": 50},
+        )
 
-        open_tickets = self.data_agent.get_open_tickets_for_active_customers()
-        relevant_ids = {t["customer_id"] for t in open_tickets}
-        filtered = [c for c in active_customers if c["id"] in relevant_ids]
+    def _combined_filters_request(self, first_page: AgentMessage, customers: List[dict], stream: bool = False) -> AgentMessage:
+        return self._ticket_report_request("Combine customer and ticket filters", first_page, stream, customers=customers)
 
+    def _ticket_report_request(
+        self,
+        content: str,
+        first_page: AgentMessage,
+        stream: bool = False,
+        priority: Optional[str] = None,
+        customers: Optional[List[dict]] = None,
+    ) -> AgentMessage:
+        # Only the first page of tickets travels with the request; with a next_cursor SupportAgent
+        # fetches the following pages from the data agent as it renders them. A SupportAgent
+        # without a data agent cannot, so it gets every page.
+        tickets = first_page.payload.get("tickets", [])
+        cursor = first_page.payload.get("next_cursor")
+        if cursor and self.support_agent.data_agent is None:
+            tickets = list(tickets)
+            while cursor:
+                page = self.data_agent.handle(self._open_tickets_page_request("Get more open tickets", priority, cursor))
+                tickets += page.payload.get("tickets", [])
+                cursor = page.payload.get("next_cursor")
+        payload: Dict[str, object] = {"tickets": tickets}
+        if priority is not None:
+            payload["priority"] = priority
+        if customers is not None:
+            payload["customers"] = customers
+        if self.report_limit is not None:
+            payload["limit"] = self.report_limit
+        if stream:
+            payload["stream"] = True
+        if cursor:
+            payload["next_cursor"] = cursor
+            payload["customer_status"] = "active"
         support_request = AgentMessage(
             sender=self.name,
             recipient=self.support_agent.name,
-            content="Combine customer and ticket filters",
+            content=content,
             intent="ticket_report",
-            payload={"tickets": open_tickets, "customers": filtered},
+            payload=payload,
         )
         self.logger.record(support_request)
-        support_reply = self.support_agent.handle(support_request)
-        return {"response": support_reply.content}
+        return support_request
+
+    def _open_tickets_page_request(self, content: str, priority: Optional[str] = None, cursor: Optional[str] = None) -> AgentMessage:
+        payload = {"customer_status": "active", "priority": priority, "limit": OPEN_TICKETS_PAGE_SIZE}
+        if cursor:
+            payload["cursor"] = cursor
+        return self.send(self.data_agent.name, content, intent="open_tickets_for_customers", payload=payload)
 
     def _handle_update_and_history(self, query: str) -> Dict[str, str]:
-        # Parallel tasks: update email + fetch history
-        customer_id = self._extract_customer_id(query) or 5
-        # parse email simple
-        email_match = re.search(r"update my email to ([^\s]+)", query.lower())
-        new_email = email_match.group(1) if email_match else None
+        # Parallel tasks: update email + fetch history (run concurrently on the async path)
+        customer_id, new_email = self._parse_update_and_history(query)
+        update_reply = self.data_agent.handle(self._update_email_request(customer_id, new_email))
+        history_reply = self.data_agent.handle(self._history_request(customer_id))
+        support_reply = self.support_agent.handle(self._share_history_request(customer_id, update_reply, history_reply))
+        return {"response": support_reply.content}
+
+    async def _handle_update_and_history_async(self, query: str) -> Dict[str, str]:
+        customer_id, new_email = self._parse_update_and_history(query)
+        update_reply, history_reply = await asyncio.gather(
+            self.data_agent.handle_async(self._update_email_request(customer_id, new_email)),
+            self.data_agent.handle_async(self._history_request(customer_id)),
+        )
+        support_reply = await self.support_agent.handle_async(
+            self._share_history_request(customer_id, update_reply, history_reply)
+        )
+        return {"response": support_reply.content}
+
+    def _parse_update_and_history(self, query: str) -> Tuple[int, Optional[str]]:
+        match = self.intent_detector.detect(query)
+        return match.customer_id or DEFAULT_CUSTOMER_IDS["update_email_and_history"], match.email
 
-        update_request = self.send(
+    def _update_email_request(self, customer_id: int, new_email: Optional[str]) -> AgentMessage:
+        return self.send(
             self.data_agent.name,
             "Update email",
             intent="update_customer",
             payload={"customer_id": customer_id, "data": {"email": new_email}},
         )
-        update_reply = self.data_agent.handle(update_request)
 
-        history_request = self.send(
-            self.data_agent.name,
-            "Get history",
-            intent="get_history",
-            payload={"customer_id": customer_id},
-        )
-        history_reply = self.data_agent.handle(history_request)
+    def _history_request(self, customer_id: int) -> AgentMessage:
+        payload = {"customer_id": customer_id}
+        if self.support_agent.data_agent is not None:
+            # Only a SupportAgent with a data agent can fetch the pages after the first.
+            payload["limit"] = HISTORY_PAGE_SIZE
+        return self.send(self.data_agent.name, "Get history", intent="get_history", payload=payload)
 
+    def _share_history_request(
+        self, customer_id: int, update_reply: AgentMessage, history_reply: AgentMessage
+    ) -> AgentMessage:
+        payload = {"customer": update_reply.payload.get("customer"), "history": history_reply.payload.get("history", [])}
+        if history_reply.payload.get("next_cursor"):
+            # Longer than one page: SupportAgent fetches the rest only as far as it renders.
+            payload["next_cursor"] = history_reply.payload["next_cursor"]
         support_request = AgentMessage(
             sender=self.name,
             recipient=self.support_agent.name,
             content="Share updated profile plus history",
             intent="history",
-            payload={
-                "customer": update_reply.payload.get("customer"),
-                "history": history_reply.payload.get("history", []),
-            },
+            payload=payload,
         )
         self.logger.record(support_request)
-        support_reply = self.support_agent.handle(support_request)
-        return {"response": support_reply.content}
+        return support_request
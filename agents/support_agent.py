@@ -1,17 +1,44 @@
-from typing import Dict, List, Optional
+import functools
+from dataclasses import replace
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Mapping, Optional, TextIO
 
-from agents.base import Agent, AgentMessage
+from agents.base import Agent, AgentMessage, run_blocking, trace_hop
+from agents.templates import ListTemplate
+
+
+_TICKET_LINE = "- Ticket {id} for customer {customer_id}: {issue} (priority={priority}, status={status})"
+HIGH_PRIORITY_REPORT = ListTemplate(
+    _TICKET_LINE,
+    empty="No high-priority open tickets found for the target customers.",
+    header="High-priority open tickets:",
+)
+OPEN_TICKET_REPORT = ListTemplate(
+    _TICKET_LINE,
+    empty="No high-priority open tickets found for the target customers.",
+    header="Open tickets for target customers:",
+)
+HISTORY = ListTemplate(
+    "- [{status}] {issue} (priority={priority}, id={id})",
+    empty="{name}, you have no ticket history yet.",
+    header="{name}, here is your ticket history:",
+)
+# Payload keys SupportAgent passes through to ListTemplate.iter_lines().
+PAGING_KEYS = ("limit", "offset", "total")
 
 
 class SupportAgent(Agent):
     """
     Handles customer-facing responses and uses context supplied by other agents.
+    With a data_agent, a history or ticket report that arrives with a next_cursor is paged in from
+    it as it renders.
     """
 
-    def __init__(self, logger, escalation_email: str = "billing@support.local") -> None:
+    def __init__(self, logger, escalation_email: str = "billing@support.local", data_agent: Optional[Agent] = None) -> None:
         super().__init__("support-agent", logger)
         self.escalation_email = escalation_email
+        self.data_agent = data_agent
 
+    @trace_hop
     def handle(self, message: AgentMessage) -> AgentMessage:
         intent = message.intent or "support"
         payload = message.payload or {}
@@ -26,14 +53,58 @@ class SupportAgent(Agent):
             customer = payload.get("customer")
             content = self._handle_billing(customer, payload.get("issue"))
             response_payload["resolution"] = "billing_investigation"
+            if payload.get("similar_tickets"):
+                # Found by a search over every customer's tickets: they go to the finance
+                # escalation only, never into the customer-facing reply.
+                response_payload["escalation"] = {
+                    "to": self.escalation_email,
+                    "related_tickets": [t["id"] for t in payload["similar_tickets"]],
+                }
         elif intent == "ticket_report":
-            tickets: List[dict] = payload.get("tickets", [])
-            content = self._format_ticket_report(tickets)
+            tickets: Iterable[Mapping] = payload.get("tickets", [])
+            priority = payload.get("priority")
+            paging = {k: payload[k] for k in PAGING_KEYS if payload.get(k) is not None}
+            all_high = None
+            if payload.get("next_cursor") and self.data_agent is not None:
+                status = payload.get("customer_status", "active")
+                request = functools.partial(self._open_tickets_page_request, status, priority, len(tickets))
+                tickets = self._fetch_on_demand(tickets, payload["next_cursor"], request, "tickets")
+                paging["count_rest"] = False
+                if priority != "high" or "limit" in paging:
+                    # The header depends on whether every ticket is high priority and a truncated
+                    # report shows the total; the totals answer both without reading ahead.
+                    totals = self._open_ticket_totals(status)
+                    all_high = set(totals) <= {"high"}
+                    if "limit" in paging:
+                        counted = [totals.get(priority, {})] if priority else totals.values()
+                        paging.setdefault("total", sum(n for statuses in counted for n in statuses.values()))
+            elif payload.get("next_cursor"):
+                tickets = list(tickets)
+                all_high = all(t["priority"] == "high" for t in tickets)
+                tickets = _unfollowed(tickets, paging)
+            if payload.get("stream"):
+                response_payload["lines"] = self.iter_ticket_report(tickets, priority, all_high, **paging)
+                content = "Streaming ticket report"
+            else:
+                content = self._format_ticket_report(tickets, priority, all_high, **paging)
             response_payload["resolution"] = "report_shared"
         elif intent == "history":
             customer = payload.get("customer")
             history = payload.get("history", [])
-            content = self._format_history(customer, history)
+            paging = {k: payload[k] for k in PAGING_KEYS if payload.get(k) is not None}
+            if customer and payload.get("next_cursor") and self.data_agent is not None:
+                # Only the first page came with the request; later pages are fetched as rendering
+                # reaches them, and a limited page stops at one row past it instead of counting.
+                request = functools.partial(self._history_page_request, customer["id"], len(history))
+                history = self._fetch_on_demand(history, payload["next_cursor"], request, "history")
+                paging["count_rest"] = False
+            elif payload.get("next_cursor"):
+                history = _unfollowed(history, paging)
+            if payload.get("stream"):
+                response_payload["lines"] = self.iter_history(customer, history, **paging)
+                content = "Streaming ticket history"
+            else:
+                content = self._format_history(customer, history, **paging)
             response_payload["resolution"] = "history_shared"
         elif intent == "general_support":
             content = "Happy to help! Please share more details about your issue."
@@ -48,9 +119,20 @@ class SupportAgent(Agent):
             intent=intent,
             payload=response_payload,
         )
-        self.logger.record(reply)
+        if "lines" in response_payload:
+            # The line iterator belongs to the caller; the transcript only notes that it streamed.
+            self.logger.record(replace(reply, payload={**response_payload, "lines": "<streamed>"}))
+        else:
+            self.logger.record(reply)
         return reply
 
+    async def handle_async(self, message: AgentMessage) -> AgentMessage:
+        # Formatting is pure CPU work on data already fetched, so there is nothing to offload,
+        # unless rendering may fetch further history pages.
+        if (message.payload or {}).get("next_cursor") and self.data_agent is not None:
+            return await run_blocking(self.handle, message)
+        return self.handle(message)
+
     def _handle_upgrade(self, customer: Optional[dict]) -> str:
         if not customer:
             return "I could not find your account. Please provide your customer ID."
@@ -68,21 +150,83 @@ class SupportAgent(Agent):
         detail = f"I see the issue you reported: {issue}. " if issue else ""
         return prefix + detail + "I will secure your account and process a refund if needed. " + investigation
 
-    def _format_ticket_report(self, tickets: List[dict]) -> str:
-        if not tickets:
-            return "No high-priority open tickets found for the target customers."
-        all_high = all(t.get("priority") == "high" for t in tickets)
-        lines = ["High-priority open tickets:" if all_high else "Open tickets for target customers:"]
-        for t in tickets:
-            lines.append(f"- Ticket {t['id']} for customer {t['customer_id']}: {t['issue']} (priority={t['priority']}, status={t['status']})")
-        return "\n".join(lines)
+    def iter_ticket_report(
+        self, tickets: Iterable[Mapping], priority: Optional[str] = None, all_high: Optional[bool] = None, **paging: Any
+    ) -> Iterator[str]:
+        """
+        Ticket report line by line. With priority="high", or all_high given, the header is known
+        up front and each ticket is rendered as it is read; otherwise the tickets are buffered to
+        pick the header. paging: limit / offset / total, see ListTemplate.iter_lines().
+        """
+        if priority == "high":
+            return HIGH_PRIORITY_REPORT.iter_lines(tickets, **paging)
+        if all_high is None:
+            tickets = list(tickets)
+            all_high = all(t["priority"] == "high" for t in tickets)
+        return (HIGH_PRIORITY_REPORT if all_high else OPEN_TICKET_REPORT).iter_lines(tickets, **paging)
 
-    def _format_history(self, customer: Optional[dict], history: List[dict]) -> str:
+    def iter_history(self, customer: Optional[dict], history: Iterable[Mapping], **paging: Any) -> Iterator[str]:
+        """
+        Ticket history line by line; the header goes out before the first history row is read
+        past, so a streamed history (db.iter_customer_history) can be sent as it arrives.
+        """
         if not customer:
-            return "I could not load your account to show history."
-        if not history:
-            return f"{customer['name']}, you have no ticket history yet."
-        lines = [f"{customer['name']}, here is your ticket history:"]
-        for t in history:
-            lines.append(f"- [{t['status']}] {t['issue']} (priority={t['priority']}, id={t['id']})")
-        return "\n".join(lines)
+            return iter(["I could not load your account to show history."])
+        return HISTORY.iter_lines(history, customer, **paging)
+
+    def write_history(self, writer: TextIO, customer: Optional[dict], history: Iterable[Mapping], **paging: Any) -> int:
+        if not customer:
+            writer.write("I could not load your account to show history.\n")
+            return 1
+        return HISTORY.render_to(writer, history, customer, **paging)
+
+    def _format_ticket_report(
+        self, tickets: Iterable[Mapping], priority: Optional[str] = None, all_high: Optional[bool] = None, **paging: Any
+    ) -> str:
+        return "\n".join(self.iter_ticket_report(tickets, priority, all_high, **paging))
+
+    def _format_history(self, customer: Optional[dict], history: Iterable[Mapping], **paging: Any) -> str:
+        return "\n".join(self.iter_history(customer, history, **paging))
+
+    def _fetch_on_demand(
+        self, rows: List[Mapping[str, Any]], cursor: Optional[str], page_request: Callable[[str], AgentMessage], key: str
+    ) -> Iterator[Mapping[str, Any]]:
+        while True:
+            yield from rows
+            if cursor is None:
+                return
+            reply = self.data_agent.handle(page_request(cursor))
+            rows, cursor = reply.payload.get(key, []), reply.payload.get("next_cursor")
+
+    def _history_page_request(self, customer_id: int, limit: int, cursor: str) -> AgentMessage:
+        return self.send(
+            self.data_agent.name,
+            "Get more history",
+            intent="get_history",
+            payload={"customer_id": customer_id, "limit": limit, "cursor": cursor},
+        )
+
+    def _open_tickets_page_request(self, customer_status: str, priority: Optional[str], limit: int, cursor: str) -> AgentMessage:
+        return self.send(
+            self.data_agent.name,
+            "Get more open tickets",
+            intent="open_tickets_for_customers",
+            payload={"customer_status": customer_status, "priority": priority, "limit": limit, "cursor": cursor},
+        )
+
+    def _open_ticket_totals(self, customer_status: str) -> Dict[str, Dict[str, int]]:
+        request = self.send(
+            self.data_agent.name,
+            "Open-ticket totals for the report header",
+            intent="open_ticket_summary",
+            payload={"customer_status": customer_status},
+        )
+        return self.data_agent.handle(request).payload.get("summary", {})
+
+
+def _unfollowed(rows: List[Mapping[str, Any]], paging: Dict[str, Any]) -> List[Mapping[str, Any]]:
+    # A next_cursor this agent cannot follow (no data_agent): show the page it has and say more
+    # are available. The empty marker row is never rendered; it only makes the footer say so.
+    paging["limit"] = min(paging.get("limit", len(rows)), len(rows))
+    paging["count_rest"] = False
+    return [*rows, {}]
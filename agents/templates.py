@@ -0,0 +1,132 @@
+from itertools import islice
+from string import Formatter
+from typing import Any, Callable, Iterable, Iterator, List, Mapping, Optional, TextIO, Tuple
+
+
+class LineTemplate:
+    """
+    A str.format-style line ("- [{status}] {issue}") checked once and rendered with the bound
+    template.format_map, so a row costs one format call. Fields may carry a format spec
+    ("{total:,}"); only plain names are allowed, no conversions, indexes or attributes.
+    """
+
+    __slots__ = ("template", "fields", "render")
+
+    def __init__(self, template: str) -> None:
+        fields: List[str] = []
+        for _, field, spec, conversion in Formatter().parse(template):
+            if field is None:
+                continue
+            if not field.isidentifier() or conversion or "{" in spec:
+                raise ValueError(f"Unsupported field {{{field}}} in {template!r}")
+            fields.append(field)
+        self.template = template
+        self.fields: Tuple[str, ...] = tuple(fields)
+        self.render: Callable[[Mapping[str, Any]], str] = template.format_map
+
+
+class ListTemplate:
+    """
+    Header, one line per row, and an optional "showing N of M" footer.
+
+    iter_lines() renders lazily: the header goes out with the first row and each row line as
+    it is read, so a caller streaming rows from the database can send the first lines before
+    the rest are fetched. render() builds the whole text in one pass. `limit`/`offset` select
+    one page of rows; rows past the page are only counted, and not at all when the caller
+    passes `total`. With count_rest=False only one row past the page is read and the footer
+    just says more are available, for sources that fetch further rows on demand.
+    """
+
+    def __init__(
+        self,
+        row: str,
+        empty: str,
+        header: Optional[str] = None,
+        more: str = "... showing {shown:,} of {total:,}",
+        page: str = "... showing {first:,}-{last:,} of {total:,}",
+        rest: str = "... showing {first:,}-{last:,}, more available",
+    ) -> None:
+        self.row = LineTemplate(row)
+        self.empty = LineTemplate(empty)
+        self.header = LineTemplate(header) if header is not None else None
+        self.more = LineTemplate(more)
+        self.page = LineTemplate(page)
+        self.rest = LineTemplate(rest)
+
+    def iter_lines(
+        self,
+        rows: Iterable[Mapping[str, Any]],
+        context: Optional[Mapping[str, Any]] = None,
+        limit: Optional[int] = None,
+        offset: int = 0,
+        total: Optional[int] = None,
+        count_rest: bool = True,
+    ) -> Iterator[str]:
+        context = context or {}
+        remaining = iter(rows)
+        skipped = _count(islice(remaining, offset))
+        render_row = self.row.render
+        shown = 0
+        for row in islice(remaining, limit):
+            if not shown and self.header is not None:
+                yield self.header.render(context)
+            shown += 1
+            yield render_row(row)
+        yield from self._footer(context, remaining, skipped, shown, total, count_rest)
+
+    def render(
+        self,
+        rows: Iterable[Mapping[str, Any]],
+        context: Optional[Mapping[str, Any]] = None,
+        limit: Optional[int] = None,
+        offset: int = 0,
+        total: Optional[int] = None,
+        count_rest: bool = True,
+    ) -> str:
+        context = context or {}
+        remaining = iter(rows)
+        skipped = _count(islice(remaining, offset))
+        lines = list(map(self.row.render, islice(remaining, limit)))
+        head = [self.header.render(context)] if lines and self.header is not None else []
+        return "\n".join(head + lines + self._footer(context, remaining, skipped, len(lines), total, count_rest))
+
+    def render_to(
+        self, writer: TextIO, rows: Iterable[Mapping[str, Any]], context: Optional[Mapping[str, Any]] = None, **paging: Any
+    ) -> int:
+        """
+        Write each line (newline-terminated) to writer as it is produced; returns the line count.
+        """
+        count = 0
+        for line in self.iter_lines(rows, context, **paging):
+            writer.write(line + "\n")
+            count += 1
+        return count
+
+    def _footer(
+        self,
+        context: Mapping[str, Any],
+        remaining: Iterator[Any],
+        skipped: int,
+        shown: int,
+        total: Optional[int],
+        count_rest: bool = True,
+    ) -> List[str]:
+        if not shown:
+            return [self.empty.render(context)]
+        if total is None and not count_rest:
+            if next(remaining, None) is None:
+                total = skipped + shown
+            else:
+                return [self.rest.render({"first": skipped + 1, "last": skipped + shown})]
+        if total is None:
+            # Count what is left past the page without rendering it.
+            total = skipped + shown + _count(remaining)
+        if skipped:
+            return [self.page.render({"first": skipped + 1, "last": skipped + shown, "total": total})]
+        if shown < total:
+            return [self.more.render({"shown": shown, "total": total})]
+        return []
+
+
+def _count(rows: Iterable[Any]) -> int:
+    return sum(1 for _ in rows)
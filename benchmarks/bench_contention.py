@@ -0,0 +1,139 @@
+"""
+Mixed read/write contention benchmark: writer threads creating tickets and updating customers
+while reader threads run the open-ticket reports, once against the live database and once with
+report reads served from a db.enable_snapshot_reads copy. Reports write and report latency,
+throughput and the largest WAL file seen per mode (JSON).
+
+    python -m benchmarks.bench_contention --customers 200000 --tickets 1000000 --seconds 20
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import db
+from benchmarks.bench_scenarios import git_revision, percentile
+from database_setup import bulk_load, synthetic_customers, synthetic_tickets
+
+
+def report_queries(db_path: Path) -> List[Callable[[], Any]]:
+    # What RouterAgent's report intents run: the paged open-ticket walk behind
+    # _handle_multi_step_report, the _handle_active_with_open_tickets list, and the totals.
+    return [
+        lambda: sum(len(page) for page in db.iter_open_tickets_for_customers("active", db_path=db_path)),
+        lambda: db.list_customers_with_open_tickets("active", limit=50, db_path=db_path),
+        lambda: db.get_open_ticket_totals("active", db_path=db_path),
+    ]
+
+
+def write_ops(db_path: Path, customers: int, rng: random.Random) -> List[Callable[[], Any]]:
+    return [
+        lambda: db.create_ticket(rng.randint(1, customers), "Contention check", priority="high", db_path=db_path),
+        lambda: db.update_customer(rng.randint(1, customers), {"email": f"u{rng.randrange(10**6)}@example.com"}, db_path=db_path),
+    ]
+
+
+def summarize(latencies: List[float], seconds: float) -> Dict[str, Any]:
+    latencies.sort()
+    return {
+        "ops": len(latencies),
+        "ops_per_sec": round(len(latencies) / seconds, 1),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+        "max_ms": round((latencies[-1] if latencies else 0.0) * 1000, 3),
+    }
+
+
+def run_mix(db_path: Path, customers: int, writers: int, readers: int, seconds: float) -> Dict[str, Any]:
+    stop = threading.Event()
+    write_latencies: List[List[float]] = [[] for _ in range(writers)]
+    read_latencies: List[List[float]] = [[] for _ in range(readers)]
+
+    def loop(ops: List[Callable[[], Any]], out: List[float]) -> None:
+        i = 0
+        while not stop.is_set():
+            start = time.perf_counter()
+            ops[i % len(ops)]()
+            out.append(time.perf_counter() - start)
+            i += 1
+
+    threads = [
+        threading.Thread(target=loop, args=(write_ops(db_path, customers, random.Random(n)), write_latencies[n]))
+        for n in range(writers)
+    ] + [threading.Thread(target=loop, args=(report_queries(db_path), read_latencies[n])) for n in range(readers)]
+    # Start each mode from an empty WAL, so wal_max_bytes shows how far checkpoints fell behind.
+    db._get_connection(db_path).execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    wal = Path(f"{db_path}-wal")
+    wal_max = 0
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    while time.perf_counter() - start < seconds:
+        time.sleep(0.05)
+        wal_max = max(wal_max, wal.stat().st_size if wal.exists() else 0)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    return {
+        "writes": summarize([t for out in write_latencies for t in out], elapsed),
+        "reports": summarize([t for out in read_latencies for t in out], elapsed),
+        "wal_max_bytes": wal_max,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> Dict[str, Any]:
+    parser = argparse.ArgumentParser(description="Report reads vs writes: live database vs snapshot copy")
+    parser.add_argument("--customers", type=int, default=200_000)
+    parser.add_argument("--tickets", type=int, default=1_000_000)
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--seconds", type=float, default=10.0, help="duration of each mode")
+    parser.add_argument("--staleness", type=float, default=5.0, help="snapshot max_staleness in seconds")
+    parser.add_argument("--db-path", type=Path, default=db.DATA_DIR / "contention_benchmark.db")
+    parser.add_argument("--reuse-db", action="store_true", help="skip generation if --db-path exists")
+    parser.add_argument("--output", type=Path, help="write JSON here instead of stdout")
+    args = parser.parse_args(argv)
+
+    if not (args.reuse_db and args.db_path.exists()):
+        for stat in bulk_load(args.db_path, synthetic_customers(args.customers), synthetic_tickets(args.tickets, args.customers)):
+            print(stat, file=sys.stderr)
+
+    live = run_mix(args.db_path, args.customers, args.writers, args.readers, args.seconds)
+    reader = db.enable_snapshot_reads(args.db_path, max_staleness=args.staleness)
+    try:
+        snapshot = run_mix(args.db_path, args.customers, args.writers, args.readers, args.seconds)
+        snapshot["refreshes"] = reader.refreshes
+        snapshot["last_copy_ms"] = round(reader.last_copy_seconds * 1000, 1)
+    finally:
+        db.disable_snapshot_reads(args.db_path)
+    db.close_pools(args.db_path)
+
+    report = {
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "sqlite": db.sqlite3.sqlite_version,
+        "cpus": os.cpu_count(),
+        "writers": args.writers,
+        "readers": args.readers,
+        "seconds": args.seconds,
+        "staleness_s": args.staleness,
+        "live": live,
+        "snapshot": snapshot,
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        args.output.write_text(text + "\n", encoding="utf-8")
+    else:
+        print(text)
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Load-test client for mcp_server.py over a local stdio transport.
+
+Spawns the server as a subprocess, issues many concurrent tool calls through one MCP client
+session and reports latency percentiles and throughput per tool as JSON.
+
+    python -m benchmarks.bench_mcp --calls 2000 --concurrency 64
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from mcp import ClientSession, StdioServerParameters
+from mcp.client.stdio import stdio_client
+
+from benchmarks.bench_scenarios import percentile
+
+
+SERVER_SCRIPT = Path(__file__).resolve().parent.parent / "mcp_server.py"
+
+# (tool name, argument factory) pairs mixed into the load.
+WORKLOAD: List[Tuple[str, Any]] = [
+    ("get_customer", lambda rng: {"customer_id": rng.choice([1, 3, 4, 5, 12345])}),
+    ("get_customer_history", lambda rng: {"customer_id": rng.choice([3, 5, 12345])}),
+    ("list_customers", lambda rng: {"status": "active", "limit": 10}),
+]
+
+
+async def _timed_call(session: ClientSession, semaphore: asyncio.Semaphore, tool: str, arguments: Dict[str, Any]) -> Tuple[str, float]:
+    async with semaphore:
+        start = time.perf_counter()
+        await session.call_tool(tool, arguments)
+        return tool, time.perf_counter() - start
+
+
+async def run(calls: int, concurrency: int, seed: int, env: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+    rng = random.Random(seed)
+    params = StdioServerParameters(command=sys.executable, args=[str(SERVER_SCRIPT)], env=env)
+    start_server = time.perf_counter()
+    # The server logs every request on stderr; keep it out of the report.
+    with open(os.devnull, "w") as errlog:
+        async with stdio_client(params, errlog=errlog) as (read, write):
+            async with ClientSession(read, write) as session:
+                await session.initialize()
+                startup = time.perf_counter() - start_server
+                semaphore = asyncio.Semaphore(concurrency)
+                jobs = []
+                for _ in range(calls):
+                    tool, make_args = rng.choice(WORKLOAD)
+                    jobs.append(_timed_call(session, semaphore, tool, make_args(rng)))
+                start = time.perf_counter()
+                results = await asyncio.gather(*jobs)
+                wall = time.perf_counter() - start
+
+    by_tool: Dict[str, List[float]] = {}
+    for tool, latency in results:
+        by_tool.setdefault(tool, []).append(latency)
+    tools = {}
+    for tool, latencies in sorted(by_tool.items()):
+        latencies.sort()
+        tools[tool] = {
+            "calls": len(latencies),
+            "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+            "p95_ms": round(percentile(latencies, 95) * 1000, 3),
+            "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+        }
+    return {
+        "calls": calls,
+        "concurrency": concurrency,
+        "startup_ms": round(startup * 1000, 1),
+        "throughput_cps": round(calls / wall, 1),
+        "tools": tools,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="MCP server load test over stdio")
+    parser.add_argument("--calls", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--seed", type=int, default=3)
+    args = parser.parse_args(argv)
+    print(json.dumps(asyncio.run(run(args.calls, args.concurrency, args.seed)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Memory and allocation benchmark: slotted AgentMessage vs. the original dict-backed dataclass.
+
+    python -m benchmarks.bench_messages --count 100000
+"""
+import argparse
+import json
+import time
+import tracemalloc
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+from agents.base import AgentMessage, FrozenAgentMessage
+
+
+@dataclass
+class LegacyAgentMessage:
+    # The message type as it was before slots: per-instance __dict__ and an eager payload dict.
+    sender: str
+    recipient: str
+    content: str
+    intent: Optional[str] = None
+    payload: Optional[Dict[str, Any]] = field(default_factory=dict)
+
+
+def _build(factory: Callable[..., Any], count: int, with_payload: bool) -> List[Any]:
+    messages = []
+    for i in range(count):
+        # Names are rebuilt per message, as they would be when decoded off the wire.
+        sender = "".join(["router", "-agent"])
+        recipient = "".join(["customer-data", "-agent"])
+        if with_payload:
+            messages.append(factory(sender, recipient, "Fetch details", "get_customer", {"customer_id": i}))
+        else:
+            messages.append(factory(sender, recipient, "Fetch details", "get_customer"))
+    return messages
+
+
+def measure(name: str, factory: Callable[..., Any], count: int, with_payload: bool) -> Dict[str, Any]:
+    # Time without tracemalloc, which slows every allocation down, then measure memory separately.
+    start = time.perf_counter()
+    messages = _build(factory, count, with_payload)
+    elapsed = time.perf_counter() - start
+    del messages
+    tracemalloc.start()
+    messages = _build(factory, count, with_payload)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    result = {
+        "type": name,
+        "payload": with_payload,
+        "count": count,
+        "bytes_per_message": round(current / count, 1),
+        "peak_bytes": peak,
+        "alloc_ns_per_message": round(elapsed / count * 1e9, 1),
+    }
+    if hasattr(messages[0], "to_bytes"):
+        start = time.perf_counter()
+        encoded = [m.to_bytes() for m in messages]
+        result["encode_ns_per_message"] = round((time.perf_counter() - start) / count * 1e9, 1)
+        start = time.perf_counter()
+        for data in encoded:
+            factory.from_bytes(data)
+        result["decode_ns_per_message"] = round((time.perf_counter() - start) / count * 1e9, 1)
+        result["encoded_bytes"] = len(encoded[0])
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--count", type=int, default=100_000)
+    args = parser.parse_args()
+
+    results = []
+    for with_payload in (False, True):
+        for name, factory in (
+            ("legacy_dataclass", LegacyAgentMessage),
+            ("slotted", AgentMessage),
+            ("slotted_frozen", FrozenAgentMessage),
+        ):
+            results.append(measure(name, factory, args.count, with_payload))
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""
+Pagination benchmark: a page of db.list_customers / db.get_customer_history fetched with a
+keyset cursor versus LIMIT/OFFSET, at increasing depth into the result set, reported as p50
+latency per depth (JSON).
+
+    python -m benchmarks.bench_paging --customers 1000000 --tickets 2000000 --page-size 50
+"""
+import argparse
+import json
+import platform
+import statistics
+import sys
+import time
+from contextlib import closing
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import db
+from benchmarks.bench_scenarios import git_revision
+from database_setup import bulk_load, synthetic_customers, synthetic_tickets
+
+DEPTHS = (0.0, 0.25, 0.5, 0.75, 0.99)
+
+
+def offset_page(sql: str, params: List[Any], page_size: int, offset: int, db_path: Path) -> List[Dict[str, Any]]:
+    # What the same page costs without a cursor: every row before it is read and discarded.
+    with closing(db._get_connection(db_path).cursor()) as cur:
+        cur.execute(f"{sql} ORDER BY created_at DESC, id DESC LIMIT ? OFFSET ?", params + [page_size, offset])
+        return [dict(r) for r in cur.fetchall()]
+
+
+def cursors_at(fetch_page: Callable[[Optional[str]], List[Dict[str, Any]]], pages: List[int]) -> Dict[int, Optional[str]]:
+    """
+    Walk the pages with the keyset cursor once and keep the cursor that starts each wanted page.
+    """
+    wanted = set(pages)
+    found: Dict[int, Optional[str]] = {}
+    cursor: Optional[str] = None
+    for page in range(max(pages)):
+        if page in wanted:
+            found[page] = cursor
+        cursor = db.page_cursor(fetch_page(cursor)[-1])
+    found[max(pages)] = cursor
+    return found
+
+
+def median_ms(call: Callable[[], Any], repeats: int) -> float:
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        call()
+        times.append(time.perf_counter() - start)
+    return round(statistics.median(times) * 1000, 3)
+
+
+def compare(
+    label: str,
+    rows: int,
+    page_size: int,
+    keyset: Callable[[Optional[str]], List[Dict[str, Any]]],
+    offset: Callable[[int], List[Dict[str, Any]]],
+    repeats: int,
+) -> Dict[str, Any]:
+    last_page = max((rows - 1) // page_size, 0)
+    pages = sorted({int(last_page * depth) for depth in DEPTHS})
+    starts = cursors_at(keyset, pages)
+    runs = []
+    for page in pages:
+        assert [r["id"] for r in keyset(starts[page])] == [r["id"] for r in offset(page * page_size)]
+        runs.append({
+            "page": page,
+            "row_offset": page * page_size,
+            "keyset_p50_ms": median_ms(lambda: keyset(starts[page]), repeats),
+            "offset_p50_ms": median_ms(lambda: offset(page * page_size), repeats),
+        })
+    return {"query": label, "rows": rows, "pages": last_page + 1, "runs": runs}
+
+
+def main(argv: Optional[List[str]] = None) -> Dict[str, Any]:
+    parser = argparse.ArgumentParser(description="Keyset cursor vs OFFSET pagination")
+    parser.add_argument("--customers", type=int, default=200_000)
+    parser.add_argument("--tickets", type=int, default=1_000_000)
+    parser.add_argument("--page-size", type=int, default=50)
+    parser.add_argument("--repeats", type=int, default=20, help="timed fetches per page and method")
+    parser.add_argument("--db-path", type=Path, default=db.DATA_DIR / "paging_benchmark.db")
+    parser.add_argument("--reuse-db", action="store_true", help="skip generation if --db-path exists")
+    parser.add_argument("--output", type=Path, help="write JSON here instead of stdout")
+    args = parser.parse_args(argv)
+
+    if not (args.reuse_db and args.db_path.exists()):
+        for stat in bulk_load(args.db_path, synthetic_customers(args.customers), synthetic_tickets(args.tickets, args.customers)):
+            print(stat, file=sys.stderr)
+    size = args.page_size
+    with closing(db._get_connection(args.db_path).cursor()) as cur:
+        customers = cur.execute("SELECT COUNT(*) FROM customers").fetchone()[0]
+        # The synthetic tickets are skewed, so the busiest customer has the longest history.
+        heaviest, tickets = cur.execute(
+            "SELECT customer_id, COUNT(*) FROM tickets GROUP BY customer_id ORDER BY 2 DESC LIMIT 1"
+        ).fetchone()
+
+    results = [
+        compare(
+            "list_customers",
+            customers,
+            size,
+            lambda after: db.list_customers(limit=size, after=after, db_path=args.db_path),
+            lambda offset: offset_page("SELECT * FROM customers", [], size, offset, args.db_path),
+            args.repeats,
+        ),
+        compare(
+            f"get_customer_history({heaviest})",
+            tickets,
+            size,
+            lambda after: db.get_customer_history(heaviest, limit=size, after=after, db_path=args.db_path),
+            lambda offset: offset_page("SELECT * FROM tickets WHERE customer_id = ?", [heaviest], size, offset, args.db_path),
+            args.repeats,
+        ),
+    ]
+    db.close_pools(args.db_path)
+
+    report = {
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "sqlite": db.sqlite3.sqlite_version,
+        "page_size": size,
+        "results": results,
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        args.output.write_text(text + "\n", encoding="utf-8")
+    else:
+        print(text)
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+End-to-end benchmark: drives each run_demo.SCENARIOS query through RouterAgent.handle_user_query
+against a synthetic database (database_setup.bulk_load) and reports latency percentiles, throughput and peak RSS as JSON.
+
+    python -m benchmarks.bench_scenarios --customers 100000 --tickets 300000 --concurrency 8
+"""
+import argparse
+import json
+import platform
+import resource
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+import db
+from agents.base import AgentLogger
+from agents.customer_data_agent import CustomerDataAgent
+from agents.router_agent import RouterAgent
+from agents.support_agent import SupportAgent
+from database_setup import bulk_load, synthetic_customers, synthetic_tickets
+from run_demo import SCENARIOS
+from storage import MemoryBackend, SQLiteBackend
+
+
+DEFAULT_DB_PATH = db.DATA_DIR / "benchmark.db"
+
+
+def build_database(db_path: Path, customers: int, tickets: int) -> float:
+    start = time.perf_counter()
+    stats = bulk_load(db_path, synthetic_customers(customers), synthetic_tickets(tickets, customers))
+    for stat in stats:
+        # Keep stdout clean for the JSON report.
+        print(stat, file=sys.stderr)
+    return time.perf_counter() - start
+
+
+def percentile(sorted_values: Sequence[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is KiB on Linux and bytes on macOS.
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def run_scenario(router: RouterAgent, query: str, requests: int, concurrency: int) -> Dict[str, Any]:
+    def timed(_: int) -> float:
+        start = time.perf_counter()
+        router.handle_user_query(query)
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        latencies = sorted(pool.map(timed, range(requests)))
+    wall = time.perf_counter() - start
+    return {
+        "requests": requests,
+        "concurrency": concurrency,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+        "max_ms": round(latencies[-1] * 1000, 3),
+        "throughput_qps": round(requests / wall, 1),
+        # Process-wide high-water mark, so it only ever grows across scenarios.
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(argv: Optional[List[str]] = None) -> Dict[str, Any]:
+    parser = argparse.ArgumentParser(description="End-to-end scenario benchmark")
+    parser.add_argument("--customers", type=int, default=1000)
+    parser.add_argument("--tickets", type=int, default=3000)
+    parser.add_argument("--requests", type=int, default=200, help="requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--db-path", type=Path, default=DEFAULT_DB_PATH)
+    parser.add_argument("--reuse-db", action="store_true", help="skip generation if --db-path exists")
+    parser.add_argument("--backend", choices=("sqlite", "memory"), default="sqlite")
+    parser.add_argument("--output", type=Path, help="write JSON here instead of stdout")
+    args = parser.parse_args(argv)
+
+    build_seconds = None
+    if not (args.reuse_db and args.db_path.exists()):
+        build_seconds = round(build_database(args.db_path, args.customers, args.tickets), 3)
+
+    # A bounded transcript keeps the logger from dominating memory over thousands of queries.
+    logger = AgentLogger(capacity=1000)
+    backend = MemoryBackend.from_sqlite(args.db_path) if args.backend == "memory" else SQLiteBackend(args.db_path)
+    data_agent = CustomerDataAgent(logger, backend=backend)
+    router = RouterAgent(logger, data_agent, SupportAgent(logger, data_agent=data_agent))
+
+    scenarios = []
+    for title, query in SCENARIOS:
+        result = run_scenario(router, query, args.requests, args.concurrency)
+        scenarios.append({"scenario": title, "intent": router._detect_intent(query), **result})
+
+    report = {
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "sqlite": db.sqlite3.sqlite_version,
+        "customers": args.customers,
+        "tickets": args.tickets,
+        "backend": args.backend,
+        "build_seconds": build_seconds,
+        "scenarios": scenarios,
+        "cache": db.cache_stats(),
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        args.output.write_text(text + "\n", encoding="utf-8")
+    else:
+        print(text)
+    return report
+
+
+if __name__ == "__main__":
+    main()
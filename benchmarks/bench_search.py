@@ -0,0 +1,135 @@
+"""
+Ticket search benchmark: db.search_tickets (FTS5 index, bm25-ranked top-k) versus a LIKE scan
+of tickets.issue, reported as p50/p99 latency per query (JSON).
+
+    python -m benchmarks.bench_search --tickets 2000000 --queries 200
+"""
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+from contextlib import closing
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+import db
+from benchmarks.bench_scenarios import git_revision, percentile
+from database_setup import bulk_load, synthetic_customers, synthetic_tickets
+
+# Issue text is composed from these plus a product and an order number, so the index sees a
+# realistic spread of term frequencies rather than six repeated strings.
+PROBLEMS = [
+    "charged twice", "duplicate charge", "refund pending", "payment failed", "card declined",
+    "account locked", "password reset", "app crashing", "login loop", "invoice missing",
+    "subscription cancelled", "upgrade stuck", "shipping delayed", "wrong address", "promo code rejected",
+]
+CONTEXTS = [
+    "after the latest update", "on my last order", "since yesterday", "on the mobile app",
+    "when paying by card", "for the annual plan", "on checkout", "in the billing portal",
+]
+PRODUCTS = 2000
+# "broad" queries use only common words and match a large share of tickets; "selective" ones
+# name a product or order, like a customer quoting what they bought.
+QUERIES = {
+    "broad": ["charged twice refund", "account locked", "password reset mobile app", "card declined checkout"],
+    "selective": ["refund sku0412", "sku1999 shipping delayed", "order 482113", "invoice missing sku0007 annual plan"],
+}
+
+
+def varied_tickets(count: int, customers: int, seed: int = 13) -> Iterator[tuple]:
+    """
+    synthetic_tickets() rows with the issue replaced by a generated sentence.
+    """
+    rng = random.Random(seed)
+    for row in synthetic_tickets(count, customers):
+        issue = (
+            f"{rng.choice(PROBLEMS).capitalize()} {rng.choice(CONTEXTS)}, "
+            f"sku{rng.randrange(PRODUCTS):04d} order {rng.randrange(10**6):06d}"
+        )
+        yield row[:2] + (issue,) + row[3:]
+
+
+def like_scan(query: str, limit: int, open_only: bool, db_path: Path) -> List[Dict[str, Any]]:
+    # What a search without the index costs: every ticket's issue text is scanned.
+    terms = db.search_terms(query)
+    hits = " + ".join("(issue LIKE ?)" for _ in terms)
+    status_clause = "AND status != 'resolved'" if open_only else ""
+    with closing(db._get_connection(db_path).cursor()) as cur:
+        cur.execute(
+            f"SELECT * FROM (SELECT *, {hits} AS score FROM tickets WHERE 1 {status_clause}) "
+            "WHERE score > 0 ORDER BY score DESC, id DESC LIMIT ?",
+            [f"%{t}%" for t in terms] + [limit],
+        )
+        return [dict(r) for r in cur.fetchall()]
+
+
+def run_queries(search: Callable[[str], List[Dict[str, Any]]], queries: List[str]) -> Dict[str, Any]:
+    latencies = []
+    for query in queries:
+        start = time.perf_counter()
+        search(query)
+        latencies.append(time.perf_counter() - start)
+    latencies.sort()
+    return {
+        "queries": len(queries),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> Dict[str, Any]:
+    parser = argparse.ArgumentParser(description="FTS5 ticket search vs LIKE scan")
+    parser.add_argument("--customers", type=int, default=100_000)
+    parser.add_argument("--tickets", type=int, default=1_000_000)
+    parser.add_argument("--queries", type=int, default=100, help="indexed searches timed per query kind")
+    parser.add_argument("--scan-queries", type=int, default=8, help="LIKE scans timed per query kind (each reads every ticket)")
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--open-only", action="store_true")
+    parser.add_argument("--db-path", type=Path, default=db.DATA_DIR / "search_benchmark.db")
+    parser.add_argument("--reuse-db", action="store_true", help="skip generation if --db-path exists")
+    parser.add_argument("--output", type=Path, help="write JSON here instead of stdout")
+    args = parser.parse_args(argv)
+
+    if not db.HAS_FTS5:
+        parser.error("this SQLite build has no FTS5; db.search_tickets would fall back to the LIKE scan")
+    if not (args.reuse_db and args.db_path.exists()):
+        for stat in bulk_load(args.db_path, synthetic_customers(args.customers), varied_tickets(args.tickets, args.customers)):
+            print(stat, file=sys.stderr)
+
+    def indexed(query: str) -> List[Dict[str, Any]]:
+        return db.search_tickets(query, limit=args.limit, open_only=args.open_only, db_path=args.db_path)
+
+    def scanned(query: str) -> List[Dict[str, Any]]:
+        return like_scan(query, args.limit, args.open_only, args.db_path)
+
+    fts: Dict[str, Any] = {}
+    scan: Dict[str, Any] = {}
+    indexed(QUERIES["broad"][0])  # warm the connection and page cache
+    for kind, queries in QUERIES.items():
+        fts[kind] = run_queries(indexed, [queries[i % len(queries)] for i in range(args.queries)])
+        scan[kind] = run_queries(scanned, [queries[i % len(queries)] for i in range(args.scan_queries)])
+    db.close_pools(args.db_path)
+
+    report = {
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "sqlite": db.sqlite3.sqlite_version,
+        "tickets": args.tickets,
+        "limit": args.limit,
+        "open_only": args.open_only,
+        "fts5": fts,
+        "like_scan": scan,
+        "p50_speedup": {kind: round(scan[kind]["p50_ms"] / max(fts[kind]["p50_ms"], 1e-3), 1) for kind in QUERIES},
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        args.output.write_text(text + "\n", encoding="utf-8")
+    else:
+        print(text)
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""
+Cold-start benchmark for mcp_server.py: import time of the module and of a built server, each
+with an `-X importtime` breakdown by package and module, and the time a freshly spawned server
+takes to answer initialize and its first tool call (JSON).
+
+    python -m benchmarks.bench_startup --runs 10 --top 15
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from mcp import ClientSession, StdioServerParameters
+from mcp.client.stdio import stdio_client
+
+from benchmarks.bench_scenarios import git_revision
+
+ROOT = Path(__file__).resolve().parent.parent
+SERVER_SCRIPT = ROOT / "mcp_server.py"
+
+
+def parse_importtime(stderr: str) -> Dict[str, Tuple[int, int, int]]:
+    """
+    {module: (self_us, cumulative_us, depth)} from `python -X importtime` output; depth 0 is a
+    module imported directly by the profiled statement.
+    """
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        modules[name.strip()] = (int(self_us), int(cumulative_us), depth)
+    return modules
+
+
+def profile_statement(statement: str, runs: int, top: int) -> Dict[str, Any]:
+    """
+    Median process wall time and import breakdown of `python -X importtime -c statement`.
+    """
+    walls: List[float] = []
+    totals: List[float] = []
+    samples: Dict[str, List[Tuple[int, int]]] = defaultdict(list)
+    for _ in range(runs):
+        start = time.perf_counter()
+        done = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", statement],
+            cwd=ROOT, capture_output=True, text=True, check=True,
+        )
+        walls.append(time.perf_counter() - start)
+        modules = parse_importtime(done.stderr)
+        # Everything imported while running the statement, interpreter start-up (site) excluded.
+        totals.append(sum(c for name, (_, c, depth) in modules.items() if depth == 0 and name != "site") / 1000)
+        for name, (self_us, cumulative_us, _) in modules.items():
+            samples[name].append((self_us, cumulative_us))
+    medians = {
+        name: (statistics.median(s for s, _ in times) / 1000, statistics.median(c for _, c in times) / 1000)
+        for name, times in samples.items()
+    }
+    packages: Dict[str, float] = defaultdict(float)
+    for name, (self_ms, _) in medians.items():
+        packages[name.split(".")[0]] += self_ms
+    by_self = sorted(medians.items(), key=lambda item: item[1][0], reverse=True)
+    return {
+        "statement": statement,
+        "process_wall_ms": round(statistics.median(walls) * 1000, 1),
+        "imports_ms": round(statistics.median(totals), 1),
+        "modules_loaded": len(medians),
+        "packages_self_ms": {
+            name: round(ms, 1) for name, ms in sorted(packages.items(), key=lambda item: item[1], reverse=True)[:top]
+        },
+        "top_modules": [
+            {"module": name, "self_ms": round(self_ms, 2), "cumulative_ms": round(cumulative_ms, 2)}
+            for name, (self_ms, cumulative_ms) in by_self[:top]
+        ],
+    }
+
+
+def interpreter_startup(runs: int) -> float:
+    walls = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", "pass"], check=True)
+        walls.append(time.perf_counter() - start)
+    return round(statistics.median(walls) * 1000, 1)
+
+
+async def first_response(env: Optional[Dict[str, str]] = None) -> Dict[str, float]:
+    params = StdioServerParameters(command=sys.executable, args=[str(SERVER_SCRIPT)], env=env)
+    start = time.perf_counter()
+    with open(os.devnull, "w") as errlog:
+        async with stdio_client(params, errlog=errlog) as (read, write):
+            async with ClientSession(read, write) as session:
+                await session.initialize()
+                initialized = time.perf_counter()
+                await session.call_tool("get_customer", {"customer_id": 5})
+                called = time.perf_counter()
+    return {"initialize_ms": (initialized - start) * 1000, "first_call_ms": (called - start) * 1000}
+
+
+def main(argv: Optional[List[str]] = None) -> Dict[str, Any]:
+    parser = argparse.ArgumentParser(description="mcp_server cold-start benchmark")
+    parser.add_argument("--runs", type=int, default=10, help="fresh processes per measurement")
+    parser.add_argument("--top", type=int, default=15, help="modules listed in the breakdown")
+    parser.add_argument("--output", type=Path, help="write JSON here instead of stdout")
+    args = parser.parse_args(argv)
+
+    spawns = [asyncio.run(first_response(dict(os.environ))) for _ in range(args.runs)]
+    report = {
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "runs": args.runs,
+        "interpreter_ms": interpreter_startup(args.runs),
+        # What importing the tools costs (e.g. for in-process use), and what serving adds.
+        "module_import": profile_statement("import mcp_server", args.runs, args.top),
+        "server_build": profile_statement("import mcp_server; mcp_server.create_server()", args.runs, args.top),
+        "spawn": {
+            "initialize_p50_ms": round(statistics.median(s["initialize_ms"] for s in spawns), 1),
+            "first_call_p50_ms": round(statistics.median(s["first_call_ms"] for s in spawns), 1),
+        },
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        args.output.write_text(text + "\n", encoding="utf-8")
+    else:
+        print(text)
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Scaling benchmark for worker_pool.RouterWorkerPool: the same query mix served by 1..N worker
+processes, next to the single-process RouterAgent, reported as throughput and speedup (JSON).
+
+    python -m benchmarks.bench_workers --max-workers 8 --queries 4000
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import re
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import db
+from agents.base import AgentLogger
+from agents.customer_data_agent import CustomerDataAgent
+from agents.router_agent import RouterAgent
+from agents.support_agent import SupportAgent
+from benchmarks.bench_scenarios import DEFAULT_DB_PATH, build_database, git_revision
+from run_demo import SCENARIOS
+from worker_pool import RouterWorkerPool
+
+
+def query_mix(count: int, customers: int, seed: int = 7) -> List[str]:
+    """
+    SCENARIOS cycled, with the customer id in id-bearing queries spread over the dataset so
+    affinity routing has many customers to shard.
+    """
+    rng = random.Random(seed)
+    return [
+        re.sub(r"\d+", lambda _: str(rng.randint(1, customers)), SCENARIOS[i % len(SCENARIOS)][1])
+        for i in range(count)
+    ]
+
+
+def main(argv: Optional[List[str]] = None) -> Dict[str, Any]:
+    parser = argparse.ArgumentParser(description="RouterWorkerPool scaling benchmark")
+    parser.add_argument("--customers", type=int, default=1000)
+    parser.add_argument("--tickets", type=int, default=3000)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--backend", choices=("sqlite", "memory"), default="sqlite")
+    parser.add_argument("--db-path", type=Path, default=DEFAULT_DB_PATH)
+    parser.add_argument("--reuse-db", action="store_true", help="skip generation if --db-path exists")
+    parser.add_argument("--output", type=Path, help="write JSON here instead of stdout")
+    args = parser.parse_args(argv)
+
+    if not (args.reuse_db and args.db_path.exists()):
+        build_database(args.db_path, args.customers, args.tickets)
+    queries = query_mix(args.queries, args.customers)
+
+    logger = AgentLogger(capacity=1000)
+    data_agent = CustomerDataAgent(logger, db_path=args.db_path)
+    router = RouterAgent(logger, data_agent, SupportAgent(logger, data_agent=data_agent))
+    start = time.perf_counter()
+    for query in queries:
+        router.handle_user_query(query)
+    baseline_qps = args.queries / (time.perf_counter() - start)
+
+    runs = []
+    for workers in range(1, args.max_workers + 1):
+        with RouterWorkerPool(workers=workers, db_path=args.db_path, backend=args.backend) as pool:
+            # Warm-up: one query per worker so process start-up is not timed.
+            pool.handle_user_queries(queries[:workers])
+            start = time.perf_counter()
+            pool.handle_user_queries(queries)
+            wall = time.perf_counter() - start
+        qps = args.queries / wall
+        runs.append({"workers": workers, "throughput_qps": round(qps, 1), "speedup": round(qps / baseline_qps, 2)})
+
+    report = {
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "sqlite": db.sqlite3.sqlite_version,
+        "cpus": os.cpu_count(),
+        "backend": args.backend,
+        "queries": args.queries,
+        "single_process_qps": round(baseline_qps, 1),
+        "runs": runs,
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        args.output.write_text(text + "\n", encoding="utf-8")
+    else:
+        print(text)
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Write-path benchmark: concurrent db.create_ticket calls committed one by one versus grouped by
+db.GroupCommitWriter, reported as tickets per second (JSON).
+
+    python -m benchmarks.bench_writes --tickets 5000 --concurrency 16
+"""
+import argparse
+import json
+import platform
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import db
+from benchmarks.bench_scenarios import git_revision, percentile
+from database_setup import bulk_load, synthetic_customers
+
+
+def run_writes(db_path: Path, customers: int, tickets: int, concurrency: int) -> Dict[str, Any]:
+    def timed(i: int) -> float:
+        start = time.perf_counter()
+        db.create_ticket(i % customers + 1, f"Benchmark ticket {i}", priority="low", db_path=db_path)
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        latencies = sorted(pool.map(timed, range(tickets)))
+    wall = time.perf_counter() - start
+    return {
+        "tickets": tickets,
+        "concurrency": concurrency,
+        "tickets_per_sec": round(tickets / wall, 1),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> Dict[str, Any]:
+    parser = argparse.ArgumentParser(description="Direct vs grouped-commit ticket writes")
+    parser.add_argument("--customers", type=int, default=1000)
+    parser.add_argument("--tickets", type=int, default=2000, help="tickets written per mode")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--max-batch-size", type=int, default=256)
+    parser.add_argument("--max-delay-ms", type=float, default=0.0)
+    parser.add_argument("--output", type=Path, help="write JSON here instead of stdout")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / "writes.db"
+        for stat in bulk_load(db_path, synthetic_customers(args.customers), []):
+            print(stat, file=sys.stderr)
+
+        direct = run_writes(db_path, args.customers, args.tickets, args.concurrency)
+        writer = db.enable_group_commit(db_path, args.max_batch_size, args.max_delay_ms / 1000)
+        try:
+            grouped = run_writes(db_path, args.customers, args.tickets, args.concurrency)
+            grouped["commits"] = writer.batches
+            grouped["avg_batch"] = round(writer.writes / max(writer.batches, 1), 1)
+        finally:
+            db.disable_group_commit(db_path)
+            db.close_pools(db_path)
+
+    report = {
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "sqlite": db.sqlite3.sqlite_version,
+        "max_batch_size": args.max_batch_size,
+        "max_delay_ms": args.max_delay_ms,
+        "direct": direct,
+        "grouped": grouped,
+        "speedup": round(grouped["tickets_per_sec"] / direct["tickets_per_sec"], 2),
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        args.output.write_text(text + "\n", encoding="utf-8")
+    else:
+        print(text)
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+
+_MISSING = object()
+
+
+class LRUCache:
+    """
+    Thread-safe LRU cache bounded by entry count, with an optional per-entry TTL in seconds.
+
+    Read-through callers take version(key) before reading the source and store the result with
+    fill(key, value, version): if the key was invalidated in between (a write landed while the
+    read was in flight), the possibly stale value is dropped instead of cached.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: Optional[float] = None, clock: Callable[[], float] = time.monotonic) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        # Per-key invalidation counters, bounded; keys pruned from it read as _floor, which is
+        # at least their last version, so pruning can only reject fills, never accept stale ones.
+        self._versions: "OrderedDict[Hashable, int]" = OrderedDict()
+        self._writes = 0
+        self._floor = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._entries.get(key, _MISSING)
+            if entry is _MISSING:
+                self.misses += 1
+                return default
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= self._clock():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._store(key, value)
+
+    def version(self, key: Hashable) -> int:
+        with self._lock:
+            return self._versions.get(key, self._floor)
+
+    def fill(self, key: Hashable, value: Any, version: int) -> bool:
+        """
+        set(key, value) unless key was invalidated since version(key) returned version.
+        """
+        if self.maxsize <= 0:
+            return False
+        with self._lock:
+            if self._versions.get(key, self._floor) != version:
+                return False
+            self._store(key, value)
+            return True
+
+    def _store(self, key: Hashable, value: Any) -> None:
+        # Caller holds self._lock.
+        expires_at = self._clock() + self.ttl if self.ttl is not None else None
+        self._entries[key] = (value, expires_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, key: Hashable) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+            self._writes += 1
+            self._versions[key] = self._writes
+            self._versions.move_to_end(key)
+            while len(self._versions) > max(self.maxsize, 1) * 4:
+                _, pruned = self._versions.popitem(last=False)
+                self._floor = max(self._floor, pruned)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._versions.clear()
+            self._writes += 1
+            self._floor = self._writes
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
@@ -1,6 +1,17 @@
+import argparse
+import calendar
+import csv
+import itertools
+import json
+import random
 import sqlite3
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
 from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, TextIO, Tuple
 
+import db
 from db import DATA_DIR, DB_PATH
 
 
@@ -22,23 +33,325 @@ TICKETS = [
     (6, 12345, "Billing inquiry: duplicate charge detected", "open", "high"),
 ]
 
+# Full-text index over tickets.issue for db.search_tickets(). External content: the
+# index stores only tokens and reads rows back from tickets; the triggers keep it in
+# sync with every insert (create_ticket, grouped and batch writes), update and delete.
+# Porter stemming lets "charged" match "charge". Without FTS5 migration v4 only bumps
+# the version and search falls back to LIKE; migrate() builds the index later if the database is
+# migrated again under an SQLite that has FTS5.
+FTS_INDEX = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS tickets_fts USING fts5("
+    "issue, content='tickets', content_rowid='id', tokenize='porter unicode61')",
+    "DROP TRIGGER IF EXISTS trg_tickets_fts_insert",
+    "DROP TRIGGER IF EXISTS trg_tickets_fts_delete",
+    "DROP TRIGGER IF EXISTS trg_tickets_fts_update",
+    "INSERT INTO tickets_fts (tickets_fts) VALUES ('rebuild')",
+    """
+    CREATE TRIGGER trg_tickets_fts_insert AFTER INSERT ON tickets
+    BEGIN
+        INSERT INTO tickets_fts (rowid, issue) VALUES (NEW.id, NEW.issue);
+    END
+    """,
+    """
+    CREATE TRIGGER trg_tickets_fts_delete AFTER DELETE ON tickets
+    BEGIN
+        INSERT INTO tickets_fts (tickets_fts, rowid, issue) VALUES ('delete', OLD.id, OLD.issue);
+    END
+    """,
+    """
+    CREATE TRIGGER trg_tickets_fts_update AFTER UPDATE OF issue ON tickets
+    BEGIN
+        INSERT INTO tickets_fts (tickets_fts, rowid, issue) VALUES ('delete', OLD.id, OLD.issue);
+        INSERT INTO tickets_fts (rowid, issue) VALUES (NEW.id, NEW.issue);
+    END
+    """,
+]
+
+
+# Refills the materialized open-ticket view (MIGRATIONS v3) from tickets and customers.
+OPEN_TICKETS_REBUILD = [
+    "DELETE FROM open_tickets",
+    "INSERT INTO open_tickets (ticket_id, customer_id, customer_status, priority, status, created_at) "
+    "SELECT t.id, t.customer_id, c.status, t.priority, t.status, t.created_at "
+    "FROM tickets t LEFT JOIN customers c ON c.id = t.customer_id WHERE t.status != 'resolved'",
+    "DELETE FROM open_ticket_counts",
+    "INSERT INTO open_ticket_counts (customer_id, priority, status, ticket_count) "
+    "SELECT customer_id, priority, status, COUNT(*) FROM open_tickets GROUP BY customer_id, priority, status",
+]
+
+# Copies each customer's status onto their open_ticket_counts rows (MIGRATIONS v5).
+OPEN_TICKET_COUNTS_STATUS = (
+    "UPDATE open_ticket_counts SET customer_status = (SELECT status FROM customers WHERE id = open_ticket_counts.customer_id)"
+)
+
+# Versioned schema changes applied on top of the base tables. The schema version is
+# tracked in PRAGMA user_version; append new steps, never edit shipped ones.
+MIGRATIONS: List[Tuple[int, List[str]]] = [
+    (
+        1,
+        [
+            # get_customer_history: WHERE customer_id = ? ORDER BY created_at DESC
+            "CREATE INDEX IF NOT EXISTS idx_tickets_customer_created ON tickets (customer_id, created_at)",
+            # list_open_tickets: partial index over non-resolved tickets only, covering the
+            # columns needed to filter and join without touching the table.
+            "CREATE INDEX IF NOT EXISTS idx_tickets_open_priority "
+            "ON tickets (priority, created_at, customer_id, status) WHERE status != 'resolved'",
+            # list_customers with and without a status filter, newest first
+            "CREATE INDEX IF NOT EXISTS idx_customers_status_created ON customers (status, created_at)",
+            "CREATE INDEX IF NOT EXISTS idx_customers_created ON customers (created_at)",
+        ],
+    ),
+    (
+        2,
+        [
+            # Keyset paging over open tickets orders by (priority, created_at, id); extra index
+            # columns after created_at broke the implicit rowid order and forced a sort per page.
+            "DROP INDEX IF EXISTS idx_tickets_open_priority",
+            "CREATE INDEX IF NOT EXISTS idx_tickets_open_order ON tickets (priority, created_at) WHERE status != 'resolved'",
+        ],
+    ),
+    (
+        3,
+        [
+            # Materialized open-ticket view: one row per non-resolved ticket carrying its
+            # customer's status, so reports filtered by customer status and priority read only
+            # matching rows. open_ticket_counts holds per customer/priority/status counts for
+            # dashboards. Both are kept current by the triggers below and filled here; bulk_load()
+            # refills them with OPEN_TICKETS_REBUILD after loading with the triggers dropped.
+            """
+            CREATE TABLE IF NOT EXISTS open_tickets (
+                ticket_id INTEGER PRIMARY KEY,
+                customer_id INTEGER NOT NULL,
+                customer_status TEXT,
+                priority TEXT NOT NULL,
+                status TEXT NOT NULL,
+                created_at TIMESTAMP
+            )
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS open_ticket_counts (
+                customer_id INTEGER NOT NULL,
+                priority TEXT NOT NULL,
+                status TEXT NOT NULL,
+                ticket_count INTEGER NOT NULL,
+                PRIMARY KEY (customer_id, priority, status)
+            ) WITHOUT ROWID
+            """,
+            *(f"DROP TRIGGER IF EXISTS {name}" for name in (
+                "trg_tickets_open_insert",
+                "trg_tickets_open_update",
+                "trg_tickets_open_delete",
+                "trg_customers_open_status",
+                "trg_customers_open_insert",
+                "trg_customers_open_delete",
+                "trg_open_tickets_count_insert",
+                "trg_open_tickets_count_delete",
+            )),
+            *OPEN_TICKETS_REBUILD,
+            # Report order (priority DESC, created_at DESC, id DESC); ticket_id is the rowid.
+            "CREATE INDEX IF NOT EXISTS idx_open_tickets_report ON open_tickets (customer_status, priority, created_at)",
+            "CREATE INDEX IF NOT EXISTS idx_open_tickets_customer ON open_tickets (customer_id)",
+            """
+            CREATE TRIGGER trg_tickets_open_insert AFTER INSERT ON tickets WHEN NEW.status != 'resolved'
+            BEGIN
+                INSERT INTO open_tickets (ticket_id, customer_id, customer_status, priority, status, created_at)
+                VALUES (NEW.id, NEW.customer_id, (SELECT status FROM customers WHERE id = NEW.customer_id),
+                        NEW.priority, NEW.status, NEW.created_at);
+            END
+            """,
+            """
+            CREATE TRIGGER trg_tickets_open_update AFTER UPDATE OF customer_id, status, priority, created_at ON tickets
+            BEGIN
+                DELETE FROM open_tickets WHERE ticket_id = OLD.id;
+                INSERT INTO open_tickets (ticket_id, customer_id, customer_status, priority, status, created_at)
+                SELECT NEW.id, NEW.customer_id, (SELECT status FROM customers WHERE id = NEW.customer_id),
+                       NEW.priority, NEW.status, NEW.created_at
+                WHERE NEW.status != 'resolved';
+            END
+            """,
+            """
+            CREATE TRIGGER trg_tickets_open_delete AFTER DELETE ON tickets
+            BEGIN
+                DELETE FROM open_tickets WHERE ticket_id = OLD.id;
+            END
+            """,
+            """
+            CREATE TRIGGER trg_customers_open_status AFTER UPDATE OF status ON customers WHEN OLD.status IS NOT NEW.status
+            BEGIN
+                UPDATE open_tickets SET customer_status = NEW.status WHERE customer_id = NEW.id;
+            END
+            """,
+            """
+            CREATE TRIGGER trg_customers_open_insert AFTER INSERT ON customers
+            BEGIN
+                UPDATE open_tickets SET customer_status = NEW.status WHERE customer_id = NEW.id;
+            END
+            """,
+            """
+            CREATE TRIGGER trg_customers_open_delete AFTER DELETE ON customers
+            BEGIN
+                UPDATE open_tickets SET customer_status = NULL WHERE customer_id = OLD.id;
+            END
+            """,
+            """
+            CREATE TRIGGER trg_open_tickets_count_insert AFTER INSERT ON open_tickets
+            BEGIN
+                INSERT INTO open_ticket_counts (customer_id, priority, status, ticket_count)
+                VALUES (NEW.customer_id, NEW.priority, NEW.status, 1)
+                ON CONFLICT (customer_id, priority, status) DO UPDATE SET ticket_count = ticket_count + 1;
+            END
+            """,
+            """
+            CREATE TRIGGER trg_open_tickets_count_delete AFTER DELETE ON open_tickets
+            BEGIN
+                UPDATE open_ticket_counts SET ticket_count = ticket_count - 1
+                WHERE customer_id = OLD.customer_id AND priority = OLD.priority AND status = OLD.status;
+                DELETE FROM open_ticket_counts
+                WHERE customer_id = OLD.customer_id AND priority = OLD.priority AND status = OLD.status AND ticket_count <= 0;
+            END
+            """,
+        ],
+    ),
+    (4, FTS_INDEX if db.HAS_FTS5 else []),
+    (
+        5,
+        [
+            # get_open_ticket_totals(customer_status): carry the customer's status on each count
+            # row, so filtered totals read only the matching rows instead of joining every
+            # customer with that status. The customers triggers keep it current on both tables.
+            "ALTER TABLE open_ticket_counts ADD COLUMN customer_status TEXT",
+            OPEN_TICKET_COUNTS_STATUS,
+            "CREATE INDEX IF NOT EXISTS idx_open_ticket_counts_status "
+            "ON open_ticket_counts (customer_status, priority, status, ticket_count)",
+            "DROP TRIGGER IF EXISTS trg_open_tickets_count_insert",
+            "DROP TRIGGER IF EXISTS trg_customers_open_status",
+            "DROP TRIGGER IF EXISTS trg_customers_open_insert",
+            "DROP TRIGGER IF EXISTS trg_customers_open_delete",
+            """
+            CREATE TRIGGER trg_open_tickets_count_insert AFTER INSERT ON open_tickets
+            BEGIN
+                INSERT INTO open_ticket_counts (customer_id, priority, status, ticket_count, customer_status)
+                VALUES (NEW.customer_id, NEW.priority, NEW.status, 1, NEW.customer_status)
+                ON CONFLICT (customer_id, priority, status) DO UPDATE SET ticket_count = ticket_count + 1;
+            END
+            """,
+            """
+            CREATE TRIGGER trg_customers_open_status AFTER UPDATE OF status ON customers WHEN OLD.status IS NOT NEW.status
+            BEGIN
+                UPDATE open_tickets SET customer_status = NEW.status WHERE customer_id = NEW.id;
+                UPDATE open_ticket_counts SET customer_status = NEW.status WHERE customer_id = NEW.id;
+            END
+            """,
+            """
+            CREATE TRIGGER trg_customers_open_insert AFTER INSERT ON customers
+            BEGIN
+                UPDATE open_tickets SET customer_status = NEW.status WHERE customer_id = NEW.id;
+                UPDATE open_ticket_counts SET customer_status = NEW.status WHERE customer_id = NEW.id;
+            END
+            """,
+            """
+            CREATE TRIGGER trg_customers_open_delete AFTER DELETE ON customers
+            BEGIN
+                UPDATE open_tickets SET customer_status = NULL WHERE customer_id = OLD.id;
+                UPDATE open_ticket_counts SET customer_status = NULL WHERE customer_id = OLD.id;
+            END
+            """,
+        ],
+    ),
+]
+
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+if SCHEMA_VERSION != db.SCHEMA_VERSION:
+    raise RuntimeError(f"db.SCHEMA_VERSION is {db.SCHEMA_VERSION}, but MIGRATIONS end at version {SCHEMA_VERSION}")
 
-def bootstrap_database(db_path: Path = DB_PATH, reset_existing: bool = True) -> None:
+# The hot queries from db.py paired with the index each one is expected to use.
+QUERY_PLAN_CHECKS: List[Tuple[str, tuple, str]] = [
+    (
+        "SELECT * FROM tickets WHERE customer_id = ? ORDER BY created_at DESC",
+        (1,),
+        "idx_tickets_customer_created",
+    ),
+    (
+        "SELECT * FROM tickets WHERE status != 'resolved' ORDER BY priority DESC, created_at DESC",
+        (),
+        "idx_tickets_open_order",
+    ),
+    (
+        "SELECT t.* FROM open_tickets o CROSS JOIN tickets t ON t.id = o.ticket_id "
+        "WHERE o.customer_status = ? AND (o.priority, o.created_at, o.ticket_id) < (?, ?, ?) "
+        "ORDER BY o.priority DESC, o.created_at DESC, o.ticket_id DESC LIMIT ?",
+        ("active", "medium", "2100-01-01", 0, 500),
+        "idx_open_tickets_report",
+    ),
+    (
+        "SELECT priority, status, SUM(ticket_count) FROM open_ticket_counts WHERE customer_status = ? GROUP BY priority, status",
+        ("active",),
+        "idx_open_ticket_counts_status",
+    ),
+    (
+        "SELECT * FROM customers WHERE status = ? ORDER BY created_at DESC LIMIT ?",
+        ("active", 10),
+        "idx_customers_status_created",
+    ),
+    (
+        "SELECT * FROM customers ORDER BY created_at DESC LIMIT ?",
+        (10,),
+        "idx_customers_created",
+    ),
+]
+
+
+def migrate(conn: sqlite3.Connection) -> int:
     """
-    Build the demo database from the dataset in this file.
+    Apply pending MIGRATIONS to an open connection and return the resulting schema version.
+    """
+    current = conn.execute("PRAGMA user_version").fetchone()[0]
+    for version, statements in MIGRATIONS:
+        if version <= current:
+            continue
+        with conn:
+            for statement in statements:
+                conn.execute(statement)
+            conn.execute(f"PRAGMA user_version = {version}")
+        current = version
+    if current >= 4 and db.HAS_FTS5 and not conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'tickets_fts'").fetchone():
+        # Version 4 was applied by an SQLite without FTS5; build the index now that it is available.
+        with conn:
+            for statement in FTS_INDEX:
+                conn.execute(statement)
+    return current
 
-    reset_existing=False will keep an existing DB intact; reset_existing=True recreates tables.
+
+def check_query_plans(db_path: Path = DB_PATH) -> Dict[str, str]:
     """
-    DATA_DIR.mkdir(parents=True, exist_ok=True)
-    if db_path.exists() and not reset_existing:
-        return
+    Run EXPLAIN QUERY PLAN for the hot db.py queries and confirm each uses its index.
 
+    Returns the plan text per query; raises RuntimeError if an expected index is not used.
+    """
     conn = sqlite3.connect(db_path)
-    conn.row_factory = sqlite3.Row
-    cur = conn.cursor()
+    try:
+        plans: Dict[str, str] = {}
+        missing: List[str] = []
+        for sql, params, index_name in QUERY_PLAN_CHECKS:
+            rows = conn.execute(f"EXPLAIN QUERY PLAN {sql}", params).fetchall()
+            plan = "; ".join(row[3] for row in rows)
+            plans[sql] = plan
+            if index_name not in plan:
+                missing.append(f"{sql!r} -> {plan}")
+    finally:
+        conn.close()
+    if missing:
+        raise RuntimeError("Queries not using their indexes:\n" + "\n".join(missing))
+    return plans
+
 
+def _create_tables(cur: sqlite3.Cursor) -> None:
+    cur.execute("DROP TABLE IF EXISTS tickets_fts")
+    cur.execute("DROP TABLE IF EXISTS open_ticket_counts")
+    cur.execute("DROP TABLE IF EXISTS open_tickets")
     cur.execute("DROP TABLE IF EXISTS tickets")
     cur.execute("DROP TABLE IF EXISTS customers")
+    cur.execute("PRAGMA user_version = 0")
 
     cur.execute(
         """
@@ -68,19 +381,304 @@ def bootstrap_database(db_path: Path = DB_PATH, reset_existing: bool = True) ->
         """
     )
 
+
+def bootstrap_database(
+    db_path: Path = DB_PATH,
+    reset_existing: bool = True,
+    customers: Iterable[tuple] = CUSTOMERS,
+    tickets: Iterable[tuple] = TICKETS,
+    log: Optional[TextIO] = None,
+) -> None:
+    """
+    Build the demo database from the dataset in this file.
+
+    customers/tickets default to CUSTOMERS/TICKETS; any iterable of rows in the same shape
+    (e.g. a generator of synthetic rows) can be passed instead and is consumed lazily.
+
+    reset_existing=False will keep an existing DB intact (only pending migrations are applied);
+    reset_existing=True recreates tables. The summary line goes to log (default stdout).
+    """
+    DATA_DIR.mkdir(parents=True, exist_ok=True)
+    if db_path.exists() and not reset_existing:
+        conn = sqlite3.connect(db_path)
+        try:
+            migrate(conn)
+        finally:
+            conn.close()
+        return
+
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    cur = conn.cursor()
+
+    _create_tables(cur)
+
     cur.executemany(
         "INSERT INTO customers (id, name, email, phone, status) VALUES (?, ?, ?, ?, ?)",
-        CUSTOMERS,
+        customers,
     )
+    customer_count = cur.rowcount
     cur.executemany(
         "INSERT INTO tickets (id, customer_id, issue, status, priority) VALUES (?, ?, ?, ?, ?)",
-        TICKETS,
+        tickets,
     )
+    ticket_count = cur.rowcount
 
     conn.commit()
+    migrate(conn)
     conn.close()
-    print(f"Database initialized with {len(CUSTOMERS)} customers and {len(TICKETS)} tickets at {db_path}")
+    # Cached records from the previous dataset are no longer valid.
+    db.clear_caches()
+    print(f"Database initialized with {customer_count} customers and {ticket_count} tickets at {db_path}", file=log)
+
+
+# Column order for bulk loads. Missing values (None) fall back to the table defaults.
+CUSTOMER_COLUMNS = ("id", "name", "email", "phone", "status", "created_at", "updated_at")
+TICKET_COLUMNS = ("id", "customer_id", "issue", "status", "priority", "created_at")
+
+_BULK_INSERTS = {
+    "customers": (
+        "INSERT INTO customers (id, name, email, phone, status, created_at, updated_at) "
+        "VALUES (?, ?, ?, ?, COALESCE(?, 'active'), COALESCE(?, CURRENT_TIMESTAMP), COALESCE(?, CURRENT_TIMESTAMP))"
+    ),
+    "tickets": (
+        "INSERT INTO tickets (id, customer_id, issue, status, priority, created_at) "
+        "VALUES (?, ?, ?, COALESCE(?, 'open'), COALESCE(?, 'medium'), COALESCE(?, CURRENT_TIMESTAMP))"
+    ),
+}
+_COLUMNS = {"customers": CUSTOMER_COLUMNS, "tickets": TICKET_COLUMNS}
+
+
+@dataclass
+class LoadStats:
+    table: str
+    rows: int
+    seconds: float
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.seconds if self.seconds else 0.0
+
+    def __str__(self) -> str:
+        return f"{self.table}: {self.rows:,} rows in {self.seconds:.2f}s ({self.rows_per_second:,.0f} rows/s)"
+
+
+def read_rows(path: Path, table: str) -> Iterator[tuple]:
+    """
+    Stream rows for `table` from a CSV (with header) or JSONL export, one record at a time.
+
+    Columns are matched by name; absent fields, and empty CSV cells, become None. JSONL values
+    are kept as they are, so 0 and "" stay 0 and "".
+    """
+    columns = _COLUMNS[table]
+    path = Path(path)
+    with open(path, newline="", encoding="utf-8") as handle:
+        if path.suffix.lower() in (".jsonl", ".ndjson"):
+            for line in handle:
+                if line.strip():
+                    record = json.loads(line)
+                    yield tuple(record.get(column) for column in columns)
+        else:
+            for row in csv.DictReader(handle):
+                yield tuple(row.get(column) or None for column in columns)
+
+
+def synthetic_customers(count: int, seed: int = 7) -> Iterator[tuple]:
+    """
+    Deterministic customers for load testing: the demo CUSTOMERS (the scenarios refer to ids
+    5 and 12345) followed by generated ones, in CUSTOMER_COLUMNS order.
+    """
+    rng = random.Random(seed)
+    for row in CUSTOMERS[:count]:
+        yield row + (None, None)
+    taken = {row[0] for row in CUSTOMERS}
+    start = datetime(2023, 1, 1)
+    next_id = 1
+    for _ in range(max(count - len(CUSTOMERS), 0)):
+        while next_id in taken:
+            next_id += 1
+        status = "active" if rng.random() < 0.85 else "disabled"
+        created = (start + timedelta(minutes=next_id)).strftime("%Y-%m-%d %H:%M:%S")
+        yield (next_id, f"Customer {next_id}", f"customer{next_id}@example.com", f"555-{next_id % 10000:04d}", status, created, created)
+        next_id += 1
+
+
+SYNTHETIC_ISSUES = [
+    "Password reset assistance",
+    "App keeps crashing on login",
+    "Refund pending for last order",
+    "Payment failed and account locked",
+    "Upgrade request to premium plus",
+    "Billing inquiry: duplicate charge detected",
+]
+
+
+def synthetic_tickets(count: int, customer_count: int, seed: int = 11) -> Iterator[tuple]:
+    """
+    Deterministic tickets in TICKET_COLUMNS order, skewed so some customers have long histories.
+    """
+    rng = random.Random(seed)
+    demo_ids = [row[0] for row in CUSTOMERS]
+    # Weighted pools sampled with one rng.random() each; much cheaper than rng.choices per row.
+    statuses = ("open",) * 2 + ("in_progress",) + ("resolved",) * 7
+    priorities = ("low",) * 5 + ("medium",) * 4 + ("high",)
+    for row in TICKETS[:count]:
+        yield row + (None,)
+    start = calendar.timegm((2024, 1, 1, 0, 0, 0))
+    customer_count = max(customer_count, 1)
+    for ticket_id in range(len(TICKETS) + 1, count + 1):
+        customer_id = int(rng.paretovariate(1.2)) % customer_count + 1
+        if rng.random() < 0.01:
+            customer_id = rng.choice(demo_ids)
+        created = time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime(start + ticket_id * 7))
+        yield (
+            ticket_id,
+            customer_id,
+            SYNTHETIC_ISSUES[int(rng.random() * len(SYNTHETIC_ISSUES))],
+            statuses[int(rng.random() * len(statuses))],
+            priorities[int(rng.random() * len(priorities))],
+            created,
+        )
+
+
+def _insert_chunked(conn: sqlite3.Connection, table: str, rows: Iterable[tuple], chunk_size: int, chunks_per_commit: int) -> LoadStats:
+    sql = _BULK_INSERTS[table]
+    iterator = iter(rows)
+    total = 0
+    start = time.perf_counter()
+    conn.execute("BEGIN")
+    chunks = 0
+    while True:
+        chunk = list(itertools.islice(iterator, chunk_size))
+        if not chunk:
+            break
+        conn.executemany(sql, chunk)
+        total += len(chunk)
+        chunks += 1
+        if chunks % chunks_per_commit == 0:
+            conn.execute("COMMIT")
+            conn.execute("BEGIN")
+    conn.execute("COMMIT")
+    return LoadStats(table, total, time.perf_counter() - start)
+
+
+def bulk_load(
+    db_path: Path = DB_PATH,
+    customers: Optional[Iterable[tuple]] = None,
+    tickets: Optional[Iterable[tuple]] = None,
+    reset_existing: bool = True,
+    chunk_size: int = 50_000,
+    chunks_per_commit: int = 20,
+) -> List[LoadStats]:
+    """
+    Stream large row sets into the database with chunked executemany in big transactions.
+
+    Rows are tuples in CUSTOMER_COLUMNS / TICKET_COLUMNS order, e.g. from read_rows() or the
+    synthetic_* generators; only one chunk is held in memory at a time. Secondary indexes and
+    the open-ticket view triggers are dropped for the load and rebuilt afterwards.
+    reset_existing=False appends to the existing tables instead of recreating them and only
+    applies the migrations past the stored schema version.
+    """
+    DATA_DIR.mkdir(parents=True, exist_ok=True)
+    # Autocommit mode: transactions are managed explicitly below.
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    try:
+        conn.execute("PRAGMA synchronous = OFF")
+        conn.execute("PRAGMA temp_store = MEMORY")
+        conn.execute("PRAGMA cache_size = -262144")
+        dropped: List[Tuple[str, str]] = []
+        if reset_existing:
+            _create_tables(conn.cursor())
+        else:
+            # Per-row index and view maintenance would dominate the load; the indexes and triggers
+            # are recreated from their stored SQL afterwards and the derived tables refilled.
+            schema = conn.execute(
+                "SELECT type, name, sql FROM sqlite_master "
+                "WHERE (type = 'index' AND name LIKE 'idx_%') OR (type = 'trigger' AND name LIKE 'trg_%')"
+            ).fetchall()
+            for kind, name, sql in schema:
+                conn.execute(f"DROP {kind.upper()} {name}")
+                dropped.append((kind, sql))
+
+        stats = []
+        try:
+            if customers is not None:
+                stats.append(_insert_chunked(conn, "customers", customers, chunk_size, chunks_per_commit))
+            if tickets is not None:
+                stats.append(_insert_chunked(conn, "tickets", tickets, chunk_size, chunks_per_commit))
+        except BaseException:
+            # Chunks committed before the failure stay loaded; never leave the schema unindexed.
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            _restore_after_append(conn, dropped)
+            migrate(conn)
+            raise
+
+        start = time.perf_counter()
+        _restore_after_append(conn, dropped)
+        migrate(conn)
+        stats.append(LoadStats("indexes", sum(s.rows for s in stats), time.perf_counter() - start))
+        conn.execute("PRAGMA journal_mode = WAL")
+    finally:
+        conn.close()
+    db.clear_caches()
+    return stats
+
+
+def _restore_after_append(conn: sqlite3.Connection, dropped: List[Tuple[str, str]]) -> None:
+    """
+    Undo bulk_load(reset_existing=False)'s schema changes: refill the derived tables the dropped
+    triggers would have maintained, then recreate the indexes before the triggers.
+    """
+    if not dropped:
+        return
+    tables = {name for (name,) in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    statements = OPEN_TICKETS_REBUILD if "open_tickets" in tables else []
+    if statements and any(row[1] == "customer_status" for row in conn.execute("PRAGMA table_info(open_ticket_counts)")):
+        statements = statements + [OPEN_TICKET_COUNTS_STATUS]
+    if "tickets_fts" in tables:
+        statements = statements + ["INSERT INTO tickets_fts (tickets_fts) VALUES ('rebuild')"]
+    conn.execute("BEGIN")
+    for statement in statements:
+        conn.execute(statement)
+    for _, sql in sorted(dropped, key=lambda item: item[0] != "index"):
+        conn.execute(sql)
+    conn.execute("COMMIT")
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Create or bulk-load the customer service database.")
+    parser.add_argument("--db-path", type=Path, default=DB_PATH)
+    parser.add_argument("--customers", type=Path, help="CSV/JSONL export of customers to bulk-load")
+    parser.add_argument("--tickets", type=Path, help="CSV/JSONL export of tickets to bulk-load")
+    parser.add_argument("--synthetic-customers", type=int, help="generate this many synthetic customers")
+    parser.add_argument("--synthetic-tickets", type=int, help="generate this many synthetic tickets")
+    parser.add_argument("--append", action="store_true", help="append to existing tables instead of recreating them")
+    parser.add_argument("--chunk-size", type=int, default=50_000)
+    parser.add_argument("--check-plans", action="store_true", help="verify the hot queries use their indexes")
+    args = parser.parse_args(argv)
+
+    bulk = args.customers or args.tickets or args.synthetic_customers or args.synthetic_tickets
+    if bulk:
+        customer_rows: Optional[Iterable[tuple]] = None
+        ticket_rows: Optional[Iterable[tuple]] = None
+        if args.customers:
+            customer_rows = read_rows(args.customers, "customers")
+        elif args.synthetic_customers:
+            customer_rows = synthetic_customers(args.synthetic_customers)
+        if args.tickets:
+            ticket_rows = read_rows(args.tickets, "tickets")
+        elif args.synthetic_tickets:
+            ticket_rows = synthetic_tickets(args.synthetic_tickets, args.synthetic_customers or len(CUSTOMERS))
+        for stat in bulk_load(args.db_path, customer_rows, ticket_rows, reset_existing=not args.append, chunk_size=args.chunk_size):
+            print(stat)
+    else:
+        bootstrap_database(args.db_path)
+
+    if args.check_plans:
+        for sql, plan in check_query_plans(args.db_path).items():
+            print(f"{sql}\n  -> {plan}")
 
 
 if __name__ == "__main__":
-    bootstrap_database()
+    main()
@@ -1,61 +1,370 @@
+import atexit
+import base64
+import functools
+import json
+import os
+import queue
+import re
 import sqlite3
+import threading
+import time
+from concurrent.futures import Future
 from contextlib import closing
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Mapping, Optional, Set, Tuple
+
+from cache import LRUCache
+from tracing import traced
 
 
 DATA_DIR = Path(__file__).resolve().parent / "data"
 DB_PATH = DATA_DIR / "customer_service.db"
+# PRAGMA user_version of a fully migrated database (the last database_setup.MIGRATIONS step),
+# kept here so callers can check a file without importing database_setup.
+SCHEMA_VERSION = 5
+
+# Applied to every pooled connection. journal_mode=WAL is persisted in the file,
+# the rest are per-connection settings.
+PRAGMAS = (
+    ("journal_mode", "WAL"),
+    ("synchronous", "NORMAL"),
+    ("cache_size", -16000),  # negative = KiB, so ~16 MB of page cache
+    ("mmap_size", 256 * 1024 * 1024),
+    ("temp_store", "MEMORY"),
+)
 
 
 def _connect(db_path: Path = DB_PATH) -> sqlite3.Connection:
     DATA_DIR.mkdir(parents=True, exist_ok=True)
-    conn = sqlite3.connect(db_path)
+    # Pooled connections are closed from whichever thread shuts the pool down.
+    conn = sqlite3.connect(db_path, check_same_thread=False)
     conn.row_factory = sqlite3.Row
+    for name, value in PRAGMAS:
+        conn.execute(f"PRAGMA {name} = {value}")
     return conn
 
 
+class ConnectionPool:
+    """
+    Long-lived connections to one database file, one per thread.
+    """
+
+    def __init__(self, db_path: Path) -> None:
+        self.db_path = db_path
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections: List[sqlite3.Connection] = []
+
+    def connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = _connect(self.db_path)
+            self._local.conn = conn
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+
+    def close(self) -> None:
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            conn.close()
+        self._local = threading.local()
+
+
+_pools: Dict[str, ConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+
+@functools.lru_cache(maxsize=1024)
+def _pool_key(db_path: Path) -> str:
+    # resolve() stats every path component; memoized, since this keys every pooled connection
+    # and cache lookup. A relative path keeps the meaning it had at first use (cwd changes
+    # after that are not seen).
+    return str(Path(db_path).resolve())
+
+
+def get_pool(db_path: Path = DB_PATH) -> ConnectionPool:
+    key = _pool_key(db_path)
+    pool = _pools.get(key)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(key)
+            if pool is None:
+                pool = _pools[key] = ConnectionPool(Path(key))
+    return pool
+
+
+def _get_connection(db_path: Path = DB_PATH) -> sqlite3.Connection:
+    return get_pool(db_path).connection()
+
+
+def close_pools(db_path: Optional[Path] = None) -> None:
+    """
+    Close pooled connections for one database, or for all of them when db_path is None.
+    """
+    with _pools_lock:
+        if db_path is None:
+            pools = list(_pools.values())
+            _pools.clear()
+        else:
+            pool = _pools.pop(_pool_key(db_path), None)
+            pools = [pool] if pool else []
+    for pool in pools:
+        pool.close()
+
+
+atexit.register(close_pools)
+
+
+# Read-through caches for get_customer / get_customer_history, keyed by (database, customer id).
+# Writes through update_customer and create_ticket keep them coherent; writes made outside this
+# module are only picked up once the TTL expires.
+CUSTOMER_CACHE_SIZE = 4096
+HISTORY_CACHE_SIZE = 1024
+CACHE_TTL_SECONDS = 30.0
+
+_customer_cache = LRUCache(CUSTOMER_CACHE_SIZE, ttl=CACHE_TTL_SECONDS)
+_history_cache = LRUCache(HISTORY_CACHE_SIZE, ttl=CACHE_TTL_SECONDS)
+
+
+def configure_caches(
+    customer_size: int = CUSTOMER_CACHE_SIZE,
+    history_size: int = HISTORY_CACHE_SIZE,
+    ttl: Optional[float] = CACHE_TTL_SECONDS,
+) -> None:
+    """
+    Replace the record caches; a size of 0 disables that cache.
+    """
+    global _customer_cache, _history_cache
+    _customer_cache = LRUCache(customer_size, ttl=ttl)
+    _history_cache = LRUCache(history_size, ttl=ttl)
+
+
+def clear_caches() -> None:
+    _customer_cache.clear()
+    _history_cache.clear()
+    _fts_databases.clear()
+
+
+def cache_stats() -> Dict[str, Dict[str, Any]]:
+    return {"customer": _customer_cache.stats(), "history": _history_cache.stats()}
+
+
+# Rows yielded by the iter_* helpers. sqlite3.Row is a C-level tuple with name lookup
+# (row["status"], row.keys()), so streaming avoids building a dict per row.
+Row = sqlite3.Row
+
+FETCH_BATCH_SIZE = 256
+
+
 def _row_to_dict(row: sqlite3.Row) -> Dict[str, Any]:
     return {k: row[k] for k in row.keys()}
 
 
-def get_customer(customer_id: int, db_path: Path = DB_PATH) -> Optional[Dict[str, Any]]:
-    with closing(_connect(db_path)) as conn, closing(conn.cursor()) as cur:
+def _iter_query(
+    sql: str, params: Iterable[Any], batch_size: int, db_path: Path, connect: Callable[[Path], sqlite3.Connection] = _get_connection
+) -> Iterator[Row]:
+    conn = connect(db_path)
+    with closing(conn.cursor()) as cur:
+        cur.execute(sql, tuple(params))
+        while True:
+            rows = cur.fetchmany(batch_size)
+            if not rows:
+                return
+            yield from rows
+
+
+def _fetch_customer(customer_id: int, db_path: Path) -> Optional[Dict[str, Any]]:
+    conn = _get_connection(db_path)
+    with closing(conn.cursor()) as cur:
         cur.execute("SELECT * FROM customers WHERE id = ?", (customer_id,))
         row = cur.fetchone()
         return _row_to_dict(row) if row else None
 
 
-def list_customers(status: Optional[str] = None, limit: int = 10, db_path: Path = DB_PATH) -> List[Dict[str, Any]]:
-    with closing(_connect(db_path)) as conn, closing(conn.cursor()) as cur:
-        if status:
-            cur.execute(
-                "SELECT * FROM customers WHERE status = ? ORDER BY created_at DESC LIMIT ?",
-                (status, limit),
-            )
+@traced("db.get_customer")
+def get_customer(customer_id: int, db_path: Path = DB_PATH) -> Optional[Dict[str, Any]]:
+    key = (_pool_key(db_path), customer_id)
+    customer = _customer_cache.get(key)
+    if customer is None:
+        version = _customer_cache.version(key)
+        customer = _fetch_customer(customer_id, db_path)
+        if customer is None:
+            return None
+        _customer_cache.fill(key, customer, version)
+    # Hand out copies so callers cannot mutate cached entries.
+    return dict(customer)
+
+
+# Stay well under SQLite's bound-parameter limit for IN (...) lists.
+MAX_IN_PARAMS = 500
+
+
+def _chunks(ids: List[int], size: int = MAX_IN_PARAMS) -> Iterator[List[int]]:
+    for start in range(0, len(ids), size):
+        yield ids[start:start + size]
+
+
+@traced("db.get_customers")
+def get_customers(customer_ids: Iterable[int], db_path: Path = DB_PATH) -> Dict[int, Dict[str, Any]]:
+    """
+    Batch variant of get_customer(): cache hits are served directly and the misses are fetched
+    with one IN (...) query per MAX_IN_PARAMS ids. Unknown ids are absent from the result.
+    """
+    db_key = _pool_key(db_path)
+    found: Dict[int, Dict[str, Any]] = {}
+    missing: List[int] = []
+    for customer_id in dict.fromkeys(customer_ids):
+        customer = _customer_cache.get((db_key, customer_id))
+        if customer is None:
+            missing.append(customer_id)
         else:
-            cur.execute("SELECT * FROM customers ORDER BY created_at DESC LIMIT ?", (limit,))
+            found[customer_id] = dict(customer)
+    if missing:
+        versions = {customer_id: _customer_cache.version((db_key, customer_id)) for customer_id in missing}
+        conn = _get_connection(db_path)
+        with closing(conn.cursor()) as cur:
+            for chunk in _chunks(missing):
+                placeholders = ", ".join("?" * len(chunk))
+                cur.execute(f"SELECT * FROM customers WHERE id IN ({placeholders})", chunk)
+                for row in cur.fetchall():
+                    customer = _row_to_dict(row)
+                    _customer_cache.fill((db_key, customer["id"]), customer, versions[customer["id"]])
+                    found[customer["id"]] = dict(customer)
+    return found
+
+
+# Opaque keyset position in (created_at DESC, id DESC) order, the order of list_customers() and
+# get_customer_history(). Callers pass it back unchanged as `after` to get the next page.
+PageCursor = str
+
+
+def page_cursor(row: Mapping[str, Any]) -> PageCursor:
+    """
+    Cursor for the rows after row, usually the last row of a page.
+    """
+    raw = json.dumps([row["created_at"], row["id"]], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def next_page_cursor(page: List[Mapping[str, Any]], limit: Optional[int]) -> Optional[PageCursor]:
+    """
+    Cursor for the page after page, or None when page came back short (nothing further).
+    """
+    return page_cursor(page[-1]) if page and limit is not None and len(page) >= limit else None
+
+
+def decode_page_cursor(cursor: PageCursor) -> Tuple[str, int]:
+    """
+    The (created_at, id) position in cursor; ValueError if page_cursor() did not make it.
+    """
+    try:
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        if not isinstance(created_at, str) or not isinstance(row_id, int):
+            raise TypeError
+    except (ValueError, TypeError) as exc:
+        raise ValueError(f"Invalid page cursor: {cursor!r}") from exc
+    return created_at, row_id
+
+
+def _keyset(clauses: List[str], params: List[Any], after: Optional[PageCursor]) -> str:
+    # Row-value comparison on (created_at, id): served by the (..., created_at) indexes, whose
+    # entries are ordered by rowid within equal created_at, so every page is one index seek.
+    if after:
+        clauses.append("(created_at, id) < (?, ?)")
+        params.extend(decode_page_cursor(after))
+    return f"WHERE {' AND '.join(clauses)}" if clauses else ""
+
+
+@traced("db.list_customers")
+def list_customers(
+    status: Optional[str] = None, limit: int = 10, after: Optional[PageCursor] = None, db_path: Path = DB_PATH
+) -> List[Dict[str, Any]]:
+    """
+    Customers newest first, optionally only those with status. Pass page_cursor() of the last
+    row as `after` for the next page; deep pages cost the same as the first.
+    """
+    clauses: List[str] = []
+    params: List[Any] = []
+    if status:
+        clauses.append("status = ?")
+        params.append(status)
+    where = _keyset(clauses, params, after)
+    conn = _report_connection(db_path)
+    with closing(conn.cursor()) as cur:
+        cur.execute(f"SELECT * FROM customers {where} ORDER BY created_at DESC, id DESC LIMIT ?", params + [limit])
         rows = cur.fetchall()
         return [_row_to_dict(r) for r in rows]
 
 
-def update_customer(customer_id: int, data: Dict[str, Any], db_path: Path = DB_PATH) -> Optional[Dict[str, Any]]:
-    if not data:
-        return get_customer(customer_id, db_path=db_path)
+CUSTOMER_EDITABLE_FIELDS = {"name", "email", "phone", "status"}
+
+# INSERT/UPDATE ... RETURNING needs SQLite 3.35+; older builds read the row back by id.
+HAS_RETURNING = sqlite3.sqlite_version_info >= (3, 35, 0)
+
+_INSERT_TICKET_SQL = """
+    INSERT INTO tickets (customer_id, issue, status, priority, created_at)
+    VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)
+"""
 
-    valid_fields = {"name", "email", "phone", "status"}
-    updates = {k: v for k, v in data.items() if k in valid_fields}
-    if not updates:
-        return get_customer(customer_id, db_path=db_path)
 
+def _insert_ticket(cur: sqlite3.Cursor, customer_id: int, issue: str, priority: str, status: str) -> Dict[str, Any]:
+    params = (customer_id, issue, status, priority)
+    if HAS_RETURNING:
+        cur.execute(_INSERT_TICKET_SQL + " RETURNING *", params)
+    else:
+        cur.execute(_INSERT_TICKET_SQL, params)
+        cur.execute("SELECT * FROM tickets WHERE id = ?", (cur.lastrowid,))
+    return _row_to_dict(cur.fetchone())
+
+
+def _update_customer_row(cur: sqlite3.Cursor, customer_id: int, updates: Dict[str, Any]) -> Optional[Dict[str, Any]]:
     columns = ", ".join(f"{k} = ?" for k in updates.keys())
     values = list(updates.values()) + [customer_id]
-    with closing(_connect(db_path)) as conn, closing(conn.cursor()) as cur:
-        cur.execute(f"UPDATE customers SET {columns}, updated_at = CURRENT_TIMESTAMP WHERE id = ?", values)
-        conn.commit()
-    return get_customer(customer_id, db_path=db_path)
+    sql = f"UPDATE customers SET {columns}, updated_at = CURRENT_TIMESTAMP WHERE id = ?"
+    if HAS_RETURNING:
+        cur.execute(sql + " RETURNING *", values)
+    else:
+        cur.execute(sql, values)
+        cur.execute("SELECT * FROM customers WHERE id = ?", (customer_id,))
+    row = cur.fetchone()
+    return _row_to_dict(row) if row else None
+
+
+def _customer_written(db_path: Path, customer_id: int, customer: Optional[Dict[str, Any]]) -> None:
+    key = (_pool_key(db_path), customer_id)
+    # Invalidating first also rejects fills by reads that started before this write committed.
+    _customer_cache.invalidate(key)
+    if customer is not None:
+        _customer_cache.set(key, customer)
+
 
+def _ticket_written(db_path: Path, ticket: Dict[str, Any]) -> None:
+    _history_cache.invalidate((_pool_key(db_path), ticket["customer_id"]))
 
+
+def _group_writer(db_path: Path) -> Optional["GroupCommitWriter"]:
+    return _group_writers.get(_pool_key(db_path)) if _group_writers else None
+
+
+@traced("db.update_customer")
+def update_customer(customer_id: int, data: Dict[str, Any], db_path: Path = DB_PATH) -> Optional[Dict[str, Any]]:
+    updates = {k: v for k, v in (data or {}).items() if k in CUSTOMER_EDITABLE_FIELDS}
+    if not updates:
+        return get_customer(customer_id, db_path=db_path)
+    writer = _group_writer(db_path)
+    if writer is not None:
+        return writer.update_customer(customer_id, updates)
+
+    conn = _get_connection(db_path)
+    with conn, closing(conn.cursor()) as cur:
+        customer = _update_customer_row(cur, customer_id, updates)
+    _customer_written(db_path, customer_id, customer)
+    return dict(customer) if customer else None
+
+
+@traced("db.create_ticket")
 def create_ticket(
     customer_id: int,
     issue: str,
@@ -63,30 +372,697 @@ def create_ticket(
     status: str = "open",
     db_path: Path = DB_PATH,
 ) -> Dict[str, Any]:
-    with closing(_connect(db_path)) as conn, closing(conn.cursor()) as cur:
+    writer = _group_writer(db_path)
+    if writer is not None:
+        return writer.create_ticket(customer_id, issue, priority=priority, status=status)
+
+    conn = _get_connection(db_path)
+    with conn, closing(conn.cursor()) as cur:
+        ticket = _insert_ticket(cur, customer_id, issue, priority, status)
+    _ticket_written(db_path, ticket)
+    return ticket
+
+
+@traced("db.create_tickets")
+def create_tickets(tickets: Iterable[Dict[str, Any]], db_path: Path = DB_PATH) -> List[Dict[str, Any]]:
+    """
+    Create several tickets in one transaction. Each item needs customer_id and issue and may set
+    priority/status; the created rows are returned in input order. Nothing is written if any
+    insert fails.
+    """
+    conn = _get_connection(db_path)
+    with conn, closing(conn.cursor()) as cur:
+        created = [
+            _insert_ticket(cur, t["customer_id"], t["issue"], t.get("priority", "medium"), t.get("status", "open"))
+            for t in tickets
+        ]
+    for ticket in created:
+        _ticket_written(db_path, ticket)
+    return created
+
+
+@traced("db.get_customer_history")
+def get_customer_history(
+    customer_id: int, limit: Optional[int] = None, after: Optional[PageCursor] = None, db_path: Path = DB_PATH
+) -> List[Dict[str, Any]]:
+    """
+    A customer's tickets, newest first. Without limit/after the whole history is returned (and
+    cached); with them, one page read straight from idx_tickets_customer_created.
+    """
+    if limit is not None or after is not None:
+        params: List[Any] = [customer_id]
+        where = _keyset(["customer_id = ?"], params, after)
+        conn = _get_connection(db_path)
+        with closing(conn.cursor()) as cur:
+            cur.execute(
+                f"SELECT * FROM tickets {where} ORDER BY created_at DESC, id DESC LIMIT ?",
+                params + [-1 if limit is None else limit],
+            )
+            return [_row_to_dict(r) for r in cur.fetchall()]
+    key = (_pool_key(db_path), customer_id)
+    history = _history_cache.get(key)
+    if history is None:
+        version = _history_cache.version(key)
+        conn = _get_connection(db_path)
+        with closing(conn.cursor()) as cur:
+            cur.execute(
+                "SELECT * FROM tickets WHERE customer_id = ? ORDER BY created_at DESC, id DESC",
+                (customer_id,),
+            )
+            history = [_row_to_dict(r) for r in cur.fetchall()]
+        _history_cache.fill(key, history, version)
+    return [dict(t) for t in history]
+
+
+@traced("db.get_customer_histories")
+def get_customer_histories(customer_ids: Iterable[int], db_path: Path = DB_PATH) -> Dict[int, List[Dict[str, Any]]]:
+    """
+    Batch variant of get_customer_history(); every requested id gets an entry, possibly empty.
+    """
+    db_key = _pool_key(db_path)
+    histories: Dict[int, List[Dict[str, Any]]] = {}
+    missing: List[int] = []
+    for customer_id in dict.fromkeys(customer_ids):
+        history = _history_cache.get((db_key, customer_id))
+        if history is None:
+            missing.append(customer_id)
+        else:
+            histories[customer_id] = [dict(t) for t in history]
+    if missing:
+        versions = {customer_id: _history_cache.version((db_key, customer_id)) for customer_id in missing}
+        fetched: Dict[int, List[Dict[str, Any]]] = {customer_id: [] for customer_id in missing}
+        conn = _get_connection(db_path)
+        with closing(conn.cursor()) as cur:
+            for chunk in _chunks(missing):
+                placeholders = ", ".join("?" * len(chunk))
+                cur.execute(
+                    f"SELECT * FROM tickets WHERE customer_id IN ({placeholders}) ORDER BY customer_id, created_at DESC, id DESC",
+                    chunk,
+                )
+                for row in cur.fetchall():
+                    fetched[row["customer_id"]].append(_row_to_dict(row))
+        for customer_id, history in fetched.items():
+            _history_cache.fill((db_key, customer_id), history, versions[customer_id])
+            histories[customer_id] = [dict(t) for t in history]
+    return histories
+
+
+@traced("db.list_open_tickets")
+def list_open_tickets(db_path: Path = DB_PATH) -> List[Dict[str, Any]]:
+    conn = _report_connection(db_path)
+    with closing(conn.cursor()) as cur:
+        cur.execute("SELECT * FROM tickets WHERE status != 'resolved' ORDER BY priority DESC, created_at DESC")
+        return [_row_to_dict(r) for r in cur.fetchall()]
+
+
+def iter_customers(
+    status: Optional[str] = None,
+    limit: Optional[int] = None,
+    batch_size: int = FETCH_BATCH_SIZE,
+    db_path: Path = DB_PATH,
+) -> Iterator[Row]:
+    """
+    Streaming variant of list_customers(); limit=None streams every matching customer.
+    """
+    sql = "SELECT * FROM customers"
+    params: List[Any] = []
+    if status:
+        sql += " WHERE status = ?"
+        params.append(status)
+    sql += " ORDER BY created_at DESC, id DESC"
+    if limit is not None:
+        sql += " LIMIT ?"
+        params.append(limit)
+    return _iter_query(sql, params, batch_size, db_path, _report_connection)
+
+
+def iter_customer_history(customer_id: int, batch_size: int = FETCH_BATCH_SIZE, db_path: Path = DB_PATH) -> Iterator[Row]:
+    """
+    Streaming variant of get_customer_history().
+    """
+    return _iter_query(
+        "SELECT * FROM tickets WHERE customer_id = ? ORDER BY created_at DESC, id DESC",
+        (customer_id,),
+        batch_size,
+        db_path,
+    )
+
+
+def iter_open_tickets(batch_size: int = FETCH_BATCH_SIZE, db_path: Path = DB_PATH) -> Iterator[Row]:
+    """
+    Streaming variant of list_open_tickets().
+    """
+    return _iter_query(
+        "SELECT * FROM tickets WHERE status != 'resolved' ORDER BY priority DESC, created_at DESC",
+        (),
+        batch_size,
+        db_path,
+        _report_connection,
+    )
+
+
+# Keyset position of an open ticket in (priority DESC, created_at DESC, id DESC) order.
+OpenTicketCursor = Tuple[str, str, int]
+
+
+def open_ticket_cursor(ticket: Dict[str, Any]) -> OpenTicketCursor:
+    return (ticket["priority"], ticket["created_at"], ticket["id"])
+
+
+@traced("db.list_open_tickets_for_customers")
+def list_open_tickets_for_customers(
+    customer_status: str = "active",
+    priority: Optional[str] = None,
+    limit: int = 100,
+    after: Optional[OpenTicketCursor] = None,
+    db_path: Path = DB_PATH,
+) -> List[Dict[str, Any]]:
+    """
+    Non-resolved tickets whose customer has the given status, read from the open_tickets view
+    (see database_setup MIGRATIONS v3). idx_open_tickets_report serves the filter and the order,
+    so a page costs its own size no matter how many tickets or customers there are.
+
+    Pass the open_ticket_cursor() of the last row of a page as `after` to fetch the next page.
+    """
+    clauses = ["o.customer_status = ?"]
+    params: List[Any] = [customer_status]
+    if priority:
+        clauses.append("o.priority = ?")
+        params.append(priority)
+    if after:
+        clauses.append("(o.priority, o.created_at, o.ticket_id) < (?, ?, ?)")
+        params.extend(after)
+    params.append(limit)
+    conn = _report_connection(db_path)
+    with closing(conn.cursor()) as cur:
+        cur.execute(
+            f"""
+            SELECT t.* FROM open_tickets o CROSS JOIN tickets t ON t.id = o.ticket_id
+            WHERE {" AND ".join(clauses)}
+            ORDER BY o.priority DESC, o.created_at DESC, o.ticket_id DESC
+            LIMIT ?
+            """,
+            params,
+        )
+        return [_row_to_dict(r) for r in cur.fetchall()]
+
+
+def iter_open_tickets_for_customers(
+    customer_status: str = "active",
+    priority: Optional[str] = None,
+    page_size: int = 500,
+    db_path: Path = DB_PATH,
+) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Yield list_open_tickets_for_customers() page by page until the result set is exhausted.
+    """
+    after: Optional[OpenTicketCursor] = None
+    while True:
+        page = list_open_tickets_for_customers(customer_status, priority, limit=page_size, after=after, db_path=db_path)
+        if page:
+            yield page
+        if len(page) < page_size:
+            return
+        after = open_ticket_cursor(page[-1])
+
+
+@traced("db.list_customers_with_open_tickets")
+def list_customers_with_open_tickets(status: str = "active", limit: int = 50, db_path: Path = DB_PATH) -> List[Dict[str, Any]]:
+    conn = _report_connection(db_path)
+    with closing(conn.cursor()) as cur:
         cur.execute(
             """
-            INSERT INTO tickets (customer_id, issue, status, priority, created_at)
-            VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)
+            SELECT * FROM customers c
+            WHERE c.status = ?
+              AND EXISTS (SELECT 1 FROM open_tickets o WHERE o.customer_id = c.id)
+            ORDER BY c.created_at DESC
+            LIMIT ?
             """,
-            (customer_id, issue, status, priority),
+            (status, limit),
         )
-        conn.commit()
-        ticket_id = cur.lastrowid
-        cur.execute("SELECT * FROM tickets WHERE id = ?", (ticket_id,))
-        return _row_to_dict(cur.fetchone())
+        return [_row_to_dict(r) for r in cur.fetchall()]
+
+
+def _has_fts5() -> bool:
+    with closing(sqlite3.connect(":memory:")) as conn:
+        try:
+            conn.execute("CREATE VIRTUAL TABLE probe USING fts5(body)")
+        except sqlite3.OperationalError:
+            return False
+    return True
+
+
+# tickets_fts (database_setup MIGRATIONS v4) is only created when SQLite was built with FTS5;
+# search_tickets() falls back to LIKE matching otherwise, and also for a database whose v4
+# migration ran without FTS5 and that has not been migrated again since.
+HAS_FTS5 = _has_fts5()
+
+# Too common in free-text queries to say anything about which tickets are related.
+SEARCH_STOPWORDS = frozenset(
+    "a about am an and are as at be been but by can d do for from had has have i im in is it ll m me my "
+    "no not of on or our please re s so t that the this to too us ve was we were what when why will with you your".split()
+)
+# Words that describe the person asking or the urgency rather than the issue; with them in an
+# AND match, "I'm customer 12345 and was charged twice" finds nothing.
+SEARCH_DOMAIN_STOPWORDS = frozenset(
+    "asap customer customers hello help hi id immediately need number thank thanks urgent urgently".split()
+)
+
+
+# Terms found in at least this many tickets are left out when search_tickets() pads a page
+# with partial matches; ranking all of their tickets would cost a scan of the index.
+SEARCH_FILL_MAX_DOCS = 20_000
+
+
+def search_terms(query: str) -> List[str]:
+    """
+    Lowercased word tokens of a free-text query, minus stopwords, numbers (customer and ticket
+    IDs) and duplicates.
+    """
+    return list(
+        dict.fromkeys(
+            t
+            for t in re.findall(r"\w+", query.lower())
+            if not t.isdigit() and t not in SEARCH_STOPWORDS and t not in SEARCH_DOMAIN_STOPWORDS
+        )
+    )
+
+
+@traced("db.search_tickets")
+def search_tickets(
+    query: str,
+    limit: int = 10,
+    open_only: bool = False,
+    match_all: bool = False,
+    db_path: Path = DB_PATH,
+) -> List[Dict[str, Any]]:
+    """
+    Tickets whose issue text matches query, best first, each with a "score" (higher is more
+    relevant). Tickets containing every term rank ahead of those containing only some; with
+    match_all the others are left out. open_only skips resolved tickets. Uses the FTS5 index
+    with bm25 ranking when available, so cost follows the number of matching tickets.
+    """
+    terms = search_terms(query)
+    if not terms:
+        return []
+    conn = _report_connection(db_path)
+    with closing(conn.cursor()) as cur:
+        if not _has_fts_index(cur, db_path):
+            return _search_tickets_like(cur, terms, limit, open_only, match_all)
+        quoted = [f'"{t}"' for t in terms]
+        # The AND query intersects posting lists and is cheap whenever one term is rare; the
+        # OR query ranks every ticket matching any term, so it only runs to fill up the page,
+        # and only over the terms that are not in a large share of all tickets.
+        tickets = _search_tickets_fts(cur, " AND ".join(quoted), limit, open_only)
+        if len(tickets) < limit and len(terms) > 1 and not match_all:
+            fill = [q for q in quoted if _fts_doc_count(cur, q) < SEARCH_FILL_MAX_DOCS] or quoted
+            seen = {t["id"] for t in tickets}
+            more = _search_tickets_fts(cur, " OR ".join(fill), limit, open_only)
+            tickets += [t for t in more if t["id"] not in seen][: limit - len(tickets)]
+        return tickets
+
+
+def _has_table(cur: sqlite3.Cursor, name: str) -> bool:
+    cur.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (name,))
+    return cur.fetchone() is not None
+
+
+# Pool keys of databases known to have tickets_fts. Only hits are remembered, so a database
+# migrated later is picked up on its next search; clear_caches() forgets them after a reload.
+_fts_databases: Set[str] = set()
+
+
+def _has_fts_index(cur: sqlite3.Cursor, db_path: Path) -> bool:
+    key = _pool_key(db_path)
+    if key in _fts_databases:
+        return True
+    if HAS_FTS5 and _has_table(cur, "tickets_fts"):
+        _fts_databases.add(key)
+        return True
+    return False
+
+
+def _fts_doc_count(cur: sqlite3.Cursor, match: str) -> int:
+    # Stops reading the posting list at SEARCH_FILL_MAX_DOCS.
+    cur.execute(
+        "SELECT count(*) FROM (SELECT 1 FROM tickets_fts WHERE tickets_fts MATCH ? LIMIT ?)",
+        (match, SEARCH_FILL_MAX_DOCS),
+    )
+    return cur.fetchone()[0]
+
+
+def _search_tickets_fts(cur: sqlite3.Cursor, match: str, limit: int, open_only: bool) -> List[Dict[str, Any]]:
+    # Rank inside the index and join tickets only for the top-k rows, unless the status filter
+    # needs the join first.
+    join = "CROSS JOIN tickets t ON t.id = tickets_fts.rowid" if open_only else ""
+    status_clause = "AND t.status != 'resolved'" if open_only else ""
+    cur.execute(
+        f"""
+        SELECT t.*, top.score FROM (
+            SELECT tickets_fts.rowid AS id, -bm25(tickets_fts) AS score FROM tickets_fts {join}
+            WHERE tickets_fts MATCH ? {status_clause}
+            ORDER BY score DESC, tickets_fts.rowid DESC
+            LIMIT ?
+        ) AS top CROSS JOIN tickets t ON t.id = top.id
+        ORDER BY top.score DESC, t.id DESC
+        """,
+        (match, limit),
+    )
+    return [_row_to_dict(r) for r in cur.fetchall()]
+
+
+def _search_tickets_like(
+    cur: sqlite3.Cursor, terms: List[str], limit: int, open_only: bool, match_all: bool
+) -> List[Dict[str, Any]]:
+    # Score is the number of terms found, so full matches still come first.
+    hits = " + ".join("(t.issue LIKE ?)" for _ in terms)
+    status_clause = "AND t.status != 'resolved'" if open_only else ""
+    cur.execute(
+        f"""
+        SELECT * FROM (SELECT t.*, {hits} AS score FROM tickets t WHERE 1 {status_clause})
+        WHERE score {"= " + str(len(terms)) if match_all else "> 0"}
+        ORDER BY score DESC, id DESC
+        LIMIT ?
+        """,
+        [f"%{t}%" for t in terms] + [limit],
+    )
+    return [_row_to_dict(r) for r in cur.fetchall()]
+
+
+# Open-ticket counts as {priority: {status: count}}; only non-resolved statuses appear.
+OpenTicketSummary = Dict[str, Dict[str, int]]
+
 
+def _summary(rows: Iterable[Row]) -> OpenTicketSummary:
+    summary: OpenTicketSummary = {}
+    for priority, status, count in rows:
+        summary.setdefault(priority, {})[status] = count
+    return summary
 
-def get_customer_history(customer_id: int, db_path: Path = DB_PATH) -> List[Dict[str, Any]]:
-    with closing(_connect(db_path)) as conn, closing(conn.cursor()) as cur:
+
+@traced("db.get_open_ticket_summary")
+def get_open_ticket_summary(customer_id: int, db_path: Path = DB_PATH) -> OpenTicketSummary:
+    """
+    One customer's open tickets counted per priority and status, from open_ticket_counts.
+    """
+    conn = _get_connection(db_path)
+    with closing(conn.cursor()) as cur:
         cur.execute(
-            "SELECT * FROM tickets WHERE customer_id = ? ORDER BY created_at DESC",
+            "SELECT priority, status, ticket_count FROM open_ticket_counts WHERE customer_id = ?",
             (customer_id,),
         )
-        return [_row_to_dict(r) for r in cur.fetchall()]
+        return _summary(cur.fetchall())
 
 
-def list_open_tickets(db_path: Path = DB_PATH) -> List[Dict[str, Any]]:
-    with closing(_connect(db_path)) as conn, closing(conn.cursor()) as cur:
-        cur.execute("SELECT * FROM tickets WHERE status != 'resolved' ORDER BY priority DESC, created_at DESC")
-        return [_row_to_dict(r) for r in cur.fetchall()]
+@traced("db.get_open_ticket_totals")
+def get_open_ticket_totals(customer_status: Optional[str] = None, db_path: Path = DB_PATH) -> OpenTicketSummary:
+    """
+    Open tickets across all customers (or those with customer_status) per priority and status.
+    Sums the maintained counts, which carry their customer's status (database_setup MIGRATIONS
+    v5), so the cost follows the number of customers with open tickets, filtered or not.
+    """
+    conn = _report_connection(db_path)
+    with closing(conn.cursor()) as cur:
+        if customer_status:
+            cur.execute(
+                "SELECT priority, status, SUM(ticket_count) FROM open_ticket_counts "
+                "WHERE customer_status = ? GROUP BY priority, status",
+                (customer_status,),
+            )
+        else:
+            cur.execute("SELECT priority, status, SUM(ticket_count) FROM open_ticket_counts GROUP BY priority, status")
+        return _summary(cur.fetchall())
+
+
+class GroupCommitWriter:
+    """
+    Coalesces concurrent create_ticket/update_customer calls into grouped transactions.
+
+    One writer thread drains a queue: after the first pending write it waits up to max_delay
+    seconds for more (or until max_batch_size are queued), runs them in a single transaction and
+    commits once; with max_delay=0 a group is whatever queued up while the previous one was
+    committing. Each write runs in its own SAVEPOINT, so a failing write only fails its own
+    caller. Rows come back through RETURNING rather than a read-back query.
+    """
+
+    _STOP = object()
+
+    def __init__(self, db_path: Path = DB_PATH, max_batch_size: int = 256, max_delay: float = 0.0) -> None:
+        self.db_path = Path(db_path)
+        self.max_batch_size = max_batch_size
+        self.max_delay = max_delay
+        self.batches = 0
+        self.writes = 0
+        self._queue: "queue.Queue[Any]" = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="db-group-commit", daemon=True)
+        self._thread.start()
+
+    def submit(self, write: Callable[[sqlite3.Cursor], Any], on_commit: Callable[[Any], None]) -> "Future[Any]":
+        """
+        Queue write(cursor); on_commit(result) runs after the group commits, before the future resolves.
+        """
+        future: "Future[Any]" = Future()
+        self._queue.put((write, on_commit, future))
+        return future
+
+    def create_ticket(self, customer_id: int, issue: str, priority: str = "medium", status: str = "open") -> Dict[str, Any]:
+        return self.submit(
+            lambda cur: _insert_ticket(cur, customer_id, issue, priority, status),
+            lambda ticket: _ticket_written(self.db_path, ticket),
+        ).result()
+
+    def update_customer(self, customer_id: int, updates: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        customer = self.submit(
+            lambda cur: _update_customer_row(cur, customer_id, updates),
+            lambda row: _customer_written(self.db_path, customer_id, row),
+        ).result()
+        return dict(customer) if customer else None
+
+    def close(self) -> None:
+        """
+        Commit whatever is queued and stop the writer thread.
+        """
+        self._queue.put(self._STOP)
+        self._thread.join()
+
+    def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            first = self._queue.get()
+            if first is self._STOP:
+                break
+            batch = [first]
+            deadline = time.monotonic() + self.max_delay
+            while len(batch) < self.max_batch_size:
+                try:
+                    item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if item is self._STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+            self._commit(batch)
+
+    def _commit(self, batch: List[Tuple[Callable[..., Any], Callable[[Any], None], "Future[Any]"]]) -> None:
+        conn = _get_connection(self.db_path)
+        outcomes: List[Tuple[bool, Any]] = []
+        try:
+            with closing(conn.cursor()) as cur:
+                cur.execute("BEGIN IMMEDIATE")
+                for write, _, _ in batch:
+                    cur.execute("SAVEPOINT grouped_write")
+                    try:
+                        outcomes.append((True, write(cur)))
+                    except Exception as exc:
+                        cur.execute("ROLLBACK TO grouped_write")
+                        outcomes.append((False, exc))
+                    cur.execute("RELEASE grouped_write")
+            conn.commit()
+        except Exception as exc:
+            if conn.in_transaction:
+                conn.rollback()
+            for _, _, future in batch:
+                future.set_exception(exc)
+            return
+        self.batches += 1
+        self.writes += len(batch)
+        for (ok, result), (_, on_commit, future) in zip(outcomes, batch):
+            if ok:
+                on_commit(result)
+                future.set_result(result)
+            else:
+                future.set_exception(result)
+
+
+_group_writers: Dict[str, GroupCommitWriter] = {}
+
+
+def enable_group_commit(db_path: Path = DB_PATH, max_batch_size: int = 256, max_delay: float = 0.0) -> GroupCommitWriter:
+    """
+    Route create_ticket/update_customer for db_path through a GroupCommitWriter. Each call still
+    blocks until its own group has committed and returns its own row.
+    """
+    key = _pool_key(db_path)
+    with _pools_lock:
+        writer = _group_writers.get(key)
+        if writer is None:
+            writer = _group_writers[key] = GroupCommitWriter(Path(key), max_batch_size, max_delay)
+    return writer
+
+
+def disable_group_commit(db_path: Optional[Path] = None) -> None:
+    """
+    Flush and stop the writer for one database, or all writers when db_path is None.
+    """
+    with _pools_lock:
+        if db_path is None:
+            writers = list(_group_writers.values())
+            _group_writers.clear()
+        else:
+            writer = _group_writers.pop(_pool_key(db_path), None)
+            writers = [writer] if writer else []
+    for writer in writers:
+        writer.close()
+
+
+# atexit runs handlers in reverse order, so writers flush before close_pools closes connections.
+atexit.register(disable_group_commit)
+
+
+class SnapshotReader:
+    """
+    Read-only copy of one database for report and list queries, refreshed in the background.
+
+    A refresh copies the live file with the SQLite backup API in a single step (one WAL read
+    transaction, which never blocks writers) into a new file and swaps it in. Queries then run on
+    immutable read-only connections that take no locks on the live database, so long reports
+    neither wait for nor hold back the write path. Results lag writes by up to max_staleness
+    seconds plus the copy time; refreshes are spaced so copying takes at most half the time.
+    """
+
+    def __init__(self, db_path: Path = DB_PATH, max_staleness: float = 5.0, snapshot_dir: Optional[Path] = None) -> None:
+        self.db_path = Path(db_path)
+        self.max_staleness = max_staleness
+        directory = Path(snapshot_dir) if snapshot_dir is not None else self.db_path.parent
+        # Per process, so several servers on one database never swap each other's copy.
+        self.snapshot_path = directory / f"{self.db_path.stem}.snapshot-{os.getpid()}.db"
+        self.refreshes = 0
+        self.taken_at = 0.0
+        self.last_copy_seconds = 0.0
+        self._generation = 0
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self.refresh()
+        self._thread = threading.Thread(target=self._run, name="db-snapshot", daemon=True)
+        self._thread.start()
+
+    @property
+    def age(self) -> float:
+        """
+        Seconds since the current copy was taken.
+        """
+        return time.time() - self.taken_at
+
+    def refresh(self) -> None:
+        """
+        Copy the live database into a new snapshot file and make it the current one.
+        """
+        started = time.time()
+        tmp = self.snapshot_path.with_name(self.snapshot_path.name + ".tmp")
+        tmp.unlink(missing_ok=True)
+        with closing(sqlite3.connect(self.db_path)) as source, closing(sqlite3.connect(tmp)) as target:
+            source.backup(target)
+            # Readers open the copy immutable, so it must not depend on a -wal or -shm file.
+            target.execute("PRAGMA journal_mode = DELETE")
+        # Connections to the previous copy keep reading it until they are dropped.
+        os.replace(tmp, self.snapshot_path)
+        with self._lock:
+            self._generation += 1
+            self.refreshes += 1
+            self.taken_at = started
+            self.last_copy_seconds = time.time() - started
+
+    def connection(self) -> sqlite3.Connection:
+        """
+        This thread's read-only connection to the current copy.
+        """
+        local = self._local
+        if getattr(local, "generation", None) == self._generation:
+            return local.conn
+        with self._lock:
+            generation = self._generation
+            # The previous connection is not closed here: a streaming iterator may still be
+            # reading the old copy. It closes once nothing references it.
+            uri = f"{self.snapshot_path.resolve().as_uri()}?mode=ro&immutable=1"
+            conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            for name, value in PRAGMAS:
+                if name in ("cache_size", "mmap_size", "temp_store"):
+                    conn.execute(f"PRAGMA {name} = {value}")
+        local.conn, local.generation = conn, generation
+        return conn
+
+    def close(self) -> None:
+        """
+        Stop refreshing, drop the connections and delete the copy.
+
+        Like a refresh, this does not close connections a streaming iterator is still using: the
+        iterator finishes on the (unlinked) copy it started on and its connection closes with it.
+        """
+        self._stop.set()
+        self._thread.join()
+        self._local = threading.local()
+        self.snapshot_path.unlink(missing_ok=True)
+
+    def _run(self) -> None:
+        while not self._stop.wait(max(self.max_staleness - self.last_copy_seconds, self.last_copy_seconds)):
+            try:
+                self.refresh()
+            except sqlite3.Error:
+                # Keep serving the previous copy; the next period tries again.
+                continue
+
+
+_snapshot_readers: Dict[str, SnapshotReader] = {}
+_snapshot_lock = threading.Lock()
+
+
+def enable_snapshot_reads(
+    db_path: Path = DB_PATH, max_staleness: float = 5.0, snapshot_dir: Optional[Path] = None
+) -> SnapshotReader:
+    """
+    Serve the report and list reads for db_path (list_customers, the open-ticket reports and
+    totals, search_tickets) from a SnapshotReader copy at most ~max_staleness seconds old.
+    Per-customer reads and all writes keep using the live database.
+    """
+    key = _pool_key(db_path)
+    with _snapshot_lock:
+        reader = _snapshot_readers.get(key)
+        if reader is None:
+            reader = _snapshot_readers[key] = SnapshotReader(Path(key), max_staleness, snapshot_dir)
+    return reader
+
+
+def disable_snapshot_reads(db_path: Optional[Path] = None) -> None:
+    """
+    Return reads to the live database for one database, or for all when db_path is None.
+    """
+    with _snapshot_lock:
+        if db_path is None:
+            readers = list(_snapshot_readers.values())
+            _snapshot_readers.clear()
+        else:
+            reader = _snapshot_readers.pop(_pool_key(db_path), None)
+            readers = [reader] if reader else []
+    for reader in readers:
+        reader.close()
+
+
+def _report_connection(db_path: Path = DB_PATH) -> sqlite3.Connection:
+    reader = _snapshot_readers.get(_pool_key(db_path)) if _snapshot_readers else None
+    return reader.connection() if reader is not None else _get_connection(db_path)
+
+
+atexit.register(disable_snapshot_reads)
@@ -1,14 +1,48 @@
-from typing import Any, Dict, List, Optional
-
-from mcp.server.fastmcp import FastMCP
+import asyncio
+import functools
+import os
+import sqlite3
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional
 
 import db
-from database_setup import bootstrap_database
+from storage import MemoryBackend, SQLiteBackend, StorageBackend
+
+if TYPE_CHECKING:
+    from mcp.server.fastmcp import FastMCP
+
+
+DEFAULT_DB_PATH = Path(os.environ.get("CUSTOMER_SERVICE_DB", db.DB_PATH))
 
 
-# Ensure the dataset from database_setup.py is available before serving.
-bootstrap_database(reset_existing=False)
-server = FastMCP("customer-data-mcp")
+@functools.lru_cache(maxsize=256)
+def _db_key(path: Path) -> str:
+    return str(Path(path).resolve())
+
+
+# Databases this server may serve. Per-call db_path values must be one of these so every
+# call reuses the same pooled connections instead of opening arbitrary files.
+ALLOWED_DB_PATHS = {
+    _db_key(Path(p))
+    for p in [DEFAULT_DB_PATH, *filter(None, os.environ.get("CUSTOMER_SERVICE_EXTRA_DBS", "").split(os.pathsep))]
+}
+MAX_WORKERS = int(os.environ.get("MCP_MAX_WORKERS", "8"))
+# "sqlite" serves the files directly; "memory" loads each database into a storage.MemoryBackend
+# on first use and serves from RAM (writes then stay in memory and are lost on restart).
+STORAGE_BACKEND = os.environ.get("CUSTOMER_SERVICE_BACKEND", "sqlite")
+if STORAGE_BACKEND not in ("sqlite", "memory"):
+    raise ValueError(f"Unknown CUSTOMER_SERVICE_BACKEND {STORAGE_BACKEND!r}; expected 'sqlite' or 'memory'")
+# Seconds; when set, the sqlite backend serves report and list tools from a read-only copy of
+# each database refreshed at this interval (db.enable_snapshot_reads).
+SNAPSHOT_STALENESS = os.environ.get("CUSTOMER_SERVICE_SNAPSHOT_STALENESS")
+
+# Backend setup and every storage call run here so concurrent tool calls never block the event
+# loop. Each worker thread keeps its own pooled connection per database (see db.ConnectionPool).
+_executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="mcp-db")
 
 
 def _json_safe(value: Any) -> Any:
@@ -17,38 +51,126 @@ def _json_safe(value: Any) -> Any:
     return value
 
 
-@server.tool()
-def get_customer(customer_id: int, db_path: Optional[str] = None) -> Optional[Dict[str, Any]]:
+def _resolve_db_path(db_path: Optional[str]) -> Path:
+    if db_path is None:
+        return DEFAULT_DB_PATH
+    if _db_key(Path(db_path)) not in ALLOWED_DB_PATHS:
+        raise ValueError(f"Database {db_path!r} is not served by this MCP server")
+    return Path(db_path)
+
+
+_backends: Dict[str, StorageBackend] = {}
+_backends_lock = threading.Lock()
+
+
+def _ensure_schema(path: Path) -> None:
+    # An up-to-date database costs one PRAGMA read; database_setup (and its dataset) is only
+    # imported when the file is missing or behind.
+    if path.exists():
+        with closing(sqlite3.connect(path)) as conn:
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+        if version >= db.SCHEMA_VERSION:
+            return
+    from database_setup import bootstrap_database
+
+    # stdout carries the MCP protocol.
+    bootstrap_database(path, reset_existing=False, log=sys.stderr)
+
+
+def _backend(db_path: Optional[str]) -> StorageBackend:
+    # The first call for a database checks its schema; later calls find the cached backend.
+    path = _resolve_db_path(db_path)
+    key = _db_key(path)
+    backend = _backends.get(key)
+    if backend is None:
+        with _backends_lock:
+            backend = _backends.get(key)
+            if backend is None:
+                _ensure_schema(path)
+                if STORAGE_BACKEND == "memory":
+                    backend = MemoryBackend.from_sqlite(path)
+                else:
+                    backend = SQLiteBackend(path, snapshot_staleness=float(SNAPSHOT_STALENESS) if SNAPSHOT_STALENESS else None)
+                _backends[key] = backend
+    return backend
+
+
+# Tool functions, registered on the FastMCP server by create_server(). Importing this module
+# does not load the mcp package.
+_TOOLS: List[Callable[..., Any]] = []
+
+
+def _tool(func: Callable[..., Any]) -> Callable[..., Any]:
+    _TOOLS.append(func)
+    return func
+
+
+def create_server() -> "FastMCP":
+    from mcp.server.fastmcp import FastMCP
+
+    server = FastMCP("customer-data-mcp")
+    for func in _TOOLS:
+        server.add_tool(func)
+    return server
+
+
+@functools.lru_cache(maxsize=None)
+def _default_server() -> "FastMCP":
+    # Check the default database's schema while the client is still starting its session, so
+    # the first tool call does not wait for it.
+    _executor.submit(_backend, None)
+    return create_server()
+
+
+def __getattr__(name: str) -> Any:
+    # `mcp run mcp_server.py` / `mcp dev mcp_server.py` look the server up as a module attribute;
+    # building it on first access keeps plain imports of this module free of the mcp package.
+    if name == "server":
+        return _default_server()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def _call_db(db_path: Optional[str], operation: str, *args: Any, **kwargs: Any) -> Any:
+    func: Callable[..., Any] = getattr(_backend(db_path), operation)
+    return func(*args, **kwargs)
+
+
+async def _run_db(db_path: Optional[str], operation: str, *args: Any, **kwargs: Any) -> Any:
+    # Everything runs on the executor: the first call for a database may bootstrap its schema or
+    # load it into a MemoryBackend, and memory-backend scans are CPU work the loop should not wait on.
+    call = functools.partial(_call_db, db_path, operation, *args, **kwargs)
+    return await asyncio.get_running_loop().run_in_executor(_executor, call)
+
+
+@_tool
+async def get_customer(customer_id: int, db_path: Optional[str] = None) -> Optional[Dict[str, Any]]:
     """
     Fetch a single customer by ID.
     """
-    path = db.DB_PATH if db_path is None else db_path
-    record = db.get_customer(customer_id, db_path=path)
+    record = await _run_db(db_path, "get_customer", customer_id)
     return {k: _json_safe(v) for k, v in record.items()} if record else None
 
 
-@server.tool()
-def list_customers(status: Optional[str] = None, limit: int = 10, db_path: Optional[str] = None) -> List[Dict[str, Any]]:
+@_tool
+async def list_customers(status: Optional[str] = None, limit: int = 10, db_path: Optional[str] = None) -> List[Dict[str, Any]]:
     """
     List customers, optionally filtered by status.
     """
-    path = db.DB_PATH if db_path is None else db_path
-    rows = db.list_customers(status=status, limit=limit, db_path=path)
+    rows = await _run_db(db_path, "list_customers", status=status, limit=limit)
     return [{k: _json_safe(v) for k, v in row.items()} for row in rows]
 
 
-@server.tool()
-def update_customer(customer_id: int, data: Dict[str, Any], db_path: Optional[str] = None) -> Optional[Dict[str, Any]]:
+@_tool
+async def update_customer(customer_id: int, data: Dict[str, Any], db_path: Optional[str] = None) -> Optional[Dict[str, Any]]:
     """
     Update editable customer fields (name, email, phone, status).
     """
-    path = db.DB_PATH if db_path is None else db_path
-    record = db.update_customer(customer_id, data=data, db_path=path)
+    record = await _run_db(db_path, "update_customer", customer_id, data=data)
     return {k: _json_safe(v) for k, v in record.items()} if record else None
 
 
-@server.tool()
-def create_ticket(
+@_tool
+async def create_ticket(
     customer_id: int,
     issue: str,
     priority: str = "medium",
@@ -58,20 +180,116 @@ def create_ticket(
     """
     Create a new ticket for a customer.
     """
-    path = db.DB_PATH if db_path is None else db_path
-    ticket = db.create_ticket(customer_id, issue, priority=priority, status=status, db_path=path)
+    ticket = await _run_db(db_path, "create_ticket", customer_id, issue, priority=priority, status=status)
     return {k: _json_safe(v) for k, v in ticket.items()}
 
 
-@server.tool()
-def get_customer_history(customer_id: int, db_path: Optional[str] = None) -> List[Dict[str, Any]]:
+@_tool
+async def get_customer_history(customer_id: int, db_path: Optional[str] = None) -> List[Dict[str, Any]]:
     """
     Retrieve all tickets for a given customer, newest first.
     """
-    path = db.DB_PATH if db_path is None else db_path
-    history = db.get_customer_history(customer_id, db_path=path)
+    history = await _run_db(db_path, "get_customer_history", customer_id)
     return [{k: _json_safe(v) for k, v in ticket.items()} for ticket in history]
 
 
+@_tool
+async def list_customers_page(
+    status: Optional[str] = None, limit: int = 10, cursor: Optional[str] = None, db_path: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    One page of customers, newest first: {"customers": [...], "next_cursor": ...}. Pass
+    next_cursor back as cursor for the following page; it is null after the last page.
+    """
+    rows = await _run_db(db_path, "list_customers", status=status, limit=limit, after=cursor)
+    return {
+        "customers": [{k: _json_safe(v) for k, v in row.items()} for row in rows],
+        "next_cursor": db.next_page_cursor(rows, limit),
+    }
+
+
+@_tool
+async def get_customer_history_page(
+    customer_id: int, limit: int = 20, cursor: Optional[str] = None, db_path: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    One page of a customer's tickets, newest first: {"history": [...], "next_cursor": ...}.
+    Pass next_cursor back as cursor for the following page; it is null after the last page.
+    """
+    history = await _run_db(db_path, "get_customer_history", customer_id, limit=limit, after=cursor)
+    return {
+        "history": [{k: _json_safe(v) for k, v in ticket.items()} for ticket in history],
+        "next_cursor": db.next_page_cursor(history, limit),
+    }
+
+
+@_tool
+async def get_customers(customer_ids: List[int], db_path: Optional[str] = None) -> Dict[str, Optional[Dict[str, Any]]]:
+    """
+    Fetch several customers in one call, keyed by ID (null for unknown IDs).
+    """
+    records = await _run_db(db_path, "get_customers", customer_ids)
+    return {
+        str(customer_id): ({k: _json_safe(v) for k, v in records[customer_id].items()} if customer_id in records else None)
+        for customer_id in customer_ids
+    }
+
+
+@_tool
+async def get_histories(customer_ids: List[int], db_path: Optional[str] = None) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Retrieve the ticket history of several customers in one call, keyed by customer ID.
+    """
+    histories = await _run_db(db_path, "get_customer_histories", customer_ids)
+    return {
+        str(customer_id): [{k: _json_safe(v) for k, v in ticket.items()} for ticket in history]
+        for customer_id, history in histories.items()
+    }
+
+
+@_tool
+async def create_tickets(tickets: List[Dict[str, Any]], db_path: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    Create several tickets in one transaction. Each item takes customer_id, issue and optional
+    priority/status; created tickets are returned in input order.
+    """
+    created = await _run_db(db_path, "create_tickets", tickets)
+    return [{k: _json_safe(v) for k, v in ticket.items()} for ticket in created]
+
+
+@_tool
+async def get_open_ticket_summary(
+    customer_id: Optional[int] = None, customer_status: Optional[str] = None, db_path: Optional[str] = None
+) -> Dict[str, Dict[str, int]]:
+    """
+    Open tickets counted by priority and status, for one customer or across customers
+    (optionally only those with customer_status). Served from maintained counts.
+    """
+    if customer_id is not None:
+        return await _run_db(db_path, "get_open_ticket_summary", customer_id)
+    return await _run_db(db_path, "get_open_ticket_totals", customer_status)
+
+
+@_tool
+async def search_tickets(
+    query: str, limit: int = 10, open_only: bool = False, match_all: bool = False, db_path: Optional[str] = None
+) -> List[Dict[str, Any]]:
+    """
+    Tickets whose issue text matches query, best match first, each with a relevance "score".
+    Words are OR-ed unless match_all; open_only skips resolved tickets.
+    """
+    tickets = await _run_db(db_path, "search_tickets", query, limit=limit, open_only=open_only, match_all=match_all)
+    return [{k: _json_safe(v) for k, v in ticket.items()} for ticket in tickets]
+
+
+def main() -> None:
+    server = _default_server()
+    try:
+        server.run()
+    finally:
+        _executor.shutdown(wait=True)
+        db.close_pools()
+
+
 if __name__ == "__main__":
-    server.run()
+    main()
@@ -2,14 +2,17 @@
 End-to-end demo runner for the multi-agent customer service system.
 Scenarios exercise task allocation, negotiation, and multi-step coordination.
 """
+import asyncio
+import sys
 from typing import List, Tuple
 
-from agents.base import AgentLogger
+from agents.base import AgentLogger, shutdown_executor
 from agents.customer_data_agent import CustomerDataAgent
 from agents.router_agent import RouterAgent
 from agents.support_agent import SupportAgent
 from database_setup import bootstrap_database
 from db import DB_PATH
+from worker_pool import RouterWorkerPool
 
 
 SCENARIOS: List[Tuple[str, str]] = [
@@ -28,7 +31,7 @@ def run() -> None:
 
     logger = AgentLogger()
     data_agent = CustomerDataAgent(logger)
-    support_agent = SupportAgent(logger)
+    support_agent = SupportAgent(logger, data_agent=data_agent)
     router = RouterAgent(logger, data_agent, support_agent)
 
     for title, query in SCENARIOS:
@@ -41,5 +44,46 @@ def run() -> None:
     logger.print_log()
 
 
+async def run_async() -> None:
+    # Same scenarios, but all queries are in flight at once on the async path.
+    bootstrap_database()
+
+    logger = AgentLogger()
+    data_agent = CustomerDataAgent(logger)
+    support_agent = SupportAgent(logger, data_agent=data_agent)
+    router = RouterAgent(logger, data_agent, support_agent)
+
+    results = await asyncio.gather(*(router.handle_user_query_async(query) for _, query in SCENARIOS))
+    for (title, query), result in zip(SCENARIOS, results):
+        print(f"\n=== {title} ===")
+        print(f"User: {query}")
+        print(f"Assistant: {result['response']}")
+
+    print("\n=== Transcript (Agent-to-Agent messages) ===")
+    logger.print_log()
+    shutdown_executor()
+
+
+def run_workers(workers: int) -> None:
+    # Same scenarios, spread over worker processes; the transcript is merged back in order.
+    bootstrap_database()
+
+    logger = AgentLogger()
+    with RouterWorkerPool(workers=workers, logger=logger) as pool:
+        results = pool.handle_user_queries([query for _, query in SCENARIOS])
+    for (title, query), result in zip(SCENARIOS, results):
+        print(f"\n=== {title} ===")
+        print(f"User: {query}")
+        print(f"Assistant: {result['response']}")
+
+    print("\n=== Transcript (Agent-to-Agent messages) ===")
+    logger.print_log()
+
+
 if __name__ == "__main__":
-    run()
+    if "--async" in sys.argv[1:]:
+        asyncio.run(run_async())
+    elif "--workers" in sys.argv[1:]:
+        run_workers(int(sys.argv[sys.argv.index("--workers") + 1]))
+    else:
+        run()
@@ -0,0 +1,451 @@
+"""
+Storage backends behind CustomerDataAgent and the MCP server.
+
+StorageBackend is the interface: the six core operations plus the batch/report variants the
+agents use (with generic defaults built on the core ones). SQLiteBackend delegates to db.py;
+MemoryBackend keeps everything in dicts with hash indexes and is meant for hot-path serving of a
+loaded snapshot and for fast tests and benchmarks. Its writes are not persisted.
+"""
+import heapq
+import math
+import re
+import sqlite3
+import threading
+import time
+from collections import Counter, defaultdict
+from contextlib import closing
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Mapping, Optional, Protocol, Set, Tuple
+
+import db
+
+
+CUSTOMER_STATUSES = ("active", "disabled")
+TICKET_STATUSES = ("open", "in_progress", "resolved")
+TICKET_PRIORITIES = ("low", "medium", "high")
+
+
+class StorageBackend(Protocol):
+    # True when calls block on I/O and belong on the executor (see CustomerDataAgent.handle_async).
+    blocking: bool
+
+    def get_customer(self, customer_id: int) -> Optional[Dict[str, Any]]: ...
+
+    def list_customers(
+        self, status: Optional[str] = None, limit: int = 10, after: Optional[db.PageCursor] = None
+    ) -> List[Dict[str, Any]]: ...
+
+    def update_customer(self, customer_id: int, data: Dict[str, Any]) -> Optional[Dict[str, Any]]: ...
+
+    def create_ticket(self, customer_id: int, issue: str, priority: str = "medium", status: str = "open") -> Dict[str, Any]: ...
+
+    def get_customer_history(
+        self, customer_id: int, limit: Optional[int] = None, after: Optional[db.PageCursor] = None
+    ) -> List[Dict[str, Any]]: ...
+
+    def list_open_tickets(self) -> List[Dict[str, Any]]: ...
+
+    def list_open_tickets_for_customers(
+        self,
+        customer_status: str = "active",
+        priority: Optional[str] = None,
+        limit: int = 100,
+        after: Optional[db.OpenTicketCursor] = None,
+    ) -> List[Dict[str, Any]]: ...
+
+    def list_customers_with_open_tickets(self, status: str = "active", limit: int = 50) -> List[Dict[str, Any]]: ...
+
+    def get_open_ticket_summary(self, customer_id: int) -> db.OpenTicketSummary: ...
+
+    def get_open_ticket_totals(self, customer_status: Optional[str] = None) -> db.OpenTicketSummary: ...
+
+    def search_tickets(
+        self, query: str, limit: int = 10, open_only: bool = False, match_all: bool = False
+    ) -> List[Dict[str, Any]]: ...
+
+    # Batch and streaming variants; backends override these when they can do better.
+
+    def get_customers(self, customer_ids: Iterable[int]) -> Dict[int, Dict[str, Any]]:
+        found = {}
+        for customer_id in dict.fromkeys(customer_ids):
+            customer = self.get_customer(customer_id)
+            if customer is not None:
+                found[customer_id] = customer
+        return found
+
+    def create_tickets(self, tickets: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        return [
+            self.create_ticket(t["customer_id"], t["issue"], t.get("priority", "medium"), t.get("status", "open"))
+            for t in tickets
+        ]
+
+    def get_customer_histories(self, customer_ids: Iterable[int]) -> Dict[int, List[Dict[str, Any]]]:
+        return {customer_id: self.get_customer_history(customer_id) for customer_id in dict.fromkeys(customer_ids)}
+
+    def iter_customer_history(self, customer_id: int) -> Iterator[Mapping[str, Any]]:
+        return iter(self.get_customer_history(customer_id))
+
+    def iter_open_tickets_for_customers(
+        self, customer_status: str = "active", priority: Optional[str] = None, page_size: int = 500
+    ) -> Iterator[List[Dict[str, Any]]]:
+        after: Optional[db.OpenTicketCursor] = None
+        while True:
+            page = self.list_open_tickets_for_customers(customer_status, priority, limit=page_size, after=after)
+            if page:
+                yield page
+            if len(page) < page_size:
+                return
+            after = db.open_ticket_cursor(page[-1])
+
+
+class SQLiteBackend(StorageBackend):
+    """
+    The db.py functions bound to one database file.
+
+    With snapshot_staleness (seconds), report and list reads come from a periodically refreshed
+    read-only copy (db.enable_snapshot_reads) so they never contend with writes.
+    """
+
+    blocking = True
+
+    def __init__(self, db_path: Path = db.DB_PATH, snapshot_staleness: Optional[float] = None) -> None:
+        self.db_path = Path(db_path)
+        if snapshot_staleness is not None:
+            db.enable_snapshot_reads(self.db_path, max_staleness=snapshot_staleness)
+
+    def get_customer(self, customer_id: int) -> Optional[Dict[str, Any]]:
+        return db.get_customer(customer_id, db_path=self.db_path)
+
+    def list_customers(
+        self, status: Optional[str] = None, limit: int = 10, after: Optional[db.PageCursor] = None
+    ) -> List[Dict[str, Any]]:
+        return db.list_customers(status, limit=limit, after=after, db_path=self.db_path)
+
+    def update_customer(self, customer_id: int, data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        return db.update_customer(customer_id, data=data, db_path=self.db_path)
+
+    def create_ticket(self, customer_id: int, issue: str, priority: str = "medium", status: str = "open") -> Dict[str, Any]:
+        return db.create_ticket(customer_id, issue, priority=priority, status=status, db_path=self.db_path)
+
+    def get_customer_history(
+        self, customer_id: int, limit: Optional[int] = None, after: Optional[db.PageCursor] = None
+    ) -> List[Dict[str, Any]]:
+        return db.get_customer_history(customer_id, limit=limit, after=after, db_path=self.db_path)
+
+    def list_open_tickets(self) -> List[Dict[str, Any]]:
+        return db.list_open_tickets(db_path=self.db_path)
+
+    def list_open_tickets_for_customers(
+        self,
+        customer_status: str = "active",
+        priority: Optional[str] = None,
+        limit: int = 100,
+        after: Optional[db.OpenTicketCursor] = None,
+    ) -> List[Dict[str, Any]]:
+        return db.list_open_tickets_for_customers(customer_status, priority, limit=limit, after=after, db_path=self.db_path)
+
+    def list_customers_with_open_tickets(self, status: str = "active", limit: int = 50) -> List[Dict[str, Any]]:
+        return db.list_customers_with_open_tickets(status, limit=limit, db_path=self.db_path)
+
+    def get_open_ticket_summary(self, customer_id: int) -> db.OpenTicketSummary:
+        return db.get_open_ticket_summary(customer_id, db_path=self.db_path)
+
+    def get_open_ticket_totals(self, customer_status: Optional[str] = None) -> db.OpenTicketSummary:
+        return db.get_open_ticket_totals(customer_status, db_path=self.db_path)
+
+    def search_tickets(
+        self, query: str, limit: int = 10, open_only: bool = False, match_all: bool = False
+    ) -> List[Dict[str, Any]]:
+        return db.search_tickets(query, limit=limit, open_only=open_only, match_all=match_all, db_path=self.db_path)
+
+    def get_customers(self, customer_ids: Iterable[int]) -> Dict[int, Dict[str, Any]]:
+        return db.get_customers(customer_ids, db_path=self.db_path)
+
+    def create_tickets(self, tickets: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        return db.create_tickets(tickets, db_path=self.db_path)
+
+    def get_customer_histories(self, customer_ids: Iterable[int]) -> Dict[int, List[Dict[str, Any]]]:
+        return db.get_customer_histories(customer_ids, db_path=self.db_path)
+
+    def iter_customer_history(self, customer_id: int) -> Iterator[Mapping[str, Any]]:
+        return db.iter_customer_history(customer_id, db_path=self.db_path)
+
+    def iter_open_tickets_for_customers(
+        self, customer_status: str = "active", priority: Optional[str] = None, page_size: int = 500
+    ) -> Iterator[List[Dict[str, Any]]]:
+        return db.iter_open_tickets_for_customers(customer_status, priority, page_size=page_size, db_path=self.db_path)
+
+
+def _now() -> str:
+    # Same text format as SQLite's CURRENT_TIMESTAMP (UTC).
+    return time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime())
+
+
+def _newest_first(row: Dict[str, Any]) -> Tuple[str, int]:
+    # Ties on created_at fall back to id, matching a descending scan of the SQLite indexes.
+    return (row["created_at"] or "", row["id"])
+
+
+def _after(rows: Iterable[Dict[str, Any]], cursor: Optional[db.PageCursor]) -> Iterable[Dict[str, Any]]:
+    # The rows a db keyset page would start from: strictly older than the cursor position.
+    if not cursor:
+        return rows
+    position = db.decode_page_cursor(cursor)
+    return (row for row in rows if _newest_first(row) < position)
+
+
+def _summary(counts: Mapping[Tuple[str, str], int]) -> db.OpenTicketSummary:
+    summary: db.OpenTicketSummary = {}
+    for (priority, status), count in counts.items():
+        if count:
+            summary.setdefault(priority, {})[status] = count
+    return summary
+
+
+def _open_order(ticket: Dict[str, Any]) -> db.OpenTicketCursor:
+    return (ticket["priority"], ticket["created_at"] or "", ticket["id"])
+
+
+def _stem(word: str) -> str:
+    # Crude stand-in for FTS5's porter tokenizer: "charged", "charges" and "charge" all index as "charg".
+    for suffix in ("ing", "ed", "es", "s", "e"):
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+            return word[: -len(suffix)]
+    return word
+
+
+class MemoryBackend(StorageBackend):
+    """
+    Customers and tickets held in dicts, with hash indexes on customer status, ticket
+    customer_id and ticket status, open-ticket counts per customer/priority/status and an
+    inverted index over ticket issue words (BM25-ranked, light suffix stemming), all kept up to date
+    on every write. Results are ordered like the SQLite queries and returned as copies.
+    One lock serialises access, so the backend can be shared across threads.
+    """
+
+    blocking = False
+
+    def __init__(self, customers: Iterable[Mapping[str, Any]] = (), tickets: Iterable[Mapping[str, Any]] = ()) -> None:
+        self._lock = threading.RLock()
+        self._customers: Dict[int, Dict[str, Any]] = {}
+        self._tickets: Dict[int, Dict[str, Any]] = {}
+        self._customers_by_status: Dict[str, Set[int]] = defaultdict(set)
+        self._tickets_by_customer: Dict[int, Set[int]] = defaultdict(set)
+        self._tickets_by_status: Dict[str, Set[int]] = defaultdict(set)
+        self._open_counts: Dict[int, Counter] = defaultdict(Counter)
+        self._postings: Dict[str, Dict[int, int]] = defaultdict(dict)
+        self._issue_lengths: Dict[int, int] = {}
+        for customer in customers:
+            self._add_customer(dict(customer))
+        for ticket in tickets:
+            self._add_ticket(dict(ticket))
+
+    @classmethod
+    def from_sqlite(cls, db_path: Path = db.DB_PATH) -> "MemoryBackend":
+        """
+        Load every customer and ticket from a SQLite database.
+        """
+        with closing(sqlite3.connect(db_path)) as conn:
+            conn.row_factory = sqlite3.Row
+            return cls(
+                (dict(row) for row in conn.execute("SELECT * FROM customers")),
+                (dict(row) for row in conn.execute("SELECT * FROM tickets")),
+            )
+
+    def _add_customer(self, customer: Dict[str, Any]) -> None:
+        self._customers[customer["id"]] = customer
+        self._customers_by_status[customer["status"]].add(customer["id"])
+
+    def _add_ticket(self, ticket: Dict[str, Any]) -> None:
+        self._tickets[ticket["id"]] = ticket
+        self._tickets_by_customer[ticket["customer_id"]].add(ticket["id"])
+        self._tickets_by_status[ticket["status"]].add(ticket["id"])
+        if ticket["status"] != "resolved":
+            self._open_counts[ticket["customer_id"]][(ticket["priority"], ticket["status"])] += 1
+        words = [_stem(w) for w in re.findall(r"\w+", ticket["issue"].lower())]
+        self._issue_lengths[ticket["id"]] = len(words)
+        for word, count in Counter(words).items():
+            self._postings[word][ticket["id"]] = count
+
+    def _open_tickets(self, where: Callable[[Dict[str, Any]], bool] = lambda t: True) -> Iterator[Dict[str, Any]]:
+        for status, ticket_ids in self._tickets_by_status.items():
+            if status != "resolved":
+                for ticket_id in ticket_ids:
+                    ticket = self._tickets[ticket_id]
+                    if where(ticket):
+                        yield ticket
+
+    def get_customer(self, customer_id: int) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            customer = self._customers.get(customer_id)
+            return dict(customer) if customer else None
+
+    def get_customers(self, customer_ids: Iterable[int]) -> Dict[int, Dict[str, Any]]:
+        with self._lock:
+            return {
+                customer_id: dict(self._customers[customer_id])
+                for customer_id in dict.fromkeys(customer_ids)
+                if customer_id in self._customers
+            }
+
+    def list_customers(
+        self, status: Optional[str] = None, limit: int = 10, after: Optional[db.PageCursor] = None
+    ) -> List[Dict[str, Any]]:
+        with self._lock:
+            if status:
+                candidates: Iterable[Dict[str, Any]] = (self._customers[i] for i in self._customers_by_status.get(status, ()))
+            else:
+                candidates = self._customers.values()
+            return [dict(c) for c in heapq.nlargest(limit, _after(candidates, after), key=_newest_first)]
+
+    def update_customer(self, customer_id: int, data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        updates = {k: v for k, v in (data or {}).items() if k in db.CUSTOMER_EDITABLE_FIELDS}
+        if "status" in updates and updates["status"] not in CUSTOMER_STATUSES:
+            raise ValueError(f"Invalid customer status: {updates['status']!r}")
+        with self._lock:
+            customer = self._customers.get(customer_id)
+            if customer is None:
+                return None
+            if updates:
+                self._customers_by_status[customer["status"]].discard(customer_id)
+                customer.update(updates, updated_at=_now())
+                self._customers_by_status[customer["status"]].add(customer_id)
+            return dict(customer)
+
+    def _new_ticket(self, ticket_id: int, customer_id: int, issue: str, priority: str, status: str) -> Dict[str, Any]:
+        if status not in TICKET_STATUSES:
+            raise ValueError(f"Invalid ticket status: {status!r}")
+        if priority not in TICKET_PRIORITIES:
+            raise ValueError(f"Invalid ticket priority: {priority!r}")
+        return {
+            "id": ticket_id,
+            "customer_id": customer_id,
+            "issue": issue,
+            "status": status,
+            "priority": priority,
+            "created_at": _now(),
+        }
+
+    def create_ticket(self, customer_id: int, issue: str, priority: str = "medium", status: str = "open") -> Dict[str, Any]:
+        return self.create_tickets([{"customer_id": customer_id, "issue": issue, "priority": priority, "status": status}])[0]
+
+    def create_tickets(self, tickets: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        with self._lock:
+            # Like INTEGER PRIMARY KEY: the next id follows the largest one in use.
+            next_id = max(self._tickets, default=0) + 1
+            created = [
+                self._new_ticket(next_id + offset, t["customer_id"], t["issue"], t.get("priority", "medium"), t.get("status", "open"))
+                for offset, t in enumerate(tickets)
+            ]
+            # Validated above before anything is added, so a bad item writes nothing.
+            for ticket in created:
+                self._add_ticket(ticket)
+            return [dict(t) for t in created]
+
+    def get_customer_history(
+        self, customer_id: int, limit: Optional[int] = None, after: Optional[db.PageCursor] = None
+    ) -> List[Dict[str, Any]]:
+        with self._lock:
+            tickets = _after((self._tickets[i] for i in self._tickets_by_customer.get(customer_id, ())), after)
+            if limit is not None:
+                return [dict(t) for t in heapq.nlargest(limit, tickets, key=_newest_first)]
+            return [dict(t) for t in sorted(tickets, key=_newest_first, reverse=True)]
+
+    def get_customer_histories(self, customer_ids: Iterable[int]) -> Dict[int, List[Dict[str, Any]]]:
+        with self._lock:
+            return {customer_id: self.get_customer_history(customer_id) for customer_id in dict.fromkeys(customer_ids)}
+
+    def list_open_tickets(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [dict(t) for t in sorted(self._open_tickets(), key=_open_order, reverse=True)]
+
+    def list_open_tickets_for_customers(
+        self,
+        customer_status: str = "active",
+        priority: Optional[str] = None,
+        limit: int = 100,
+        after: Optional[db.OpenTicketCursor] = None,
+    ) -> List[Dict[str, Any]]:
+        with self._lock:
+            matching = self._open_tickets(
+                lambda t: (priority is None or t["priority"] == priority)
+                and (after is None or _open_order(t) < tuple(after))
+                and self._customers.get(t["customer_id"], {}).get("status") == customer_status
+            )
+            return [dict(t) for t in heapq.nlargest(limit, matching, key=_open_order)]
+
+    def iter_open_tickets_for_customers(
+        self, customer_status: str = "active", priority: Optional[str] = None, page_size: int = 500
+    ) -> Iterator[List[Dict[str, Any]]]:
+        # One sort up front instead of a scan per page; pages reflect the data at the first next().
+        with self._lock:
+            matching = sorted(
+                self._open_tickets(
+                    lambda t: (priority is None or t["priority"] == priority)
+                    and self._customers.get(t["customer_id"], {}).get("status") == customer_status
+                ),
+                key=_open_order,
+                reverse=True,
+            )
+            matching = [dict(t) for t in matching]
+        for start in range(0, len(matching), page_size):
+            yield matching[start:start + page_size]
+
+    def list_customers_with_open_tickets(self, status: str = "active", limit: int = 50) -> List[Dict[str, Any]]:
+        with self._lock:
+            candidates = (
+                self._customers[customer_id]
+                for customer_id in self._customers_by_status.get(status, ())
+                if any(self._tickets[i]["status"] != "resolved" for i in self._tickets_by_customer.get(customer_id, ()))
+            )
+            return [dict(c) for c in heapq.nlargest(limit, candidates, key=_newest_first)]
+
+    def get_open_ticket_summary(self, customer_id: int) -> db.OpenTicketSummary:
+        with self._lock:
+            return _summary(self._open_counts.get(customer_id, {}))
+
+    def get_open_ticket_totals(self, customer_status: Optional[str] = None) -> db.OpenTicketSummary:
+        totals: Counter = Counter()
+        with self._lock:
+            for customer_id, counts in self._open_counts.items():
+                if customer_status is None or self._customers.get(customer_id, {}).get("status") == customer_status:
+                    totals.update(counts)
+        return _summary(totals)
+
+    def search_tickets(
+        self, query: str, limit: int = 10, open_only: bool = False, match_all: bool = False
+    ) -> List[Dict[str, Any]]:
+        # Okapi BM25, same idf floor and k1/b as SQLite's bm25().
+        k1, b = 1.2, 0.75
+        with self._lock:
+            postings = [self._postings.get(term, {}) for term in dict.fromkeys(map(_stem, db.search_terms(query)))]
+            if not postings:
+                return []
+            doc_count = len(self._tickets)
+            avg_length = sum(self._issue_lengths.values()) / max(doc_count, 1)
+            weights = [max(math.log((doc_count - len(docs) + 0.5) / (len(docs) + 0.5)), 1e-6) for docs in postings]
+
+            def score(ticket_id: int, terms: List[int]) -> float:
+                norm = k1 * (1 - b + b * self._issue_lengths[ticket_id] / avg_length)
+                return sum(
+                    weights[t] * postings[t][ticket_id] * (k1 + 1) / (postings[t][ticket_id] + norm)
+                    for t in terms
+                    if ticket_id in postings[t]
+                )
+
+            def rank(candidates: Iterable[int], terms: List[int], count: int) -> List[Tuple[float, int]]:
+                if open_only:
+                    candidates = (i for i in candidates if self._tickets[i]["status"] != "resolved")
+                return heapq.nlargest(count, ((score(i, terms), i) for i in candidates))
+
+            # Same order as db.search_tickets: tickets containing every term first, then the
+            # best partial matches on the terms that are not in SEARCH_FILL_MAX_DOCS+ tickets.
+            every = list(range(len(postings)))
+            rarest = min(postings, key=len)
+            best = rank((i for i in rarest if all(i in docs for docs in postings)), every, limit)
+            if len(best) < limit and len(postings) > 1 and not match_all:
+                fill = [t for t in every if len(postings[t]) < db.SEARCH_FILL_MAX_DOCS] or every
+                seen = {i for _, i in best}
+                candidates = set().union(*(postings[t].keys() for t in fill)) - seen
+                best += rank(candidates, fill, limit - len(best))
+            return [dict(self._tickets[i], score=value) for value, i in best]
@@ -0,0 +1,29 @@
+import db
+from agents.base import AgentLogger
+from agents.customer_data_agent import CustomerDataAgent
+from agents.router_agent import RouterAgent
+from agents.support_agent import SupportAgent
+from database_setup import bootstrap_database
+
+QUERIES = [
+    "I've been charged twice, please refund immediately!",
+    "Get customer information for ID 5",
+    "I'm customer 12345 and was charged twice, please refund",
+    "I've been charged twice, please refund immediately!",
+    "I'm customer 12345 and need help upgrading my account",
+]
+
+
+def test_batch_answers_billing_queries_with_one_search(tmp_path):
+    db_path = tmp_path / "cs.db"
+    bootstrap_database(db_path)
+    logger = AgentLogger()
+    data_agent = CustomerDataAgent(logger, db_path=str(db_path))
+    router = RouterAgent(logger, data_agent, SupportAgent(logger, data_agent=data_agent))
+
+    expected = [router.handle_user_query(query) for query in QUERIES]
+    del logger.messages[:]
+    assert router.handle_user_queries(QUERIES) == expected
+    assert [m.intent for m in logger.messages if m.recipient == data_agent.name].count("search_tickets_batch") == 1
+    assert not [m for m in logger.messages if m.intent == "search_tickets"]
+    db.close_pools()
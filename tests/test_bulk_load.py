@@ -0,0 +1,46 @@
+import json
+import sqlite3
+from contextlib import closing
+
+import db
+from database_setup import bootstrap_database, bulk_load, read_rows
+
+SCHEMA = "SELECT type, name, sql FROM sqlite_master WHERE type IN ('index', 'trigger') ORDER BY name"
+
+
+def test_append_load_keeps_schema_and_refreshes_derived_tables(tmp_path, monkeypatch):
+    db_path = tmp_path / "cs.db"
+    bootstrap_database(db_path)
+    with closing(sqlite3.connect(db_path)) as conn:
+        schema = conn.execute(SCHEMA).fetchall()
+    statements = []
+    connect = sqlite3.connect
+
+    def traced_connect(*args, **kwargs):
+        conn = connect(*args, **kwargs)
+        conn.set_trace_callback(statements.append)
+        return conn
+
+    monkeypatch.setattr(sqlite3, "connect", traced_connect)
+    tickets = [(100 + n, 5, f"Appended duplicate charge {n}", "open", "high", None) for n in range(3)]
+    bulk_load(db_path, tickets=tickets, reset_existing=False)
+    monkeypatch.undo()
+
+    # No migration re-ran: v1 would recreate the index v2 drops.
+    assert not [s for s in statements if "idx_tickets_open_priority" in s or "user_version =" in s]
+    with closing(sqlite3.connect(db_path)) as conn:
+        assert conn.execute(SCHEMA).fetchall() == schema
+        assert conn.execute("PRAGMA user_version").fetchone()[0] == db.SCHEMA_VERSION
+        assert conn.execute("SELECT count(*) FROM open_tickets WHERE ticket_id >= 100").fetchone()[0] == 3
+    found = db.search_tickets("appended duplicate", limit=5, match_all=True, db_path=db_path)
+    assert {t["id"] for t in found} == {100, 101, 102}
+    db.close_pools()
+
+
+def test_read_rows_keeps_falsy_jsonl_values(tmp_path):
+    path = tmp_path / "tickets.jsonl"
+    path.write_text(json.dumps({"id": 0, "customer_id": 5, "issue": "", "status": None}) + "\n", encoding="utf-8")
+    assert list(read_rows(path, "tickets")) == [(0, 5, "", None, None, None)]
+    csv_path = tmp_path / "tickets.csv"
+    csv_path.write_text("id,customer_id,issue,status\n0,5,Broken,\n", encoding="utf-8")
+    assert list(read_rows(csv_path, "tickets")) == [("0", "5", "Broken", None, None, None)]
@@ -0,0 +1,21 @@
+import db
+from database_setup import bootstrap_database
+
+
+def test_customer_read_racing_a_write_is_not_cached(tmp_path, monkeypatch):
+    db_path = tmp_path / "cs.db"
+    bootstrap_database(db_path)
+    fetch = db._fetch_customer
+
+    def fetch_then_write(customer_id, path):
+        # The read sees the old row, then a write commits before the read fills the cache.
+        customer = fetch(customer_id, path)
+        db.update_customer(customer_id, {"email": "raced@example.com"}, db_path=path)
+        return customer
+
+    monkeypatch.setattr(db, "_fetch_customer", fetch_then_write)
+    stale = db.get_customer(5, db_path=db_path)
+    monkeypatch.setattr(db, "_fetch_customer", fetch)
+    assert stale["email"] != "raced@example.com"
+    assert db.get_customer(5, db_path=db_path)["email"] == "raced@example.com"
+    db.close_pools()
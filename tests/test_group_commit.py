@@ -0,0 +1,65 @@
+import sqlite3
+from contextlib import closing
+
+import db
+from database_setup import bootstrap_database
+
+
+def _ticket(customer_id, issue):
+    return lambda cur: db._insert_ticket(cur, customer_id, issue, "low", "open")
+
+
+def _fails_after_insert(cur):
+    db._insert_ticket(cur, 1, "Rolled back", "low", "open")
+    raise ValueError("bad write")
+
+
+def test_failing_write_is_isolated_and_results_keep_their_order(tmp_path):
+    db_path = tmp_path / "cs.db"
+    bootstrap_database(db_path)
+    # The group waits until all three writes are queued, so they share one transaction.
+    writer = db.GroupCommitWriter(db_path, max_batch_size=3, max_delay=5.0)
+    futures = [
+        writer.submit(_ticket(1, "First"), lambda ticket: None),
+        writer.submit(_fails_after_insert, lambda ticket: None),
+        writer.submit(_ticket(2, "Third"), lambda ticket: None),
+    ]
+    first, third = futures[0].result(), futures[2].result()
+    assert isinstance(futures[1].exception(), ValueError)
+    assert (first["customer_id"], first["issue"]) == (1, "First")
+    assert (third["customer_id"], third["issue"]) == (2, "Third")
+    assert (writer.batches, writer.writes) == (1, 3)
+    writer.close()
+    with closing(sqlite3.connect(db_path)) as conn:
+        issues = [row[0] for row in conn.execute("SELECT issue FROM tickets WHERE id >= ? ORDER BY id", (first["id"],))]
+    assert issues == ["First", "Third"]
+    db.close_pools()
+
+
+def test_grouped_ticket_invalidates_cached_history(tmp_path):
+    db_path = tmp_path / "cs.db"
+    bootstrap_database(db_path)
+    before = db.get_customer_history(1, db_path=db_path)
+    db.enable_group_commit(db_path)
+    try:
+        ticket = db.create_ticket(1, "Grouped write", db_path=db_path)
+    finally:
+        db.disable_group_commit(db_path)
+    after = db.get_customer_history(1, db_path=db_path)
+    assert len(after) == len(before) + 1
+    assert ticket["id"] in {t["id"] for t in after}
+    db.close_pools()
+
+
+def test_close_flushes_pending_writes(tmp_path):
+    db_path = tmp_path / "cs.db"
+    bootstrap_database(db_path)
+    # A long max_delay keeps the writes queued until close() stops the writer.
+    writer = db.GroupCommitWriter(db_path, max_batch_size=100, max_delay=60.0)
+    futures = [writer.submit(_ticket(1, f"Pending {n}"), lambda ticket: None) for n in range(3)]
+    writer.close()
+    assert all(f.done() for f in futures)
+    with closing(sqlite3.connect(db_path)) as conn:
+        count = conn.execute("SELECT count(*) FROM tickets WHERE issue LIKE 'Pending %'").fetchone()[0]
+    assert count == 3
+    db.close_pools()
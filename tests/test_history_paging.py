@@ -0,0 +1,53 @@
+import db
+from agents.base import AgentLogger, AgentMessage
+from agents.customer_data_agent import CustomerDataAgent
+from agents.router_agent import HISTORY_PAGE_SIZE, RouterAgent
+from agents.support_agent import SupportAgent
+from database_setup import bootstrap_database
+
+
+def test_long_history_pages_through_serializable_messages(tmp_path):
+    db_path = tmp_path / "cs.db"
+    bootstrap_database(db_path)
+    db.create_tickets(
+        [{"customer_id": 5, "issue": f"Paged issue {n}", "priority": "low"} for n in range(HISTORY_PAGE_SIZE * 2)],
+        db_path=db_path,
+    )
+    logger = AgentLogger()
+    data_agent = CustomerDataAgent(logger, db_path=str(db_path))
+    router = RouterAgent(logger, data_agent, SupportAgent(logger, data_agent=data_agent))
+
+    response = router.handle_user_query("Update my email to paged@example.com and show my ticket history")["response"]
+    assert all(f"Paged issue {n} " in response for n in range(HISTORY_PAGE_SIZE * 2))
+    for message in logger.messages:
+        assert AgentMessage.from_bytes(message.to_bytes()) == message
+    db.close_pools()
+
+
+def test_history_is_not_cut_short_without_a_paging_support_agent(tmp_path):
+    db_path = tmp_path / "cs.db"
+    bootstrap_database(db_path)
+    db.create_tickets(
+        [{"customer_id": 5, "issue": f"Paged issue {n}", "priority": "low"} for n in range(120)], db_path=db_path
+    )
+    logger = AgentLogger()
+    router = RouterAgent(logger, CustomerDataAgent(logger, db_path=str(db_path)), SupportAgent(logger))
+
+    response = router.handle_user_query("Update my email to paged@example.com and show my ticket history")["response"]
+    assert len(response.splitlines()) == 1 + len(db.get_customer_history(5, db_path=db_path))
+    db.close_pools()
+
+
+def test_unfollowed_cursor_renders_a_more_footer():
+    logger = AgentLogger()
+    rows = [{"status": "open", "issue": f"Issue {n}", "priority": "low", "id": n} for n in range(3)]
+    request = AgentMessage(
+        sender="router-agent",
+        recipient="support-agent",
+        content="Share history",
+        intent="history",
+        payload={"customer": {"id": 5, "name": "Elena"}, "history": rows, "next_cursor": "opaque"},
+    )
+    lines = SupportAgent(logger).handle(request).content.splitlines()
+    assert len(lines) == 5
+    assert lines[-1] == "... showing 1-3, more available"
@@ -0,0 +1,86 @@
+import random
+import re
+
+import pytest
+
+from agents.intents import DEFAULT_DETECTOR, IntentDetector
+from run_demo import SCENARIOS
+
+
+def legacy_intent(query):
+    # The per-keyword checks RouterAgent used before the compiled rule table.
+    text = query.lower()
+    if "charged twice" in text or ("refund" in text and "charged" in text):
+        return "cancel_and_billing"
+    if "high-priority" in text or "high priority" in text:
+        return "high_priority_report"
+    if "cancel" in text and "billing" in text:
+        return "cancel_and_billing"
+    if "upgrade" in text or "upgrad" in text:
+        return "upgrade"
+    if "update my email" in text and "history" in text:
+        return "update_email_and_history"
+    if "open tickets" in text and "active customers" in text:
+        return "active_with_open_tickets"
+    if "customer information" in text or text.startswith("get customer information"):
+        return "customer_info"
+    return "general_support"
+
+
+def legacy_entities(query):
+    customer = re.search(r"(?:id|customer)\s*(\d+)", query.lower())
+    email = re.search(r"update my email to ([^\s]+)", query.lower())
+    return (int(customer.group(1)) if customer else None, email.group(1) if email else None)
+
+
+EDGE_PHRASES = [
+    "",
+    "hello",
+    "I was CHARGED TWICE",
+    "I was charged, please refund",
+    "refund please",
+    "charged for a refund twice",
+    "Cancel my plan and fix billing",
+    "cancel my plan",
+    "HIGH PRIORITY tickets",
+    "high-priority and cancel billing",
+    "Upgrading to premium",
+    "update my email to a@b.c",
+    "update my email to A@B.C and show history",
+    "history, then update my email",
+    "Show open tickets for active customers",
+    "active customers",
+    "Get customer information",
+    "customer information for customer12 and id 7",
+    "My customer id is 42",
+    "ID42 customer 7",
+    "paid",
+    "update my email to\tx@y.z history",
+    "refund charged twice and upgrade",
+]
+
+FRAGMENTS = [
+    "charged twice", "charged", "refund", "high-priority", "high priority", "cancel", "billing",
+    "upgrade", "upgrading", "update my email to x@example.com", "update my email", "history",
+    "open tickets", "active customers", "customer information", "customer 12345", "id 5", "id",
+    "please", "my account", "CUSTOMER 7", "Billing", "HISTORY", "tickets",
+]
+
+
+def _random_phrases(count, seed=3):
+    rng = random.Random(seed)
+    return [" ".join(rng.choice(FRAGMENTS) for _ in range(rng.randint(1, 5))) for _ in range(count)]
+
+
+@pytest.mark.parametrize("query", [query for _, query in SCENARIOS] + EDGE_PHRASES)
+def test_detector_matches_legacy_checks(query):
+    match = DEFAULT_DETECTOR.detect(query)
+    assert match.intent == legacy_intent(query)
+    assert (match.customer_id, match.email) == legacy_entities(query)
+
+
+def test_detector_matches_legacy_checks_on_random_phrases():
+    detector = IntentDetector()
+    for query in _random_phrases(2000):
+        match = detector.detect(query)
+        assert (match.intent, match.customer_id, match.email) == (legacy_intent(query), *legacy_entities(query)), query
@@ -0,0 +1,48 @@
+import asyncio
+import sqlite3
+import threading
+from contextlib import closing
+
+import db
+import mcp_server
+from database_setup import bootstrap_database
+
+
+def test_server_attribute_is_built_once_for_the_mcp_cli():
+    server = mcp_server.server
+    assert server is mcp_server.server
+    assert server.name == "customer-data-mcp"
+    assert not hasattr(mcp_server, "app")
+
+
+def test_tools_resolve_the_backend_off_the_event_loop(tmp_path, monkeypatch):
+    db_path = tmp_path / "cs.db"
+    bootstrap_database(db_path)
+    monkeypatch.setattr(mcp_server, "ALLOWED_DB_PATHS", {mcp_server._db_key(db_path)})
+    monkeypatch.setattr(mcp_server, "_backends", {})
+    threads = []
+    backend = mcp_server._backend
+
+    def record_thread(path):
+        threads.append(threading.current_thread().name)
+        return backend(path)
+
+    monkeypatch.setattr(mcp_server, "_backend", record_thread)
+    assert asyncio.run(mcp_server.get_customer(5, db_path=str(db_path)))["id"] == 5
+    assert threads and threads[0].startswith("mcp-db")
+    db.close_pools()
+
+
+def test_search_tickets_returns_json_safe_rows(tmp_path, monkeypatch):
+    db_path = tmp_path / "cs.db"
+    bootstrap_database(db_path)
+    db.create_ticket(5, "Stored as bytes: duplicate charge", db_path=db_path)
+    with closing(sqlite3.connect(db_path)) as conn:
+        conn.execute("UPDATE tickets SET issue = CAST(issue AS BLOB) WHERE issue LIKE 'Stored as bytes%'")
+        conn.commit()
+    monkeypatch.setattr(mcp_server, "ALLOWED_DB_PATHS", {mcp_server._db_key(db_path)})
+    monkeypatch.setattr(mcp_server, "_backends", {})
+    found = asyncio.run(mcp_server.search_tickets("duplicate charge", db_path=str(db_path)))
+    assert "Stored as bytes: duplicate charge" in [t["issue"] for t in found]
+    assert all(not isinstance(v, bytes) for t in found for v in t.values())
+    db.close_pools()
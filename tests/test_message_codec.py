@@ -0,0 +1,33 @@
+import pickle
+
+import pytest
+
+from agents.base import AgentMessage, FrozenAgentMessage
+from worker_pool import _encode
+
+
+def test_messages_round_trip_through_bytes():
+    message = AgentMessage("Router", "Support", "Reply", "billing", {"tickets": [{"id": 1, "score": 1.5}], "ok": True}, 2.0)
+    assert AgentMessage.from_bytes(message.to_bytes()) == message
+    frozen = FrozenAgentMessage("Router", "Support", "Reply")
+    assert FrozenAgentMessage.from_bytes(frozen.to_bytes()) == frozen
+
+
+def test_from_bytes_rejects_pickle_and_unknown_encodings():
+    fields = ("Router", "Support", "Reply", None, None, None)
+    with pytest.raises(ValueError):
+        AgentMessage.from_bytes(b"P" + pickle.dumps(fields))
+    with pytest.raises(ValueError):
+        AgentMessage.from_bytes(b"")
+    with pytest.raises(ValueError):
+        AgentMessage.from_bytes(b"M" + b"\x00garbage")
+    with pytest.raises(ValueError):
+        AgentMessage.from_bytes(AgentMessage("Router", "Support", "Reply").to_bytes()[:-3])
+
+
+def test_payloads_that_are_not_plain_values_travel_as_text():
+    message = AgentMessage("Router", "Support", "Reply", payload={"rows": iter([1, 2])})
+    with pytest.raises(ValueError):
+        message.to_bytes()
+    decoded = AgentMessage.from_bytes(_encode(message))
+    assert decoded.payload == {"repr": repr(message.payload)}
@@ -0,0 +1,59 @@
+import sqlite3
+from contextlib import closing
+
+import db
+from database_setup import bootstrap_database
+
+OPEN_TICKETS = "SELECT ticket_id, customer_id, customer_status, priority, status, created_at FROM open_tickets ORDER BY 1"
+OPEN_TICKETS_RECOUNT = (
+    "SELECT t.id, t.customer_id, c.status, t.priority, t.status, t.created_at "
+    "FROM tickets t LEFT JOIN customers c ON c.id = t.customer_id WHERE t.status != 'resolved' ORDER BY 1"
+)
+COUNTS = "SELECT customer_id, customer_status, priority, status, ticket_count FROM open_ticket_counts ORDER BY 1, 3, 4"
+COUNTS_RECOUNT = (
+    "SELECT t.customer_id, c.status, t.priority, t.status, COUNT(*) "
+    "FROM tickets t LEFT JOIN customers c ON c.id = t.customer_id WHERE t.status != 'resolved' "
+    "GROUP BY t.customer_id, t.priority, t.status ORDER BY 1, 3, 4"
+)
+
+
+def _assert_matches_recount(conn):
+    assert conn.execute(OPEN_TICKETS).fetchall() == conn.execute(OPEN_TICKETS_RECOUNT).fetchall()
+    assert conn.execute(COUNTS).fetchall() == conn.execute(COUNTS_RECOUNT).fetchall()
+
+
+def test_triggers_keep_open_ticket_views_in_line_with_tickets(tmp_path):
+    db_path = tmp_path / "cs.db"
+    bootstrap_database(db_path)
+    with closing(sqlite3.connect(db_path)) as conn:
+        _assert_matches_recount(conn)
+        steps = [
+            "INSERT INTO tickets (id, customer_id, issue, status, priority) VALUES (100, 1, 'Login loop', 'open', 'low')",
+            "UPDATE tickets SET status = 'in_progress' WHERE id = 100",
+            "UPDATE tickets SET priority = 'high' WHERE id = 100",
+            "UPDATE customers SET status = 'disabled' WHERE id = 1",
+            "UPDATE tickets SET status = 'resolved' WHERE id = 100",
+            "UPDATE tickets SET status = 'open' WHERE id = 100",
+            "DELETE FROM tickets WHERE id = 100",
+            "DELETE FROM customers WHERE id = 1",
+        ]
+        for sql in steps:
+            conn.execute(sql)
+            _assert_matches_recount(conn)
+        conn.commit()
+
+
+def test_open_ticket_totals_filter_on_maintained_customer_status(tmp_path):
+    db_path = tmp_path / "cs.db"
+    bootstrap_database(db_path)
+    with closing(sqlite3.connect(db_path)) as conn:
+        conn.execute("UPDATE customers SET status = 'disabled' WHERE id = 1")
+        conn.commit()
+        expected = conn.execute(
+            "SELECT t.priority, t.status, COUNT(*) FROM tickets t JOIN customers c ON c.id = t.customer_id "
+            "WHERE c.status = 'active' AND t.status != 'resolved' GROUP BY t.priority, t.status"
+        ).fetchall()
+    db.clear_caches()
+    totals = db.get_open_ticket_totals("active", db_path=db_path)
+    assert totals == db._summary(expected)
+    db.close_pools()
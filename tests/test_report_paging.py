@@ -0,0 +1,102 @@
+import asyncio
+
+import db
+from agents.base import AgentLogger, AgentMessage
+from agents.customer_data_agent import CustomerDataAgent
+from agents.router_agent import OPEN_TICKETS_PAGE_SIZE, RouterAgent
+from agents.support_agent import SupportAgent
+from database_setup import bootstrap_database
+
+COMPLEX = "Show me all active customers who have open tickets"
+REPORT = "What's the status of all high-priority tickets for premium customers?"
+
+
+def _router(tmp_path, extra_tickets, **options):
+    db_path = tmp_path / "cs.db"
+    bootstrap_database(db_path)
+    db.create_tickets(
+        [{"customer_id": 5, "issue": f"Paged issue {n}", "priority": "high"} for n in range(extra_tickets)], db_path=db_path
+    )
+    logger = AgentLogger()
+    data_agent = CustomerDataAgent(logger, db_path=str(db_path))
+    return RouterAgent(logger, data_agent, SupportAgent(logger, data_agent=data_agent), **options), logger
+
+
+def test_reports_stream_every_open_ticket_page(tmp_path):
+    extra = OPEN_TICKETS_PAGE_SIZE * 2 + 1
+    router, logger = _router(tmp_path, extra)
+    expected = db.get_open_ticket_totals("active", db_path=tmp_path / "cs.db")
+    open_count = sum(n for statuses in expected.values() for n in statuses.values())
+
+    report = router.handle_user_query(REPORT)["response"].splitlines()
+    assert report[0] == "High-priority open tickets:"
+    assert len(report) - 1 == sum(expected["high"].values())
+
+    combined = asyncio.run(router.handle_user_query_async(COMPLEX))["response"].splitlines()
+    assert combined[0] == "Open tickets for target customers:"
+    assert len(combined) - 1 == open_count
+    assert all(f"Paged issue {n} " in "\n".join(combined) for n in range(extra))
+
+    pages = [m for m in logger.messages if m.intent == "open_tickets_for_customers" and m.sender == "support-agent"]
+    assert len(pages) == 4
+    for message in logger.messages:
+        assert AgentMessage.from_bytes(message.to_bytes()) == message
+    db.close_pools()
+
+
+def test_limited_report_reads_one_page_and_shows_the_total(tmp_path):
+    router, logger = _router(tmp_path, OPEN_TICKETS_PAGE_SIZE * 2, report_limit=20)
+    high = sum(db.get_open_ticket_totals("active", db_path=tmp_path / "cs.db")["high"].values())
+
+    report = router.handle_user_query(REPORT)["response"].splitlines()
+    assert len(report) == 22
+    assert report[-1] == f"... showing 20 of {high:,}"
+    assert not [m for m in logger.messages if m.intent == "open_tickets_for_customers" and m.sender == "support-agent"]
+    db.close_pools()
+
+
+def test_streamed_report_yields_lines_as_pages_are_read(tmp_path):
+    router, logger = _router(tmp_path, OPEN_TICKETS_PAGE_SIZE * 2)
+    lines = router.iter_user_query(COMPLEX)
+    assert next(lines) == "Open tickets for target customers:"
+    assert not [m for m in logger.messages if m.intent == "open_tickets_for_customers" and m.sender == "support-agent"]
+    totals = db.get_open_ticket_totals("active", db_path=tmp_path / "cs.db")
+    assert len(list(lines)) == sum(n for statuses in totals.values() for n in statuses.values())
+    for message in logger.messages:
+        assert AgentMessage.from_bytes(message.to_bytes()) == message
+    db.close_pools()
+
+
+def test_reports_are_not_cut_short_without_a_paging_support_agent(tmp_path):
+    db_path = tmp_path / "cs.db"
+    bootstrap_database(db_path)
+    db.create_tickets(
+        [{"customer_id": 5, "issue": f"Paged issue {n}", "priority": "high"} for n in range(OPEN_TICKETS_PAGE_SIZE + 1)],
+        db_path=db_path,
+    )
+    logger = AgentLogger()
+    router = RouterAgent(logger, CustomerDataAgent(logger, db_path=str(db_path)), SupportAgent(logger))
+    totals = db.get_open_ticket_totals("active", db_path=db_path)
+
+    report = router.handle_user_query(REPORT)["response"].splitlines()
+    assert len(report) - 1 == sum(totals["high"].values())
+    combined = asyncio.run(router.handle_user_query_async(COMPLEX))["response"].splitlines()
+    assert len(combined) - 1 == sum(n for statuses in totals.values() for n in statuses.values())
+    db.close_pools()
+
+
+def test_unfollowed_report_cursor_renders_a_more_footer():
+    tickets = [
+        {"id": n, "customer_id": 5, "issue": f"Issue {n}", "priority": p, "status": "open"}
+        for n, p in enumerate(["medium", "high"])
+    ]
+    request = AgentMessage(
+        sender="router-agent",
+        recipient="support-agent",
+        content="Combine customer and ticket filters",
+        intent="ticket_report",
+        payload={"tickets": tickets, "next_cursor": "opaque"},
+    )
+    lines = SupportAgent(AgentLogger()).handle(request).content.splitlines()
+    assert lines[0] == "Open tickets for target customers:"
+    assert lines[-1] == "... showing 1-2, more available"
@@ -0,0 +1,39 @@
+import asyncio
+
+import db
+from agents.base import AgentLogger
+from agents.customer_data_agent import CustomerDataAgent
+from agents.router_agent import RouterAgent
+from agents.support_agent import SupportAgent
+from database_setup import bootstrap_database
+
+INFO = "Get customer information for ID 5"
+UPDATE = "Update my email to fresh@example.com and show my ticket history"
+
+
+def _router(tmp_path, **options):
+    db_path = tmp_path / "cs.db"
+    bootstrap_database(db_path)
+    logger = AgentLogger()
+    data_agent = CustomerDataAgent(logger, db_path=str(db_path))
+    return RouterAgent(logger, data_agent, SupportAgent(logger, data_agent=data_agent), **options)
+
+
+def test_read_cache_dropped_after_write_without_dedup(tmp_path):
+    router = _router(tmp_path, read_cache_ttl=60)
+    assert "fresh@example.com" not in router.handle_user_query(INFO)["response"]
+    router.handle_user_query(UPDATE)
+    assert "fresh@example.com" in router.handle_user_query(INFO)["response"]
+    db.close_pools()
+
+
+def test_read_cache_dropped_after_write_without_dedup_async(tmp_path):
+    router = _router(tmp_path, read_cache_ttl=60)
+
+    async def scenario():
+        await router.handle_user_query_async(INFO)
+        await router.handle_user_query_async(UPDATE)
+        return await router.handle_user_query_async(INFO)
+
+    assert "fresh@example.com" in asyncio.run(scenario())["response"]
+    db.close_pools()
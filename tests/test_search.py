@@ -0,0 +1,64 @@
+import sqlite3
+from contextlib import closing
+
+import db
+from agents.base import AgentLogger
+from agents.customer_data_agent import CustomerDataAgent
+from agents.router_agent import RouterAgent
+from agents.support_agent import SupportAgent
+from database_setup import bootstrap_database, migrate
+
+
+def test_search_terms_drop_ids_and_requester_words():
+    assert db.search_terms("I'm customer 12345 and was charged twice, please refund ASAP") == ["charged", "twice", "refund"]
+    assert db.search_terms("Customer ID 5 needs help") == ["needs"]
+
+
+def test_search_and_migrate_handle_v4_database_without_fts_table(tmp_path):
+    db_path = tmp_path / "cs.db"
+    bootstrap_database(db_path)
+    with closing(sqlite3.connect(db_path)) as conn, conn:
+        # What migration v4 leaves behind when it ran under an SQLite without FTS5.
+        for name in ("trg_tickets_fts_insert", "trg_tickets_fts_delete", "trg_tickets_fts_update"):
+            conn.execute(f"DROP TRIGGER {name}")
+        conn.execute("DROP TABLE tickets_fts")
+    assert [t["id"] for t in db.search_tickets("duplicate charge", db_path=db_path)] == [6]
+
+    with closing(sqlite3.connect(db_path)) as conn:
+        migrate(conn)
+        assert conn.execute("SELECT count(*) FROM tickets_fts").fetchone()[0] == 6
+    db.create_ticket(5, "Duplicate charge on renewal", db_path=db_path)
+    assert len(db.search_tickets("duplicate charge", db_path=db_path)) == 2
+    db.close_pools()
+
+
+def test_fts_table_lookup_runs_once_per_database(tmp_path, monkeypatch):
+    db_path = tmp_path / "cs.db"
+    bootstrap_database(db_path)
+    lookups = []
+    has_table = db._has_table
+
+    def counted(cur, name):
+        lookups.append(name)
+        return has_table(cur, name)
+
+    monkeypatch.setattr(db, "_has_table", counted)
+    for _ in range(3):
+        assert [t["id"] for t in db.search_tickets("duplicate charge", db_path=db_path)] == [6]
+    assert lookups == ["tickets_fts"]
+    db.clear_caches()
+    db.search_tickets("duplicate charge", db_path=db_path)
+    assert len(lookups) == 2
+    db.close_pools()
+
+
+def test_billing_reply_keeps_similar_tickets_out_of_the_customer_text(tmp_path):
+    db_path = tmp_path / "cs.db"
+    bootstrap_database(db_path)
+    logger = AgentLogger()
+    router = RouterAgent(logger, CustomerDataAgent(logger, db_path=str(db_path)), SupportAgent(logger))
+    response = router.handle_user_query("I've been charged twice, please refund immediately!")["response"]
+    assert "Refund pending for last order" not in response and "#3" not in response
+    escalations = [m.payload["escalation"] for m in logger.messages if m.payload and "escalation" in m.payload]
+    assert escalations and 3 in escalations[-1]["related_tickets"]
+    db.close_pools()
@@ -0,0 +1,69 @@
+import sqlite3
+import time
+
+import pytest
+
+import db
+from database_setup import bootstrap_database
+
+
+def _open_count(db_path):
+    return sum(n for statuses in db.get_open_ticket_totals(db_path=db_path).values() for n in statuses.values())
+
+
+def test_snapshot_reads_lag_writes_until_refreshed(tmp_path):
+    db_path = tmp_path / "cs.db"
+    bootstrap_database(db_path)
+    reader = db.enable_snapshot_reads(db_path, max_staleness=60.0)
+    try:
+        before = _open_count(db_path)
+        db.create_ticket(1, "After the snapshot", db_path=db_path)
+        assert _open_count(db_path) == before
+        reader.refresh()
+        assert _open_count(db_path) == before + 1
+    finally:
+        db.disable_snapshot_reads(db_path)
+    assert not reader.snapshot_path.exists()
+    db.close_pools()
+
+
+def test_background_refresh_picks_up_writes(tmp_path):
+    db_path = tmp_path / "cs.db"
+    bootstrap_database(db_path)
+    reader = db.enable_snapshot_reads(db_path, max_staleness=0.05)
+    try:
+        before = _open_count(db_path)
+        db.create_ticket(1, "Picked up in the background", db_path=db_path)
+        deadline = time.monotonic() + 5
+        while _open_count(db_path) == before and time.monotonic() < deadline:
+            time.sleep(0.02)
+        assert _open_count(db_path) == before + 1
+        assert reader.refreshes > 1
+    finally:
+        db.disable_snapshot_reads(db_path)
+    db.close_pools()
+
+
+def test_snapshot_connection_rejects_writes(tmp_path):
+    db_path = tmp_path / "cs.db"
+    bootstrap_database(db_path)
+    reader = db.SnapshotReader(db_path, max_staleness=60.0)
+    try:
+        with pytest.raises(sqlite3.OperationalError):
+            reader.connection().execute("UPDATE customers SET email = 'snapshot@example.com' WHERE id = 1")
+    finally:
+        reader.close()
+    assert db.get_customer(1, db_path=db_path)["email"] != "snapshot@example.com"
+    db.close_pools()
+
+
+def test_iterator_started_on_snapshot_finishes_after_disable(tmp_path):
+    db_path = tmp_path / "cs.db"
+    bootstrap_database(db_path)
+    expected = [row["id"] for row in db.iter_customers(batch_size=1, db_path=db_path)]
+    db.enable_snapshot_reads(db_path, max_staleness=60.0)
+    rows = db.iter_customers(batch_size=1, db_path=db_path)
+    first = next(rows)
+    db.disable_snapshot_reads(db_path)
+    assert [first["id"]] + [row["id"] for row in rows] == expected
+    db.close_pools()
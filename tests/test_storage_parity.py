@@ -0,0 +1,68 @@
+import pytest
+
+import db
+from database_setup import bulk_load, synthetic_customers, synthetic_tickets
+from storage import MemoryBackend, SQLiteBackend
+
+
+@pytest.fixture(scope="module")
+def backends(tmp_path_factory):
+    db_path = tmp_path_factory.mktemp("parity") / "cs.db"
+    bulk_load(db_path, synthetic_customers(300), synthetic_tickets(3000, 300))
+    yield SQLiteBackend(db_path), MemoryBackend.from_sqlite(db_path)
+    db.close_pools()
+
+
+def _history_pages(backend, customer_id=2, limit=7):
+    pages, after = [], None
+    while True:
+        page = backend.get_customer_history(customer_id, limit=limit, after=after)
+        pages.append(page)
+        after = db.next_page_cursor(page, limit)
+        if after is None:
+            return pages
+
+
+def _customer_pages(backend, status="active", limit=25):
+    pages, after = [], None
+    while True:
+        page = backend.list_customers(status, limit=limit, after=after)
+        pages.append(page)
+        after = db.next_page_cursor(page, limit)
+        if after is None:
+            return pages
+
+
+def _open_ticket_pages(backend, priority=None):
+    return [[t["id"] for t in page] for page in backend.iter_open_tickets_for_customers("active", priority, page_size=40)]
+
+
+def _ranked(backend, query, match_all=False, open_only=False):
+    return [(t["id"], round(t["score"], 6)) for t in backend.search_tickets(query, 8, open_only, match_all)]
+
+
+CASES = {
+    "get_customer": lambda b: [b.get_customer(i) for i in (1, 5, 12345, 999999)],
+    "get_customers": lambda b: b.get_customers([12345, 1, 999999, 1, 5]),
+    "customer_history": lambda b: b.get_customer_history(2),
+    "customer_histories": lambda b: b.get_customer_histories([3, 2, 999999]),
+    "history_keyset_pages": _history_pages,
+    "customer_keyset_pages": _customer_pages,
+    "all_customer_keyset_pages": lambda b: _customer_pages(b, status=None),
+    "open_ticket_keyset_pages": _open_ticket_pages,
+    "high_open_ticket_keyset_pages": lambda b: _open_ticket_pages(b, "high"),
+    "open_ticket_summary": lambda b: [b.get_open_ticket_summary(i) for i in (1, 2, 5, 999999)],
+    "open_ticket_totals": lambda b: b.get_open_ticket_totals(),
+    "active_open_ticket_totals": lambda b: b.get_open_ticket_totals("active"),
+    "disabled_open_ticket_totals": lambda b: b.get_open_ticket_totals("disabled"),
+    "search_partial": lambda b: _ranked(b, "duplicate charge refund"),
+    "search_match_all": lambda b: _ranked(b, "account locked", match_all=True),
+    "search_open_only": lambda b: _ranked(b, "password login", open_only=True),
+    "search_no_match": lambda b: _ranked(b, "cancel subscription"),
+}
+
+
+@pytest.mark.parametrize("case", sorted(CASES))
+def test_memory_backend_matches_sqlite(backends, case):
+    sqlite_backend, memory_backend = backends
+    assert CASES[case](memory_backend) == CASES[case](sqlite_backend)
@@ -0,0 +1,15 @@
+import pytest
+
+from agents.templates import LineTemplate
+
+
+def test_line_template_renders_names_and_specs():
+    line = LineTemplate("- {{#{id}}} {issue} ({count:,})")
+    assert line.render({"id": 7, "issue": "Refund", "count": 3214}) == "- {#7} Refund (3,214)"
+    assert line.fields == ("id", "issue", "count")
+
+
+@pytest.mark.parametrize("template", ["{row.__class__}", "{row[0]}", "{issue!r}", "{0}", "{issue:{width}}"])
+def test_line_template_rejects_lookups_and_conversions(template):
+    with pytest.raises(ValueError):
+        LineTemplate(template)
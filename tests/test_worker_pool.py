@@ -0,0 +1,29 @@
+import time
+
+import pytest
+
+from agents.base import AgentLogger
+from database_setup import bootstrap_database
+from worker_pool import RouterWorkerPool
+
+
+def test_dead_worker_fails_its_queries_and_later_transcripts_still_merge(tmp_path):
+    db_path = tmp_path / "cs.db"
+    bootstrap_database(db_path)
+    logger = AgentLogger()
+    with RouterWorkerPool(workers=2, db_path=db_path, logger=logger) as pool:
+        assert "Elena Novak" in pool.handle_user_query("Get customer information for ID 5")["response"]
+        # Customer 5 has affinity to worker 1 (5 % 2).
+        pool._processes[1].kill()
+        deadline = time.monotonic() + 10
+        while 1 not in pool._dead and time.monotonic() < deadline:
+            time.sleep(0.01)
+        with pytest.raises(RuntimeError, match="router-worker-1"):
+            pool.submit("Get customer information for ID 5")
+        assert "Derek Yang" in pool.handle_user_query("Get customer information for ID 4")["response"]
+        assert not pool._held
+    received = [m.content for m in logger.messages if m.recipient == "user" and m.content.startswith("Received query")]
+    assert received == [
+        "Received query: Get customer information for ID 5",
+        "Received query: Get customer information for ID 4",
+    ]
@@ -0,0 +1,214 @@
+"""
+Lightweight per-hop tracing for the router, agents and db helpers.
+
+Tracing is off by default; while off, span() hands back a shared no-op context manager and
+@traced wrappers fall straight through to the wrapped function. Enable it with enable(),
+run queries, then export the collected spans with timeline() or to_otlp_json().
+"""
+import contextvars
+import functools
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, TypeVar
+
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+DEFAULT_MAX_SPANS = 100_000
+
+_enabled = False
+_spans: Deque["Span"] = deque(maxlen=DEFAULT_MAX_SPANS)
+_spans_lock = threading.Lock()
+_current_trace: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("trace_id", default=None)
+_current_span: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar("span", default=None)
+
+
+def _new_id(num_bytes: int) -> str:
+    return os.urandom(num_bytes).hex()
+
+
+class Span:
+    __slots__ = ("trace_id", "span_id", "parent_id", "name", "attributes", "start_ns", "end_ns", "_tokens")
+
+    def __init__(self, name: str, attributes: Dict[str, Any]) -> None:
+        self.name = name
+        self.attributes = attributes
+        self.start_ns = 0
+        self.end_ns = 0
+        self.trace_id = ""
+        self.span_id = ""
+        self.parent_id: Optional[str] = None
+        self._tokens: tuple = ()
+
+    @property
+    def duration_ms(self) -> float:
+        return (self.end_ns - self.start_ns) / 1e6
+
+    def __enter__(self) -> "Span":
+        parent = _current_span.get()
+        trace_id = _current_trace.get()
+        trace_token = None
+        if trace_id is None:
+            # A span opened outside any trace starts a new one (e.g. one per user query).
+            trace_id = _new_id(16)
+            trace_token = _current_trace.set(trace_id)
+        self.trace_id = trace_id
+        self.span_id = _new_id(8)
+        self.parent_id = parent.span_id if parent is not None else None
+        self._tokens = (trace_token, _current_span.set(self))
+        self.start_ns = time.time_ns()
+        return self
+
+    def __exit__(self, exc_type: Any, exc: Any, tb: Any) -> None:
+        self.end_ns = time.time_ns()
+        if exc_type is not None:
+            self.attributes["error"] = exc_type.__name__
+        trace_token, span_token = self._tokens
+        _current_span.reset(span_token)
+        if trace_token is not None:
+            _current_trace.reset(trace_token)
+        with _spans_lock:
+            _spans.append(self)
+
+
+class _NoopSpan:
+    __slots__ = ()
+    duration_ms = 0.0
+
+    @property
+    def attributes(self) -> Dict[str, Any]:
+        # Writes are discarded.
+        return {}
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, exc_type: Any, exc: Any, tb: Any) -> None:
+        return None
+
+
+_NOOP = _NoopSpan()
+
+
+def enable(max_spans: int = DEFAULT_MAX_SPANS) -> None:
+    global _enabled, _spans
+    with _spans_lock:
+        if _spans.maxlen != max_spans:
+            _spans = deque(_spans, maxlen=max_spans)
+    _enabled = True
+
+
+def disable() -> None:
+    global _enabled
+    _enabled = False
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def clear() -> None:
+    with _spans_lock:
+        _spans.clear()
+
+
+def span(name: str, **attributes: Any) -> Any:
+    if not _enabled:
+        return _NOOP
+    return Span(name, attributes)
+
+
+def traced(name: str) -> Callable[[F], F]:
+    """
+    Decorator recording one span per call. Only meaningful for functions that do their work
+    before returning (not generators).
+    """
+
+    def decorator(func: F) -> F:
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if not _enabled:
+                return func(*args, **kwargs)
+            with Span(name, {}):
+                return func(*args, **kwargs)
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorator
+
+
+def current_trace_id() -> Optional[str]:
+    return _current_trace.get()
+
+
+def spans(trace_id: Optional[str] = None) -> List[Span]:
+    with _spans_lock:
+        collected = list(_spans)
+    if trace_id is not None:
+        collected = [s for s in collected if s.trace_id == trace_id]
+    return sorted(collected, key=lambda s: s.start_ns)
+
+
+def timeline(trace_id: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    Flat, start-ordered list of spans with offsets relative to the start of their trace.
+    """
+    collected = spans(trace_id)
+    trace_start: Dict[str, int] = {}
+    for s in collected:
+        trace_start.setdefault(s.trace_id, s.start_ns)
+    return [
+        {
+            "trace_id": s.trace_id,
+            "span_id": s.span_id,
+            "parent_id": s.parent_id,
+            "name": s.name,
+            "offset_ms": round((s.start_ns - trace_start[s.trace_id]) / 1e6, 3),
+            "duration_ms": round(s.duration_ms, 3),
+            "attributes": dict(s.attributes),
+        }
+        for s in collected
+    ]
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def to_otlp_json(trace_id: Optional[str] = None, service_name: str = "multi-agent-customer-service") -> Dict[str, Any]:
+    """
+    Spans in the OTLP/JSON trace shape accepted by OpenTelemetry collectors.
+    """
+    return {
+        "resourceSpans": [
+            {
+                "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": service_name}}]},
+                "scopeSpans": [
+                    {
+                        "scope": {"name": "tracing"},
+                        "spans": [
+                            {
+                                "traceId": s.trace_id,
+                                "spanId": s.span_id,
+                                "parentSpanId": s.parent_id or "",
+                                "name": s.name,
+                                "kind": 1,
+                                "startTimeUnixNano": str(s.start_ns),
+                                "endTimeUnixNano": str(s.end_ns),
+                                "attributes": [{"key": k, "value": _otlp_value(v)} for k, v in s.attributes.items()],
+                            }
+                            for s in spans(trace_id)
+                        ],
+                    }
+                ],
+            }
+        ]
+    }
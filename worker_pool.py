@@ -0,0 +1,233 @@
+"""
+Multi-process serving mode: N worker processes, each with its own RouterAgent,
+CustomerDataAgent, SupportAgent and database connections, behind one in-process dispatcher.
+
+Queries about a customer always go to the same worker (customer id modulo worker count), so
+that customer's cached record and history stay warm in one process. The customer is resolved the
+way the router resolves it, including the intent's default customer when the query names none
+(IntentMatch.resolved_customer_id). Other queries go to the worker with the fewest queries in
+flight. Each worker sends back the response together with the
+A2A messages the query produced; the pool records those into its own logger in submission order,
+so the merged transcript reads as if the queries had run one after another.
+
+Caches are per process: a write made through one worker is only seen by the others' caches once
+their TTL expires (see db.CACHE_TTL_SECONDS). Affinity keeps this from affecting queries about
+the same customer. If a worker process dies, its pending queries fail with a RuntimeError, and
+later queries for its customers fail the same way rather than reading another worker's caches.
+
+    with RouterWorkerPool(workers=4) as pool:
+        results = pool.handle_user_queries(queries)
+"""
+import itertools
+import multiprocessing
+import multiprocessing.connection
+import os
+import threading
+from concurrent.futures import Future
+from dataclasses import replace
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Set
+
+from agents.base import AgentLogger, AgentMessage
+from agents.intents import DEFAULT_DETECTOR, IntentDetector
+from db import DB_PATH
+
+
+def _encode(message: AgentMessage) -> bytes:
+    try:
+        return message.to_bytes()
+    except Exception:
+        # Payloads that cannot cross a process boundary (e.g. live row iterators) travel as text.
+        return replace(message, payload={"repr": repr(message.payload)}).to_bytes()
+
+
+def _worker_main(db_path: str, backend: str, router_options: Dict[str, float], inbox: Any, outbox: Any) -> None:
+    # Imported here so the parent only pays for the dispatcher, not for the agent stack.
+    from agents.customer_data_agent import CustomerDataAgent
+    from agents.router_agent import RouterAgent
+    from agents.support_agent import SupportAgent
+    from storage import MemoryBackend, SQLiteBackend
+
+    logger = AgentLogger()
+    storage = MemoryBackend.from_sqlite(Path(db_path)) if backend == "memory" else SQLiteBackend(Path(db_path))
+    data_agent = CustomerDataAgent(logger, db_path=db_path, backend=storage)
+    router = RouterAgent(logger, data_agent, SupportAgent(logger, data_agent=data_agent), **router_options)
+    for seq, query, request_id in iter(inbox.get, None):
+        try:
+            result = router.handle_user_query(query, request_id)
+        except Exception as exc:
+            outbox.put((seq, False, f"{type(exc).__name__}: {exc}", [_encode(m) for m in logger.messages]))
+        else:
+            outbox.put((seq, True, result, [_encode(m) for m in logger.messages]))
+        logger.messages.clear()
+
+
+class RouterWorkerPool:
+    """
+    Dispatches user queries to `workers` processes that each run a full agent stack.
+
+    Results come back as Futures from submit() or in order from handle_user_queries(). When
+    `logger` is given, every query's transcript is recorded into it in submission order.
+    dedup_window / read_cache_ttl configure each worker's RouterAgent memoization; affinity
+    sends repeats about one customer to the same worker, so they find its memoized response.
+    """
+
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        db_path: Path = DB_PATH,
+        backend: str = "sqlite",
+        logger: Optional[AgentLogger] = None,
+        intent_detector: IntentDetector = DEFAULT_DETECTOR,
+        start_method: str = "spawn",
+        dedup_window: float = 0.0,
+        read_cache_ttl: float = 0.0,
+    ) -> None:
+        if backend not in ("sqlite", "memory"):
+            raise ValueError(f"backend must be 'sqlite' or 'memory', got {backend!r}")
+        self.workers = workers or os.cpu_count() or 1
+        self.logger = logger
+        self.intent_detector = intent_detector
+        # spawn, so workers never inherit the parent's pooled SQLite connections.
+        context = multiprocessing.get_context(start_method)
+        router_options = {"dedup_window": dedup_window, "read_cache_ttl": read_cache_ttl}
+        # One outbox per worker: a worker killed while holding a shared queue's write lock
+        # would block every other worker's replies.
+        self._outboxes = [context.Queue() for _ in range(self.workers)]
+        self._inboxes = [context.Queue() for _ in range(self.workers)]
+        self._processes = [
+            context.Process(
+                target=_worker_main,
+                args=(str(db_path), backend, router_options, inbox, outbox),
+                name=f"router-worker-{index}",
+                daemon=True,
+            )
+            for index, (inbox, outbox) in enumerate(zip(self._inboxes, self._outboxes))
+        ]
+        for process in self._processes:
+            process.start()
+
+        self._lock = threading.Lock()
+        self._seq = itertools.count()
+        self._futures: Dict[int, Future] = {}
+        self._assigned: Dict[int, int] = {}
+        self._in_flight = [0] * self.workers
+        # Transcripts that arrived ahead of an earlier query, waiting for their turn.
+        self._held: Dict[int, List[bytes]] = {}
+        self._next_to_record = 0
+        self._dead: Set[int] = set()
+        self._closed = False
+        self._collectors = [
+            threading.Thread(target=self._collect, args=(outbox,), name=f"router-pool-collector-{index}", daemon=True)
+            for index, outbox in enumerate(self._outboxes)
+        ]
+        for collector in self._collectors:
+            collector.start()
+        self._watcher = threading.Thread(target=self._watch, name="router-pool-watcher", daemon=True)
+        self._watcher.start()
+
+    def _pick_worker(self, query: str) -> int:
+        customer_id = self.intent_detector.detect(query).resolved_customer_id
+        if customer_id is not None:
+            worker = customer_id % self.workers
+            if worker in self._dead:
+                raise RuntimeError(f"router-worker-{worker} (serving customer {customer_id}) has exited")
+            return worker
+        live = [worker for worker in range(self.workers) if worker not in self._dead]
+        if not live:
+            raise RuntimeError("All RouterWorkerPool workers have exited")
+        return min(live, key=self._in_flight.__getitem__)
+
+    def submit(self, query: str, request_id: Optional[str] = None) -> "Future[Dict[str, str]]":
+        if self._closed:
+            raise RuntimeError("RouterWorkerPool is closed")
+        future: "Future[Dict[str, str]]" = Future()
+        with self._lock:
+            # Pick first: a query refused for a dead worker must not take a seq, or the
+            # transcripts after it would wait for that seq forever in _record_ready().
+            worker = self._pick_worker(query)
+            seq = next(self._seq)
+            self._futures[seq] = future
+            self._assigned[seq] = worker
+            self._in_flight[worker] += 1
+        self._inboxes[worker].put((seq, query, request_id))
+        return future
+
+    def handle_user_query(self, query: str, request_id: Optional[str] = None) -> Dict[str, str]:
+        return self.submit(query, request_id).result()
+
+    def handle_user_queries(self, queries: Sequence[str]) -> List[Dict[str, str]]:
+        futures = [self.submit(query) for query in queries]
+        return [future.result() for future in futures]
+
+    def _collect(self, outbox: Any) -> None:
+        for seq, ok, result, transcript in iter(outbox.get, None):
+            with self._lock:
+                future = self._futures.pop(seq, None)
+                if future is None:
+                    # Already failed by _watch: the worker died after sending this.
+                    continue
+                self._in_flight[self._assigned.pop(seq)] -= 1
+                self._held[seq] = transcript
+                self._record_ready()
+            if ok:
+                future.set_result(result)
+            else:
+                future.set_exception(RuntimeError(result))
+
+    def _record_ready(self) -> None:
+        # Caller holds self._lock.
+        while self._next_to_record in self._held:
+            messages = self._held.pop(self._next_to_record)
+            if self.logger is not None:
+                for data in messages:
+                    self.logger.record(AgentMessage.from_bytes(data))
+            self._next_to_record += 1
+
+    def _watch(self) -> None:
+        # Fail the queries of a worker that exits unexpectedly instead of leaving them pending.
+        sentinels = {process.sentinel: index for index, process in enumerate(self._processes)}
+        while sentinels:
+            for sentinel in multiprocessing.connection.wait(list(sentinels)):
+                worker = sentinels.pop(sentinel)
+                self._processes[worker].join()  # reaps the process so exitcode is set
+                exitcode = self._processes[worker].exitcode
+                with self._lock:
+                    if self._closed and exitcode == 0:
+                        continue
+                    self._dead.add(worker)
+                    lost = [seq for seq, assigned in self._assigned.items() if assigned == worker]
+                    futures = []
+                    for seq in lost:
+                        del self._assigned[seq]
+                        futures.append(self._futures.pop(seq))
+                        self._in_flight[worker] -= 1
+                        self._held[seq] = []
+                    self._record_ready()
+                for future in futures:
+                    future.set_exception(RuntimeError(f"router-worker-{worker} exited with code {exitcode}"))
+
+    def close(self) -> None:
+        """
+        Let the workers finish queued queries, then stop them and the collector.
+        """
+        if self._closed:
+            return
+        self._closed = True
+        for inbox in self._inboxes:
+            inbox.put(None)
+        for process in self._processes:
+            process.join()
+        self._watcher.join()
+        for worker, (outbox, collector) in enumerate(zip(self._outboxes, self._collectors)):
+            # A dead worker may have left a partial reply in its outbox; its collector is a
+            # daemon thread and is left behind rather than joined.
+            if worker not in self._dead:
+                outbox.put(None)
+                collector.join()
+
+    def __enter__(self) -> "RouterWorkerPool":
+        return self
+
+    def __exit__(self, exc_type: Any, exc: Any, tb: Any) -> None:
+        self.close()